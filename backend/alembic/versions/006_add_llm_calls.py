@@ -0,0 +1,44 @@
+"""Fuegt llm_calls-Tabelle fuer LLM-Telemetrie hinzu.
+
+Revision ID: 006_add_llm_calls
+Revises: 005_add_filing_scopes
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "006_add_llm_calls"
+down_revision = "005_add_filing_scopes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "llm_calls",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("job_id", sa.String(36), nullable=True),
+        sa.Column("template", sa.String(100), nullable=True),
+        sa.Column("model", sa.String(100), nullable=False),
+        sa.Column("host", sa.String(200), nullable=True),
+        sa.Column("success", sa.Boolean, nullable=False, default=True),
+        sa.Column("latency_ms", sa.Float, nullable=False),
+        sa.Column("prompt_eval_count", sa.Integer, nullable=True),
+        sa.Column("eval_count", sa.Integer, nullable=True),
+        sa.Column("load_duration_ns", sa.BigInteger, nullable=True),
+        sa.Column("prompt_eval_duration_ns", sa.BigInteger, nullable=True),
+        sa.Column("eval_duration_ns", sa.BigInteger, nullable=True),
+        sa.Column("total_duration_ns", sa.BigInteger, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_llm_calls_job_id", "llm_calls", ["job_id"])
+    op.create_index("ix_llm_calls_template", "llm_calls", ["template"])
+    op.create_index("ix_llm_calls_created_at", "llm_calls", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_llm_calls_created_at", table_name="llm_calls")
+    op.drop_index("ix_llm_calls_template", table_name="llm_calls")
+    op.drop_index("ix_llm_calls_job_id", table_name="llm_calls")
+    op.drop_table("llm_calls")
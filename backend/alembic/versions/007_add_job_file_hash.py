@@ -0,0 +1,24 @@
+"""Fuegt file_hash zu processing_jobs hinzu (Hash einmalig beim Eingang).
+
+Revision ID: 007_add_job_file_hash
+Revises: 006_add_llm_calls
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "007_add_job_file_hash"
+down_revision = "006_add_llm_calls"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("processing_jobs", sa.Column("file_hash", sa.String(64), nullable=True))
+    op.create_index("ix_processing_jobs_file_hash", "processing_jobs", ["file_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_processing_jobs_file_hash", table_name="processing_jobs")
+    op.drop_column("processing_jobs", "file_hash")
@@ -0,0 +1,28 @@
+"""Fuegt blobs-Tabelle fuer die inhaltsadressierte Ablage hinzu.
+
+Revision ID: 008_add_blobs
+Revises: 007_add_job_file_hash
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "008_add_blobs"
+down_revision = "007_add_job_file_hash"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "blobs",
+        sa.Column("file_hash", sa.String(64), primary_key=True),
+        sa.Column("size_bytes", sa.BigInteger, nullable=False),
+        sa.Column("ref_count", sa.Integer, nullable=False, default=1),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("blobs")
@@ -0,0 +1,39 @@
+"""Fuegt MinHash-Fingerabdruecke und LSH-Buckets fuer Beinahe-Duplikate hinzu.
+
+Revision ID: 009_add_text_fingerprints
+Revises: 008_add_blobs
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "009_add_text_fingerprints"
+down_revision = "008_add_blobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_fingerprints",
+        sa.Column("document_id", sa.String(36), sa.ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("signature", sa.LargeBinary, nullable=False),
+        sa.Column("shingle_count", sa.Integer, nullable=False),
+    )
+    op.create_table(
+        "fingerprint_buckets",
+        sa.Column("bucket", sa.BigInteger, primary_key=True),
+        sa.Column("document_id", sa.String(36), sa.ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True),
+    )
+    op.create_index("ix_fingerprint_buckets_document_id", "fingerprint_buckets", ["document_id"])
+    op.add_column("documents", sa.Column("near_duplicate_of_id", sa.String(36), nullable=True))
+    op.add_column("documents", sa.Column("near_duplicate_score", sa.Float, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("documents", "near_duplicate_score")
+    op.drop_column("documents", "near_duplicate_of_id")
+    op.drop_index("ix_fingerprint_buckets_document_id", table_name="fingerprint_buckets")
+    op.drop_table("fingerprint_buckets")
+    op.drop_table("document_fingerprints")
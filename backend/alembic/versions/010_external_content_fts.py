@@ -0,0 +1,131 @@
+"""FTS5-Index mit externem Inhalt, per Trigger synchron gehalten.
+
+Der bisherige eigenstaendige Index hielt eine zweite Kopie aller Texte.
+Der neue Index speichert nur Tokens und liest die Texte ueber eine View aus
+documents (Schluessel: rowid). Tags werden als documents.tags_text gepflegt.
+
+Revision ID: 010_external_content_fts
+Revises: 009_add_text_fingerprints
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "010_external_content_fts"
+down_revision = "009_add_text_fingerprints"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = "title, ocr_text, issuer, summary, tags"
+_OLD = "old.rowid, old.title, old.ocr_text, old.issuer, old.summary, old.tags_text"
+_NEW = "new.rowid, new.title, new.ocr_text, new.issuer, new.summary, new.tags_text"
+_WATCHED = "title, ocr_text, issuer, summary, tags_text, status"
+_TAGS_TEXT = """
+    (SELECT COALESCE(GROUP_CONCAT(name, ' '), '') FROM (
+        SELECT t.name FROM document_tags dt JOIN tags t ON dt.tag_id = t.id
+        WHERE dt.document_id = {doc_id} ORDER BY t.name
+    ))
+"""
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("tags_text", sa.Text, nullable=False, server_default=""))
+    op.execute(f"UPDATE documents SET tags_text = {_TAGS_TEXT.format(doc_id='documents.id')}")
+
+    op.execute("DROP TABLE IF EXISTS documents_fts")
+    op.execute("""
+        CREATE VIEW documents_fts_content AS
+        SELECT rowid AS doc_rowid, title, ocr_text, issuer, summary, tags_text AS tags
+        FROM documents WHERE status != 'DELETED'
+    """)
+    op.execute("""
+        CREATE VIRTUAL TABLE documents_fts USING fts5(
+            title,
+            ocr_text,
+            issuer,
+            summary,
+            tags,
+            content='documents_fts_content',
+            content_rowid='doc_rowid',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    op.execute(f"""
+        CREATE TRIGGER documents_fts_ai AFTER INSERT ON documents
+        WHEN new.status != 'DELETED' BEGIN
+            INSERT INTO documents_fts(rowid, {_COLUMNS}) VALUES ({_NEW});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER documents_fts_ad AFTER DELETE ON documents
+        WHEN old.status != 'DELETED' BEGIN
+            INSERT INTO documents_fts(documents_fts, rowid, {_COLUMNS}) VALUES ('delete', {_OLD});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER documents_fts_au AFTER UPDATE OF {_WATCHED} ON documents BEGIN
+            INSERT INTO documents_fts(documents_fts, rowid, {_COLUMNS})
+            SELECT 'delete', {_OLD} WHERE old.status != 'DELETED';
+            INSERT INTO documents_fts(rowid, {_COLUMNS})
+            SELECT {_NEW} WHERE new.status != 'DELETED';
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER document_tags_fts_ai AFTER INSERT ON document_tags BEGIN
+            UPDATE documents SET tags_text = {_TAGS_TEXT.format(doc_id='new.document_id')}
+            WHERE id = new.document_id;
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER document_tags_fts_ad AFTER DELETE ON document_tags BEGIN
+            UPDATE documents SET tags_text = {_TAGS_TEXT.format(doc_id='old.document_id')}
+            WHERE id = old.document_id;
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER tags_fts_au AFTER UPDATE OF name ON tags BEGIN
+            UPDATE documents SET tags_text = {_TAGS_TEXT.format(doc_id='documents.id')}
+            WHERE id IN (SELECT document_id FROM document_tags WHERE tag_id = new.id);
+        END
+    """)
+    op.execute("INSERT INTO documents_fts(documents_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    for trigger in (
+        "tags_fts_au", "document_tags_fts_ad", "document_tags_fts_ai",
+        "documents_fts_au", "documents_fts_ad", "documents_fts_ai",
+    ):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS documents_fts")
+    op.execute("DROP VIEW IF EXISTS documents_fts_content")
+    op.drop_column("documents", "tags_text")
+    op.execute("""
+        CREATE VIRTUAL TABLE documents_fts USING fts5(
+            doc_id UNINDEXED,
+            title,
+            ocr_text,
+            issuer,
+            summary,
+            tags,
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    op.execute("""
+        INSERT INTO documents_fts(doc_id, title, ocr_text, issuer, summary, tags)
+        SELECT
+            d.id,
+            COALESCE(d.title, ''),
+            COALESCE(d.ocr_text, ''),
+            COALESCE(d.issuer, ''),
+            COALESCE(d.summary, ''),
+            COALESCE(
+                (SELECT GROUP_CONCAT(t.name, ' ')
+                 FROM document_tags dt JOIN tags t ON dt.tag_id = t.id
+                 WHERE dt.document_id = d.id),
+                ''
+            )
+        FROM documents d
+        WHERE d.status != 'DELETED'
+    """)
@@ -0,0 +1,40 @@
+"""Generationszaehler fuer den Suchcache, per Trigger bei jedem Schreibzugriff erhoeht.
+
+Revision ID: 011_add_archive_generation
+Revises: 010_external_content_fts
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "011_add_archive_generation"
+down_revision = "010_external_content_fts"
+branch_labels = None
+depends_on = None
+
+_TABLES = ("documents", "document_tags", "tags", "filing_scopes")
+_EVENTS = (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE archive_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
+        )
+    """)
+    op.execute("INSERT INTO archive_generation (id, generation) VALUES (1, 0)")
+    for table in _TABLES:
+        for suffix, event in _EVENTS:
+            op.execute(f"""
+                CREATE TRIGGER {table}_generation_{suffix} AFTER {event} ON {table} BEGIN
+                    UPDATE archive_generation SET generation = generation + 1;
+                END
+            """)
+
+
+def downgrade() -> None:
+    for table in _TABLES:
+        for suffix, _ in _EVENTS:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_generation_{suffix}")
+    op.execute("DROP TABLE IF EXISTS archive_generation")
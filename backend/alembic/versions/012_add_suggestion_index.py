@@ -0,0 +1,119 @@
+"""Praefixindex fuer Autocomplete-Vorschlaege, Haeufigkeiten per Trigger gepflegt.
+
+Die Migration zaehlt die vorhandenen Begriffe; die Praefixzeilen legt die
+Anwendung bei der ersten Vorschlagsabfrage an (alle Begriffe gelten dann
+als geaendert).
+
+Revision ID: 012_add_suggestion_index
+Revises: 011_add_archive_generation
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "012_add_suggestion_index"
+down_revision = "011_add_archive_generation"
+branch_labels = None
+depends_on = None
+
+_BUMP = """
+    INSERT INTO suggestion_terms (kind, term, frequency)
+    SELECT '{kind}', {term}, MAX({delta}, 0) WHERE {term} IS NOT NULL AND {term} != ''{condition}
+    ON CONFLICT (kind, term) DO UPDATE SET frequency = MAX(frequency + {delta}, 0);
+"""
+_TAG_NAME = "(SELECT name FROM tags WHERE id = {}.tag_id)"
+_TAG_USES = "(SELECT COUNT(*) FROM document_tags WHERE tag_id = new.id)"
+_TRIGGERS = (
+    "documents_suggest_ai", "documents_suggest_ad", "documents_suggest_au",
+    "document_tags_suggest_ai", "document_tags_suggest_ad", "tags_suggest_au",
+)
+
+
+def _bump(kind: str, term: str, delta: str, condition: str = "") -> str:
+    return _BUMP.format(kind=kind, term=term, delta=delta, condition=f" AND {condition}" if condition else "")
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE suggestion_terms (
+            id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            term TEXT NOT NULL,
+            frequency INTEGER NOT NULL,
+            indexed_frequency INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (kind, term)
+        )
+    """)
+    op.execute("""
+        CREATE INDEX ix_suggestion_terms_changed ON suggestion_terms (id)
+        WHERE frequency != indexed_frequency
+    """)
+    op.execute("""
+        CREATE TABLE suggestion_prefixes (
+            prefix TEXT NOT NULL,
+            frequency INTEGER NOT NULL,
+            term_id INTEGER NOT NULL,
+            PRIMARY KEY (prefix, frequency DESC, term_id)
+        ) WITHOUT ROWID
+    """)
+
+    op.execute(f"""
+        CREATE TRIGGER documents_suggest_ai AFTER INSERT ON documents
+        WHEN new.status != 'DELETED' BEGIN
+            {_bump("issuer", "new.issuer", "1")}
+            {_bump("title", "new.title", "1")}
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER documents_suggest_ad AFTER DELETE ON documents
+        WHEN old.status != 'DELETED' BEGIN
+            {_bump("issuer", "old.issuer", "-1")}
+            {_bump("title", "old.title", "-1")}
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER documents_suggest_au AFTER UPDATE OF title, issuer, status ON documents
+        WHEN old.title IS NOT new.title OR old.issuer IS NOT new.issuer
+            OR (old.status = 'DELETED') != (new.status = 'DELETED') BEGIN
+            {_bump("issuer", "old.issuer", "-1", "old.status != 'DELETED'")}
+            {_bump("title", "old.title", "-1", "old.status != 'DELETED'")}
+            {_bump("issuer", "new.issuer", "1", "new.status != 'DELETED'")}
+            {_bump("title", "new.title", "1", "new.status != 'DELETED'")}
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER document_tags_suggest_ai AFTER INSERT ON document_tags BEGIN
+            {_bump("tag", _TAG_NAME.format("new"), "1")}
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER document_tags_suggest_ad AFTER DELETE ON document_tags BEGIN
+            {_bump("tag", _TAG_NAME.format("old"), "-1")}
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER tags_suggest_au AFTER UPDATE OF name ON tags
+        WHEN old.name IS NOT new.name BEGIN
+            {_bump("tag", "old.name", f"-{_TAG_USES}")}
+            {_bump("tag", "new.name", _TAG_USES)}
+        END
+    """)
+
+    op.execute("""
+        INSERT INTO suggestion_terms (kind, term, frequency)
+        SELECT 'issuer', issuer, COUNT(*) FROM documents
+        WHERE status != 'DELETED' AND issuer IS NOT NULL AND issuer != '' GROUP BY issuer
+        UNION ALL
+        SELECT 'title', title, COUNT(*) FROM documents
+        WHERE status != 'DELETED' AND title IS NOT NULL AND title != '' GROUP BY title
+        UNION ALL
+        SELECT 'tag', t.name, COUNT(*) FROM document_tags dt JOIN tags t ON t.id = dt.tag_id
+        WHERE t.name != '' GROUP BY t.name
+    """)
+
+
+def downgrade() -> None:
+    for trigger in _TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS suggestion_prefixes")
+    op.execute("DROP TABLE IF EXISTS suggestion_terms")
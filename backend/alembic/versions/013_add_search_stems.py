@@ -0,0 +1,53 @@
+"""Deutsche Wortstaemme und Kompositateile als eigene FTS-Spalte.
+
+documents.search_stems haelt die Staemme (berechnet in Python, siehe
+app.core.text_analysis). Die Migration legt nur die Spalte an und entfernt
+den bisherigen Index samt View; beim naechsten Start berechnet die Anwendung
+die Staemme des Bestands und baut den Index mit der Spalte stems neu auf.
+
+Revision ID: 013_add_search_stems
+Revises: 012_add_suggestion_index
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "013_add_search_stems"
+down_revision = "012_add_suggestion_index"
+branch_labels = None
+depends_on = None
+
+
+_FTS_TRIGGERS = (
+    "documents_fts_au", "documents_fts_ad", "documents_fts_ai",
+    "document_tags_fts_ai", "document_tags_fts_ad", "tags_fts_au",
+)
+
+
+def _drop_fts_index() -> None:
+    for trigger in _FTS_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS documents_fts")
+    op.execute("DROP VIEW IF EXISTS documents_fts_content")
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("search_stems", sa.Text, nullable=False, server_default=""))
+    _drop_fts_index()
+
+
+def downgrade() -> None:
+    # Den Index ohne Staemme legt die Anwendung beim Start wieder an
+    _drop_fts_index()
+    # Der Batch-Modus baut documents neu auf; SQLite prueft dabei alle Trigger
+    # und Views, daher werden sie vorher entfernt und danach wieder angelegt
+    saved = op.get_bind().execute(sa.text(
+        "SELECT type, name, sql FROM sqlite_master WHERE type IN ('trigger', 'view') AND sql IS NOT NULL"
+    )).all()
+    for kind, name, _ in saved:
+        op.execute(f"DROP {kind.upper()} IF EXISTS {name}")
+    with op.batch_alter_table("documents") as batch_op:
+        batch_op.drop_column("search_stems")
+    for _, _, sql in saved:
+        op.execute(sql)
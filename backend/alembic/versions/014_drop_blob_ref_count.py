@@ -0,0 +1,26 @@
+"""Entfernt den Referenzzaehler der Blobs.
+
+Jeder Blob gehoert zu genau einem Dokument (documents.file_hash ist
+eindeutig), der Zaehler war immer 1.
+
+Revision ID: 014_drop_blob_ref_count
+Revises: 013_add_search_stems
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "014_drop_blob_ref_count"
+down_revision = "013_add_search_stems"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("blobs") as batch_op:
+        batch_op.drop_column("ref_count")
+
+
+def downgrade() -> None:
+    op.add_column("blobs", sa.Column("ref_count", sa.Integer, nullable=False, server_default="1"))
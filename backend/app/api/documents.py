@@ -5,10 +5,11 @@ from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile
 from fastapi.responses import FileResponse
-from sqlalchemy import func, select
+from sqlalchemy import func, literal_column, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import Settings, get_settings
+from app.core.pagination import decode_cursor, encode_cursor, keyset_conditions
 from app.database import get_db
 from app.models.audit_log import AuditAction, AuditLog
 from app.models.document import Document, DocumentStatus, DocumentType, ReviewStatus, Tag
@@ -20,6 +21,7 @@ from app.schemas.document import (
     DocumentListItem,
     DocumentResponse,
     DocumentUpdate,
+    NearDuplicateResponse,
     PaginatedDocumentsResponse,
     ReviewQuestionAnswer,
     ReviewQuestionResponse,
@@ -31,7 +33,10 @@ from app.schemas.processing_job import (
     MultiUploadResponse,
     UploadResponse,
 )
+from app.services.archive_service import document_view_path, update_document_view
 from app.services.file_validation_service import FileValidationError
+from app.services.near_duplicate_service import compute_signature, find_near_duplicates
+from app.services.tag_service import attach_tags, resolve_tag_ids
 from app.services.upload_service import process_upload
 
 logger = logging.getLogger("zettelwirtschaft.api.documents")
@@ -127,9 +132,15 @@ async def list_documents(
     filing_scope_id: str | None = None,
     sort_by: str = "created_at",
     sort_order: str = "desc",
+    cursor: str | None = None,
+    with_total: bool = True,
     db: AsyncSession = Depends(get_db),
 ) -> PaginatedDocumentsResponse:
-    """Listet Dokumente mit Filtern und Paginierung."""
+    """Listet Dokumente mit Filtern und Paginierung.
+
+    cursor=<next_cursor> blaettert per Keyset weiter (unabhaengig von page),
+    with_total=false spart die Zaehlung.
+    """
     query = select(Document).where(Document.status != DocumentStatus.DELETED)
 
     # Filter
@@ -148,27 +159,54 @@ async def list_documents(
         query = query.where(Document.filing_scope_id == filing_scope_id)
 
     # Count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
-
-    # Sorting
-    sort_column = getattr(Document, sort_by, Document.created_at)
-    if sort_order == "asc":
-        query = query.order_by(sort_column.asc())
+    total = None
+    if with_total:
+        count_query = select(func.count()).select_from(query.subquery())
+        total = (await db.execute(count_query)).scalar() or 0
+
+    # Sorting (ID als eindeutiger Zweitschluessel fuer den Cursor)
+    sort_column = Document.__table__.c.get(sort_by, Document.__table__.c.created_at)
+    descending = sort_order != "asc"
+    sort_key = f"{sort_column.name} {'DESC' if descending else 'ASC'}"
+    if descending:
+        query = query.order_by(sort_column.desc(), Document.id.desc())
     else:
-        query = query.order_by(sort_column.desc())
+        query = query.order_by(sort_column.asc(), Document.id.asc())
 
     # Pagination
-    query = query.offset((page - 1) * page_size).limit(page_size)
-
-    result = await db.execute(query)
-    documents = result.scalars().all()
+    if cursor:
+        try:
+            value, last_id = decode_cursor(cursor, sort_key)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        parts = keyset_conditions(
+            f"documents.{sort_column.name}", "documents.id", descending, value, last_id,
+            nullable=sort_column.nullable,
+        )
+        pages = [query.where(text(condition).bindparams(**params)) for condition, params in parts]
+    else:
+        pages = [query.offset((page - 1) * page_size)]
+
+    # Sortierwert roh aus der Datenbank, damit der Cursor exakt vergleicht
+    raw_sort = literal_column(f"documents.{sort_column.name}")
+    rows: list = []
+    for page_query in pages:
+        result = await db.execute(page_query.add_columns(raw_sort).limit(page_size + 1 - len(rows)))
+        rows += result.all()
+        if len(rows) > page_size:
+            break
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(sort_key, rows[-1][1], rows[-1][0].id)
 
     return PaginatedDocumentsResponse(
-        items=[DocumentListItem.model_validate(doc) for doc in documents],
+        items=[DocumentListItem.model_validate(doc) for doc, _ in rows],
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
@@ -187,11 +225,49 @@ async def get_document(
     return DocumentResponse.model_validate(document)
 
 
+@router.get("/documents/{document_id}/near-duplicates", response_model=list[NearDuplicateResponse])
+async def get_near_duplicates(
+    document_id: str,
+    min_score: float | None = Query(None, ge=0.0, le=1.0),
+    db: AsyncSession = Depends(get_db),
+    settings: Settings = Depends(get_settings),
+) -> list[NearDuplicateResponse]:
+    """Listet Dokumente mit sehr aehnlichem OCR-Text (wahrscheinliche Duplikate)."""
+    result = await db.execute(
+        select(Document.ocr_text).where(Document.id == document_id)
+    )
+    ocr_text = result.scalar_one_or_none()
+    if ocr_text is None:
+        raise HTTPException(status_code=404, detail="Dokument nicht gefunden")
+
+    computed = compute_signature(ocr_text)
+    if computed is None:
+        return []
+    threshold = settings.NEAR_DUPLICATE_THRESHOLD if min_score is None else min_score
+    matches = await find_near_duplicates(computed[0], db, threshold, exclude_id=document_id)
+    if not matches:
+        return []
+
+    rows = await db.execute(
+        select(Document.id, Document.title, Document.document_date)
+        .where(Document.id.in_([doc_id for doc_id, _ in matches]))
+    )
+    info = {row.id: row for row in rows}
+    return [
+        NearDuplicateResponse(
+            id=doc_id, title=info[doc_id].title,
+            document_date=info[doc_id].document_date, score=round(score, 3),
+        )
+        for doc_id, score in matches if doc_id in info
+    ]
+
+
 @router.patch("/documents/{document_id}", response_model=DocumentResponse)
 async def update_document(
     document_id: str,
     update: DocumentUpdate,
     db: AsyncSession = Depends(get_db),
+    settings: Settings = Depends(get_settings),
 ) -> DocumentResponse:
     """Aktualisiert Metadaten eines Dokuments manuell."""
     result = await db.execute(
@@ -201,6 +277,10 @@ async def update_document(
     if document is None:
         raise HTTPException(status_code=404, detail="Dokument nicht gefunden")
 
+    old_view_path = None
+    if settings.BLOB_STORE_ENABLED:
+        old_view_path = await document_view_path(document, settings, db)
+
     changes = {}
     for field, value in update.model_dump(exclude_unset=True).items():
         old_value = getattr(document, field)
@@ -215,6 +295,8 @@ async def update_document(
             details=json.dumps(changes, ensure_ascii=False),
         )
         db.add(audit)
+        if changes.keys() & {"document_type", "document_date", "filing_scope_id"}:
+            await update_document_view(document, settings, db, old_view_path=old_view_path)
 
     return DocumentResponse.model_validate(document)
 
@@ -223,6 +305,7 @@ async def update_document(
 async def delete_document(
     document_id: str,
     db: AsyncSession = Depends(get_db),
+    settings: Settings = Depends(get_settings),
 ) -> dict:
     """Soft-Delete: Setzt Status auf DELETED."""
     result = await db.execute(
@@ -232,7 +315,12 @@ async def delete_document(
     if document is None:
         raise HTTPException(status_code=404, detail="Dokument nicht gefunden")
 
+    old_view_path = None
+    if settings.BLOB_STORE_ENABLED:
+        old_view_path = await document_view_path(document, settings, db)
     document.status = DocumentStatus.DELETED
+    # Blob bleibt erhalten (wiederherstellbar), nur der Link verschwindet
+    await update_document_view(document, settings, db, old_view_path=old_view_path)
     audit = AuditLog(
         document_id=document.id,
         action=AuditAction.DELETED,
@@ -335,22 +423,16 @@ async def add_tag_to_document(
 
     tag_name = tag_data.name.strip().lower()
 
-    # Tag holen oder erstellen
-    tag_result = await db.execute(select(Tag).where(Tag.name == tag_name))
-    tag = tag_result.scalar_one_or_none()
-    if not tag:
-        tag = Tag(name=tag_name, is_auto_generated=False)
-        db.add(tag)
-        await db.flush()
-
-    if tag not in document.tags:
-        document.tags.append(tag)
+    # Tag holen oder erstellen und verknuepfen (bestehende Verknuepfung bleibt)
+    tag_ids = await resolve_tag_ids([tag_name], db, auto_generated=False)
+    if tag_ids and await attach_tags(document.id, list(tag_ids.values()), db):
         audit = AuditLog(
             document_id=document.id,
             action=AuditAction.TAG_ADDED,
             details=json.dumps({"tag": tag_name}, ensure_ascii=False),
         )
         db.add(audit)
+        await db.refresh(document, ["tags"])
 
     return DocumentResponse.model_validate(document)
 
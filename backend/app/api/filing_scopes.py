@@ -11,6 +11,7 @@ from app.database import get_db
 from app.models.document import Document, DocumentStatus
 from app.models.filing_scope import FilingScope, generate_slug
 from app.schemas.filing_scope import FilingScopeCreate, FilingScopeResponse, FilingScopeUpdate
+from app.services.filing_scope_service import invalidate_filing_scopes
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["filing-scopes"])
@@ -87,7 +88,8 @@ async def create_filing_scope(
         color=data.color,
     )
     session.add(scope)
-    await session.flush()
+    await session.commit()
+    invalidate_filing_scopes()
     return _scope_to_response(scope)
 
 
@@ -142,7 +144,8 @@ async def update_filing_scope(
             raise HTTPException(400, "Es muss mindestens ein Standard-Ablagebereich existieren")
         scope.is_default = False
 
-    await session.flush()
+    await session.commit()
+    invalidate_filing_scopes()
     return _scope_to_response(scope)
 
 
@@ -186,5 +189,6 @@ async def delete_filing_scope(
         )
 
     await session.delete(scope)
-    await session.flush()
+    await session.commit()
+    invalidate_filing_scopes()
     return {"message": f"Ablagebereich '{scope.name}' geloescht"}
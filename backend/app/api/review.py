@@ -12,6 +12,7 @@ from app.models.document import Document, DocumentStatus, ReviewStatus
 from app.models.filing_scope import FilingScope
 from app.models.review_question import ReviewQuestion
 from app.models.correction_mapping import CorrectionMapping
+from app.services.filing_scope_service import invalidate_filing_scopes
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["review"])
@@ -131,6 +132,9 @@ async def answer_question(
             await _update_field_from_answer(doc, question.field_affected, answer, session)
 
     await session.commit()
+    if question.field_affected == "filing_scope" and answer.startswith("NEU: "):
+        # Die Antwort hat ggf. einen Ablagebereich angelegt
+        invalidate_filing_scopes()
 
     # Pruefen ob alle Fragen beantwortet
     all_q_result = await session.execute(
@@ -41,29 +41,46 @@ async def search(
     sort_order: str = "desc",
     page: int = Query(1, ge=1),
     page_size: int = Query(25, ge=1, le=100),
+    facets: bool = True,
+    cursor: str | None = None,
+    with_total: bool = True,
+    fuzzy: bool = False,
     db: AsyncSession = Depends(get_db),
 ) -> SearchResponse:
-    """Volltextsuche mit Metadatenfiltern und Facetten."""
-    result = await search_documents(
-        session=db,
-        query=q,
-        document_type=document_type,
-        date_from=date_from,
-        date_to=date_to,
-        amount_min=amount_min,
-        amount_max=amount_max,
-        issuer=issuer,
-        tax_relevant=tax_relevant,
-        tax_year=tax_year,
-        tax_category=tax_category,
-        tags=tags,
-        status=status,
-        filing_scope_id=filing_scope_id,
-        sort_by=sort_by,
-        sort_order=sort_order,
-        page=page,
-        page_size=page_size,
-    )
+    """Volltextsuche mit Metadatenfiltern und Facetten.
+
+    facets=false spart die Facettenberechnung (z.B. beim Blaettern).
+    cursor=<next_cursor> blaettert per Keyset weiter, with_total=false
+    verzichtet dabei auf die Gesamtzahl. fuzzy=true toleriert OCR-Fehler
+    (nur mit SEARCH_TRIGRAM_ENABLED).
+    """
+    try:
+        result = await search_documents(
+            session=db,
+            query=q,
+            document_type=document_type,
+            date_from=date_from,
+            date_to=date_to,
+            amount_min=amount_min,
+            amount_max=amount_max,
+            issuer=issuer,
+            tax_relevant=tax_relevant,
+            tax_year=tax_year,
+            tax_category=tax_category,
+            tags=tags,
+            status=status,
+            filing_scope_id=filing_scope_id,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            page=page,
+            page_size=page_size,
+            include_facets=facets,
+            cursor=cursor,
+            include_total=with_total,
+            fuzzy=fuzzy,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
     return SearchResponse(
         results=[SearchResultItem(**item) for item in result["results"]],
@@ -71,6 +88,7 @@ async def search(
         page=result["page"],
         page_size=result["page_size"],
         facets=SearchFacets(**result["facets"]),
+        next_cursor=result["next_cursor"],
     )
 
 
@@ -2,7 +2,7 @@
 
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import FileResponse
 from sqlalchemy import select, func, text
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -69,6 +69,45 @@ async def system_health(
     }
 
 
+@router.get("/system/analysis/stats")
+async def analysis_stats(settings: Settings = Depends(get_settings)):
+    """Kaskaden-Routing, Validierungsquote, Prompt-Eval-/Ladezeiten und Ollama-Hosts."""
+    from app.services.analysis_service import get_cascade_stats, get_structured_output_stats
+    from app.services.batch_analysis_service import get_batch_stats
+    from app.services.llm_service import get_model_residency_stats, get_prompt_eval_stats
+    from app.services.ollama_router_service import get_router
+    return {
+        "cascade": get_cascade_stats(),
+        "structured_output": get_structured_output_stats(),
+        "batch": get_batch_stats(),
+        "prompt_eval": get_prompt_eval_stats(),
+        "model_residency": get_model_residency_stats(),
+        "ollama_hosts": get_router(settings).status(),
+    }
+
+
+@router.get("/system/search/cache")
+async def search_cache_stats():
+    """Trefferquote, Eintraege und Verdraengungen des Suchcaches."""
+    from app.services.search_cache_service import get_search_cache_stats
+    return get_search_cache_stats()
+
+
+@router.get("/system/llm/telemetry")
+async def llm_telemetry(
+    hours: int = Query(24, ge=1),
+    template: str | None = None,
+    model: str | None = None,
+    job_id: str | None = None,
+    session: AsyncSession = Depends(get_db),
+):
+    """LLM-Aufrufe der letzten hours Stunden: p50/p95-Latenz, Tokens pro Sekunde, Ladeanteil."""
+    from app.services.llm_telemetry_service import get_llm_telemetry
+    return await get_llm_telemetry(
+        session, hours=hours, template=template, model=model, job_id=job_id,
+    )
+
+
 @router.post("/system/backup")
 async def create_backup_endpoint(
     full: bool = False,
@@ -108,6 +147,9 @@ async def optimize_db(session: AsyncSession = Depends(get_db)):
     """Datenbank optimieren (VACUUM)."""
     try:
         await session.execute(text("VACUUM"))
+        # VACUUM darf rowids neu vergeben, der FTS-Index ist daran gebunden
+        from app.services.search_service import rebuild_fts_index
+        await rebuild_fts_index(session)
         return {"message": "Datenbank optimiert"}
     except Exception:
         logger.exception("DB-Optimierung fehlgeschlagen")
@@ -116,11 +158,53 @@ async def optimize_db(session: AsyncSession = Depends(get_db)):
 
 @router.post("/system/maintenance/rebuild-index")
 async def rebuild_index(session: AsyncSession = Depends(get_db)):
-    """FTS5-Suchindex neu aufbauen."""
+    """FTS5-Suchindex und Vorschlagsindex neu aufbauen."""
     try:
         from app.services.search_service import rebuild_fts_index
+        from app.services.suggestion_service import rebuild_suggestion_index
         count = await rebuild_fts_index(session)
-        return {"message": f"Index fuer {count} Dokumente neu aufgebaut"}
+        await rebuild_suggestion_index(session)
+        return {"message": f"Index fuer {count} Dokumente neu aufgebaut", "count": count}
     except Exception:
         logger.exception("Index-Rebuild fehlgeschlagen")
         raise HTTPException(500, "Index-Rebuild fehlgeschlagen")
+
+
+@router.post("/system/maintenance/check-index")
+async def check_index(repair: bool = True, session: AsyncSession = Depends(get_db)):
+    """FTS5-Suchindex mit den Dokumenten abgleichen und abweichende Zeilen reparieren."""
+    try:
+        from app.services.search_service import check_fts_index
+        return await check_fts_index(session, repair=repair)
+    except Exception:
+        logger.exception("Index-Pruefung fehlgeschlagen")
+        raise HTTPException(500, "Index-Pruefung fehlgeschlagen")
+
+
+@router.post("/system/maintenance/rebuild-fingerprints")
+async def rebuild_fingerprints_endpoint(session: AsyncSession = Depends(get_db)):
+    """Text-Fingerabdruecke fuer die Duplikaterkennung neu berechnen."""
+    try:
+        from app.services.near_duplicate_service import rebuild_fingerprints
+        count = await rebuild_fingerprints(session)
+        return {"message": f"Fingerabdruecke fuer {count} Dokumente berechnet", "count": count}
+    except Exception:
+        logger.exception("Neuberechnung der Fingerabdruecke fehlgeschlagen")
+        raise HTTPException(500, "Neuberechnung der Fingerabdruecke fehlgeschlagen")
+
+
+@router.post("/system/maintenance/rebuild-archive-view")
+async def rebuild_archive_view_endpoint(
+    session: AsyncSession = Depends(get_db),
+    settings: Settings = Depends(get_settings),
+):
+    """Lesbare Ordnerstruktur der Blob-Ablage neu aufbauen."""
+    if not settings.BLOB_STORE_ENABLED:
+        raise HTTPException(400, "Blob-Ablage ist nicht aktiviert")
+    try:
+        from app.services.archive_service import rebuild_archive_view
+        stats = await rebuild_archive_view(session, settings)
+        return {"message": f"{stats['total']} Links geprueft", **stats}
+    except Exception:
+        logger.exception("Neuaufbau der Archiv-Ansicht fehlgeschlagen")
+        raise HTTPException(500, "Neuaufbau der Archiv-Ansicht fehlgeschlagen")
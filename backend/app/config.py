@@ -15,12 +15,39 @@ class Settings(BaseSettings):
     ARCHIVE_DIR: str = "./data/archive"
 
     OLLAMA_BASE_URL: str = "http://localhost:11434"
+    # Mehrere Ollama-Hosts (kommagetrennt); leer = nur OLLAMA_BASE_URL
+    OLLAMA_BASE_URLS: str = ""
+    OLLAMA_HEALTH_PROBE_INTERVAL: int = 15
     OLLAMA_MODEL: str = "llama3.2"
     OLLAMA_TIMEOUT: int = 120
     OLLAMA_MAX_RETRIES: int = 2
+    # Wie lange Ollama das Modell nach einem Aufruf im Speicher haelt
+    OLLAMA_KEEP_ALIVE: str = "30m"
+    OLLAMA_WARMUP_ENABLED: bool = True
+    OLLAMA_KEEPER_INTERVAL: int = 120
+    # Kleines, schnelles Modell fuer die erste Analysestufe (leer = keine Kaskade)
+    OLLAMA_FAST_MODEL: str = ""
+    # LLM-Telemetrie: Aufbewahrung der Einzelaufrufe in Tagen
+    LLM_TELEMETRY_RETENTION_DAYS: int = 30
 
     OCR_LANGUAGES: str = "deu+eng"
     CONFIDENCE_THRESHOLD: float = 0.7
+    # Token-Budget fuer den OCR-Text im Analyse-Prompt (~4 Zeichen pro Token)
+    ANALYSIS_TOKEN_BUDGET: int = 1000
+    # Map-Reduce-Analyse fuer lange Dokumente (Abschnitte parallel analysieren)
+    CHUNKED_ANALYSIS_ENABLED: bool = False
+    CHUNKED_ANALYSIS_MIN_CHARS: int = 12000
+    CHUNK_SIZE_CHARS: int = 4000
+    CHUNK_CONCURRENCY: int = 2
+    # Hoechstens so viele Abschnitte (LLM-Aufrufe) je Dokument; mehr werden gruppenweise verdichtet
+    CHUNK_MAX_COUNT: int = 12
+    # Micro-Batching: mehrere kurze Dokumente (z.B. Kassenbons) in einer LLM-Anfrage
+    BATCH_ANALYSIS_ENABLED: bool = False
+    BATCH_MAX_CHARS: int = 1500
+    BATCH_SIZE: int = 4
+    BATCH_WINDOW_SECONDS: float = 2.0
+    # Nur Dateien bis zu dieser Groesse werden gemeinsam uebernommen, groessere einzeln
+    BATCH_MAX_FILE_MB: int = 2
     MAX_OCR_PAGES: int = 10
 
     MAX_UPLOAD_SIZE_MB: int = 50
@@ -29,6 +56,19 @@ class Settings(BaseSettings):
     THUMBNAIL_MAX_SIZE: int = 300
     QUEUE_POLL_INTERVAL: int = 5
     MAX_RETRIES: int = 3
+    # Hash vor dem Archivieren erneut pruefen (liest die Datei ein zweites Mal)
+    VERIFY_FILE_HASH: bool = False
+    # Inhaltsadressierte Ablage (ARCHIVE_DIR/_blobs), Ordnerstruktur nur als Links
+    BLOB_STORE_ENABLED: bool = False
+    # Beinahe-Duplikate (aehnlicher OCR-Text) beim Archivieren markieren
+    NEAR_DUPLICATE_ENABLED: bool = True
+    NEAR_DUPLICATE_THRESHOLD: float = 0.8
+    # Ergebnisse von Suche/Vorschlaegen im Speicher (Anzahl Eintraege, 0 = aus)
+    SEARCH_CACHE_SIZE: int = 256
+    # Zweiter Suchindex mit Trigrammen (Teilwoerter, Nummern, OCR-Fehler); ca. 3x OCR-Text
+    SEARCH_TRIGRAM_ENABLED: bool = False
+    # Autocomplete-Index: geaenderte Begriffe alle n Sekunden nachziehen
+    SUGGESTION_SYNC_INTERVAL: int = 5
     LOG_LEVEL: str = "INFO"
 
     PIN_ENABLED: bool = False
@@ -39,6 +79,11 @@ class Settings(BaseSettings):
     def allowed_file_types_list(self) -> list[str]:
         return [ft.strip() for ft in self.ALLOWED_FILE_TYPES.split(",")]
 
+    @property
+    def ollama_base_urls_list(self) -> list[str]:
+        urls = [u.strip().rstrip("/") for u in self.OLLAMA_BASE_URLS.split(",") if u.strip()]
+        return urls or [self.OLLAMA_BASE_URL.rstrip("/")]
+
 
 @lru_cache
 def get_settings() -> Settings:
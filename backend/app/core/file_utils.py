@@ -1,5 +1,9 @@
+import hashlib
+import os
 import re
+import shutil
 import uuid
+from collections.abc import Callable
 from pathlib import Path
 
 # Magic Bytes fuer erlaubte Dateitypen
@@ -15,6 +19,9 @@ MAGIC_BYTES: dict[str, list[bytes]] = {
 # Maximale Laenge der zu pruefenden Bytes
 _MAX_MAGIC_LEN = max(len(sig) for sigs in MAGIC_BYTES.values() for sig in sigs)
 
+# Puffergroesse fuer Hashing und Kopieren (grosse Scans in wenigen Lesezugriffen)
+HASH_CHUNK_SIZE = 1024 * 1024
+
 
 def validate_magic_bytes(path: Path, ext: str) -> bool:
     """Prueft ob die Magic Bytes einer Datei zur Extension passen."""
@@ -56,3 +63,87 @@ def get_file_extension(name: str) -> str:
     """Gibt die Extension einer Datei in Kleinbuchstaben zurueck (ohne Punkt)."""
     ext = Path(name).suffix.lower().lstrip(".")
     return ext
+
+
+def compute_file_hash(path: Path) -> str:
+    """Berechnet den SHA-256 Hash einer Datei."""
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def copy_file_with_hash(src: Path, dest: Path) -> str:
+    """Kopiert eine Datei (inkl. Metadaten wie shutil.copy2) und hasht sie im selben Durchlauf.
+
+    Returns:
+        SHA-256 Hash des Inhalts.
+    """
+    sha256 = hashlib.sha256()
+    with open(src, "rb") as fin, open(dest, "wb") as fout:
+        while chunk := fin.read(HASH_CHUNK_SIZE):
+            sha256.update(chunk)
+            fout.write(chunk)
+    shutil.copystat(src, dest)
+    return sha256.hexdigest()
+
+
+def _fsync_dir(path: Path) -> None:
+    """Schreibt einen Verzeichniseintrag auf die Platte (nicht auf allen Systemen moeglich)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def move_file(
+    src: Path,
+    dest: Path,
+    progress: Callable[[int, int], None] | None = None,
+) -> None:
+    """Verschiebt eine Datei und legt das Zielverzeichnis bei Bedarf an.
+
+    Liegen Quelle und Ziel auf demselben Dateisystem, wird nur umbenannt.
+    Sonst wird in eine temporaere Datei neben dem Ziel kopiert, per fsync
+    gesichert, atomar umbenannt und erst danach die Quelle geloescht.
+
+    Blockierend - aus async-Code per asyncio.to_thread aufrufen.
+
+    Args:
+        progress: Wird beim Kopieren mit (kopierte_bytes, gesamt_bytes) aufgerufen.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if os.stat(src).st_dev == os.stat(dest.parent).st_dev:
+        try:
+            os.replace(src, dest)
+            return
+        except OSError:
+            # z.B. Bind-Mounts mit gleicher Geraete-ID: auf Kopieren ausweichen
+            pass
+
+    total = os.stat(src).st_size
+    tmp = dest.with_name(f".{dest.name}.partial")
+    copied = 0
+    try:
+        with open(src, "rb") as fin, open(tmp, "wb") as fout:
+            while chunk := fin.read(HASH_CHUNK_SIZE):
+                fout.write(chunk)
+                copied += len(chunk)
+                if progress:
+                    progress(copied, total)
+            fout.flush()
+            os.fsync(fout.fileno())
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _fsync_dir(dest.parent)
+    os.unlink(src)
@@ -0,0 +1,71 @@
+"""Keyset-Paginierung: Folgeseiten setzen hinter dem letzten Treffer an.
+
+Ein Cursor enthaelt Sortierwert und ID des letzten Dokuments einer Seite
+(als Base64-JSON, fuer Clients undurchsichtig). Statt OFFSET-Zeilen zu
+ueberspringen, filtert die Folgeabfrage auf "nach diesem Schluessel"; tiefe
+Seiten kosten so genauso viel wie die erste.
+"""
+
+import base64
+import binascii
+import json
+
+
+def encode_cursor(sort_key: str, value: str | int | float | None, doc_id: str) -> str:
+    """Cursor fuer die Seite nach dem Dokument doc_id mit Sortierwert value."""
+    payload = json.dumps({"s": sort_key, "v": value, "i": doc_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort_key: str) -> tuple[str | int | float | None, str]:
+    """Liest (Sortierwert, ID) aus einem Cursor.
+
+    Raises:
+        ValueError: Cursor defekt oder zu einer anderen Sortierung erstellt.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, doc_id = payload["v"], payload["i"]
+        matches = payload["s"] == sort_key
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Ungueltiger Cursor")
+    if not matches or not isinstance(doc_id, str):
+        raise ValueError("Cursor passt nicht zur Sortierung")
+    return value, doc_id
+
+
+def keyset_conditions(
+    column: str,
+    id_column: str,
+    descending: bool,
+    value: str | int | float | None,
+    doc_id: str,
+    nullable: bool = True,
+) -> list[tuple[str, dict]]:
+    """SQL-Bedingungen fuer "liegt in der Sortierung hinter (value, doc_id)".
+
+    Passend zu ORDER BY column DIR, id_column DIR. SQLite sortiert NULL als
+    kleinsten Wert: aufsteigend stehen NULL-Werte vorne, absteigend hinten.
+    Statt einer Bedingung mit OR (die keinen Indexbereich mehr nutzen kann)
+    kommen Teilbedingungen in Sortierreihenfolge zurueck; der Aufrufer fragt
+    sie nacheinander ab, bis die Seite voll ist.
+
+    Returns:
+        [(SQL-Fragment, Bind-Parameter)]
+    """
+    cmp = "<" if descending else ">"
+    if value is None:
+        parts = [(f"{column} IS NULL AND {id_column} {cmp} :cursor_id", {"cursor_id": doc_id})]
+        if not descending:
+            parts.append((f"{column} IS NOT NULL", {}))
+        return parts
+
+    # col <= v grenzt den Indexbereich ein, der Rest bricht Gleichstaende auf
+    parts = [(
+        f"{column} {cmp}= :cursor_value AND ({column} {cmp} :cursor_value OR {id_column} {cmp} :cursor_id)",
+        {"cursor_value": value, "cursor_id": doc_id},
+    )]
+    if descending and nullable:
+        parts.append((f"{column} IS NULL", {}))
+    return parts
@@ -0,0 +1,199 @@
+"""Deutsche Wortstaemme und Kompositazerlegung fuer den Suchindex.
+
+Der Stemmer folgt dem Snowball-Algorithmus fuer Deutsch (Variante mit
+ae/oe/ue als Umlaut, wie in OCR-Texten und Dateinamen ueblich). Komposita
+werden an bekannten Grundwoertern (Wortstamm-Vergleich, damit auch Plural
+und Fugen passen) und an Fugen nach -ungs, -heits usw. zerlegt.
+
+Dieselbe Analyse laeuft beim Indizieren (Spalte search_stems) und bei der
+Anfrage: "Versicherungen" und "Kfz-Versicherungsbeitrag" landen so beide
+bei "versicher".
+"""
+
+import re
+from functools import lru_cache
+
+_WORD_RE = re.compile(r"\w+")
+_VOWELS = frozenset("aeiouyäöü")
+_S_ENDING = frozenset("bdfghklmnrt")
+_ST_ENDING = frozenset("bdfghklmnt")
+# ue nach a/e/q ist kein Umlaut (Steuer, Dauer, Quelle)
+_UMLAUT_RE = re.compile(r"ae|oe|(?<![aeq])ue")
+_UMLAUTS = {"ae": "ä", "oe": "ö", "ue": "ü"}
+
+# Grundwoerter, die in Belegen und Vertraegen haeufig am Ende von Komposita stehen
+_HEADS = (
+    "abrechnung", "amt", "angebot", "anlage", "antrag", "arzt", "auftrag", "ausweis", "auszug",
+    "bank", "beitrag", "beleg", "bericht", "bescheid", "bescheinigung", "bestaetigung",
+    "bestellung", "betrag", "bon", "brief", "buch", "dienst", "erklaerung", "fahrzeug",
+    "gebuehr", "geld", "gehalt", "gericht", "gesellschaft", "haus", "heizung", "kasse",
+    "karte", "kauf", "konto", "kosten", "kuendigung", "lieferung", "lohn", "mahnung", "markt",
+    "miete", "nachweis", "nummer", "plan", "police", "praxis", "quittung", "rechnung",
+    "rente", "schaden", "schein", "schreiben", "schutz", "sicherung", "steuer", "strom",
+    "tarif", "urkunde", "verbrauch", "verein", "verfahren", "vergleich", "verkauf", "vertrag",
+    "verwaltung", "versicherung", "vollmacht", "wagen", "werk", "wohnung", "zahlung",
+    "zeugnis", "zins", "zulage", "zuschuss",
+)
+# Woerter, die nur zufaellig auf ein Grundwort enden (ins|ges|amt), auch als Wortende
+_NOT_COMPOUNDS = ("insgesamt", "allesamt", "mitsamt", "gesamt", "samt")
+# Fugen-s nach diesen Endungen markiert eine Kompositagrenze (Versicherungs|beitrag)
+_LINKING = ("ungs", "heits", "keits", "schafts", "tions", "taets", "itäts", "lings")
+MIN_MODIFIER = 4
+MIN_HEAD = 3
+
+
+def _regions(word: str) -> tuple[int, int]:
+    """R1 und R2 nach Snowball (R1 mit mindestens drei Zeichen davor)."""
+    def after_syllable(start: int) -> int:
+        for i in range(max(start, 1), len(word)):
+            if word[i] not in _VOWELS and word[i - 1] in _VOWELS:
+                return i + 1
+        return len(word)
+
+    r1 = after_syllable(1)
+    r2 = after_syllable(r1 + 1)
+    return max(r1, 3), r2
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Snowball-Stamm eines deutschen Wortes (klein, ohne Umlaute)."""
+    word = _UMLAUT_RE.sub(lambda m: _UMLAUTS[m.group(0)], word.lower().replace("ß", "ss"))
+    # u und y zwischen Vokalen gelten als Konsonanten
+    chars = list(word)
+    for i in range(1, len(chars) - 1):
+        if chars[i] in "uy" and chars[i - 1] in _VOWELS and chars[i + 1] in _VOWELS:
+            chars[i] = chars[i].upper()
+    word = "".join(chars)
+    r1, r2 = _regions(word)
+
+    # Schritt 1
+    for suffix in ("ern", "em", "er", "en", "es", "e", "s"):
+        if word.endswith(suffix):
+            if len(word) - len(suffix) >= r1:
+                if suffix == "s":
+                    if len(word) > 1 and word[-2] in _S_ENDING:
+                        word = word[:-1]
+                else:
+                    word = word[:-len(suffix)]
+                    if suffix in ("e", "en", "es") and word.endswith("niss"):
+                        word = word[:-1]
+            break
+
+    # Schritt 2
+    for suffix in ("est", "en", "er", "st"):
+        if word.endswith(suffix):
+            if len(word) - len(suffix) >= r1:
+                if suffix != "st":
+                    word = word[:-len(suffix)]
+                elif len(word) >= 6 and word[-3] in _ST_ENDING:
+                    word = word[:-2]
+            break
+
+    # Schritt 3: Ableitungssilben (nur in R2)
+    def in_r2(suffix: str) -> bool:
+        return word.endswith(suffix) and len(word) - len(suffix) >= r2
+
+    for suffix in ("heit", "lich", "keit", "isch", "end", "ung", "ig", "ik"):
+        if not word.endswith(suffix):
+            continue
+        if in_r2(suffix):
+            if suffix in ("end", "ung"):
+                word = word[:-len(suffix)]
+                if in_r2("ig") and not word.endswith("eig"):
+                    word = word[:-2]
+            elif suffix in ("ig", "ik", "isch"):
+                if not word[:-len(suffix)].endswith("e"):
+                    word = word[:-len(suffix)]
+            elif suffix in ("lich", "heit"):
+                word = word[:-len(suffix)]
+                if (word.endswith("er") or word.endswith("en")) and len(word) - 2 >= r1:
+                    word = word[:-2]
+            else:
+                word = word[:-len(suffix)]
+                for inner in ("lich", "ig"):
+                    if in_r2(inner):
+                        word = word[:-len(inner)]
+                        break
+        break
+
+    return word.lower().replace("ä", "a").replace("ö", "o").replace("ü", "u")
+
+
+_HEAD_STEMS = frozenset(stem(head) for head in _HEADS)
+
+
+def _strip_linking_s(modifier: str) -> str:
+    if modifier.endswith("s") and len(modifier) > MIN_MODIFIER:
+        base = modifier[:-1]
+        if base.endswith(tuple(link[:-1] for link in _LINKING)) or stem(base) in _HEAD_STEMS:
+            return base
+    return modifier
+
+
+@lru_cache(maxsize=65536)
+def split_compound(word: str) -> tuple[str, ...]:
+    """Zerlegt ein Kompositum in seine Teile (klein, ohne Fugen-s).
+
+    Das laengste bekannte Grundwort am Wortende gewinnt, der Rest wird
+    weiter zerlegt. Nicht zerlegbare Woerter kommen unveraendert zurueck.
+    """
+    word = word.lower()
+    if word in _NOT_COMPOUNDS:
+        return (word,)
+    # Kein Schnitt innerhalb eines Nicht-Kompositums am Wortende (Rechnungsbetrag|insgesamt)
+    protected = max(
+        (len(word) - len(tail) for tail in _NOT_COMPOUNDS if word.endswith(tail)),
+        default=len(word),
+    )
+    for i in range(MIN_MODIFIER, len(word) - MIN_HEAD + 1):
+        if i > protected:
+            break
+        modifier = word[:i]
+        if stem(word[i:]) in _HEAD_STEMS and _VOWELS.intersection(modifier):
+            return (*split_compound(_strip_linking_s(modifier)), word[i:])
+    for link in _LINKING:
+        pos = word.rfind(link, MIN_MODIFIER - len(link) + 1)
+        if pos > 0 and len(word) - pos - len(link) >= MIN_MODIFIER:
+            cut = pos + len(link)
+            return (*split_compound(word[:cut - 1]), *split_compound(word[cut:]))
+    return (word,)
+
+
+@lru_cache(maxsize=65536)
+def word_stems(word: str) -> tuple[str, ...]:
+    """Staemme eines Wortes; bei Komposita die Staemme der Teile."""
+    return tuple(dict.fromkeys(stem(part) for part in split_compound(word)))
+
+
+def _is_word(token: str) -> bool:
+    return len(token) >= 2 and token.isalpha()
+
+
+def analyze_text(*texts: str | None) -> str:
+    """Indexform fuer die Spalte search_stems: jeder Stamm einmal, leerzeichengetrennt.
+
+    Zahlen und Einzelzeichen fehlen, sie findet die Suche ueber die
+    Originalspalten.
+    """
+    stems: dict[str, None] = {}
+    for text in texts:
+        for token in _WORD_RE.findall(text or ""):
+            if _is_word(token):
+                stems.update(dict.fromkeys(word_stems(token.lower())))
+    return " ".join(stems)
+
+
+def query_stems(word: str) -> list[str]:
+    """Staemme eines Suchworts (z.B. "Kfz-Versicherung"), alle muessen treffen.
+
+    Enthaelt das Suchwort Teile ohne Stamm (Zahlen, Einzelzeichen wie in
+    "RE-2019"), kommt eine leere Liste zurueck: die Staemme allein waeren
+    unschaerfer als das Suchwort.
+    """
+    stems: dict[str, None] = {}
+    for token in _WORD_RE.findall(word):
+        if not _is_word(token):
+            return []
+        stems.update(dict.fromkeys(word_stems(token.lower())))
+    return list(stems)
@@ -55,6 +55,11 @@ async def lifespan(app: FastAPI):
         await ensure_fts_table(session)
     logger.info("FTS5-Index bereit")
 
+    # Prompt-Templates vorab laden
+    from app.services.llm_service import preload_prompt_templates
+
+    logger.info("%d Prompt-Templates geladen", preload_prompt_templates())
+
     # Background-Tasks starten
     background_tasks: list[asyncio.Task] = []
 
@@ -66,6 +71,25 @@ async def lifespan(app: FastAPI):
     )
     background_tasks.append(queue_task)
 
+    # Modell-Warm-up und Keep-Alive
+    if settings.OLLAMA_WARMUP_ENABLED:
+        from app.services.llm_service import warm_up_model
+        from app.services.queue_worker_service import run_model_keeper
+
+        warmup_task = asyncio.create_task(warm_up_model(settings))
+        background_tasks.append(warmup_task)
+
+        keeper_task = asyncio.create_task(
+            run_model_keeper(async_session_factory, settings)
+        )
+        background_tasks.append(keeper_task)
+
+    # Health-Probe fuer ausgefallene Ollama-Hosts
+    from app.services.ollama_router_service import run_ollama_health_probe
+
+    probe_task = asyncio.create_task(run_ollama_health_probe(settings))
+    background_tasks.append(probe_task)
+
     # Watch-Ordner
     from app.services.watch_folder_service import run_watch_folder
 
@@ -82,6 +106,14 @@ async def lifespan(app: FastAPI):
     )
     background_tasks.append(reminder_task)
 
+    # Autocomplete-Index nachziehen
+    from app.services.suggestion_service import run_suggestion_sync
+
+    suggestion_task = asyncio.create_task(
+        run_suggestion_sync(async_session_factory, settings)
+    )
+    background_tasks.append(suggestion_task)
+
     # Auto-Backup
     from app.services.backup_service import run_auto_backup
 
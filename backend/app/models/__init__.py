@@ -1,4 +1,5 @@
 from app.models.audit_log import AuditAction, AuditLog
+from app.models.blob import Blob
 from app.models.correction_mapping import CorrectionMapping
 from app.models.document import (
     Document,
@@ -10,23 +11,29 @@ from app.models.document import (
     TaxCategory,
 )
 from app.models.filing_scope import FilingScope
+from app.models.llm_call import LlmCall
 from app.models.notification import Notification, NotificationType
 from app.models.processing_job import JobSource, JobStatus, ProcessingJob
 from app.models.review_question import ReviewQuestion
 from app.models.saved_search import SavedSearch
+from app.models.text_fingerprint import DocumentFingerprint, FingerprintBucket
 from app.models.warranty_info import WarrantyInfo, WarrantyType
 
 __all__ = [
     "AuditAction",
     "AuditLog",
+    "Blob",
     "CorrectionMapping",
     "Document",
     "DocumentStatus",
+    "DocumentFingerprint",
     "DocumentTag",
     "DocumentType",
     "FilingScope",
+    "FingerprintBucket",
     "JobSource",
     "JobStatus",
+    "LlmCall",
     "Notification",
     "NotificationType",
     "ProcessingJob",
@@ -14,10 +14,13 @@ from sqlalchemy import (
     String,
     Text,
     UniqueConstraint,
+    event,
     func,
+    inspect,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.text_analysis import analyze_text
 from app.database import Base
 
 
@@ -121,6 +124,17 @@ class Document(Base):
     )
     ai_confidence: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
 
+    # Tag-Namen fuer den Volltextindex (tag_service.attach_tags, Trigger beim Entfernen)
+    tags_text: Mapped[str] = mapped_column(Text, nullable=False, default="", server_default="")
+    # Wortstaemme und Kompositateile fuer den Volltextindex, beim Speichern berechnet
+    search_stems: Mapped[str] = mapped_column(Text, nullable=False, default="", server_default="")
+
+    # Wahrscheinliches Duplikat (aehnlicher OCR-Text, anderer Datei-Hash)
+    near_duplicate_of_id: Mapped[str | None] = mapped_column(
+        String(36), ForeignKey("documents.id", ondelete="SET NULL"), nullable=True
+    )
+    near_duplicate_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -143,6 +157,27 @@ class Document(Base):
     filing_scope: Mapped["FilingScope | None"] = relationship(lazy="selectin")
 
 
+# Quellspalten von search_stems
+STEM_SOURCE_COLUMNS = ("title", "ocr_text", "issuer", "summary")
+
+
+def _update_stems(target: Document) -> None:
+    target.search_stems = analyze_text(*(getattr(target, name) for name in STEM_SOURCE_COLUMNS))
+
+
+@event.listens_for(Document, "before_insert")
+def _stems_on_insert(mapper, connection, target: Document) -> None:
+    _update_stems(target)
+
+
+@event.listens_for(Document, "before_update")
+def _stems_on_update(mapper, connection, target: Document) -> None:
+    # Statuswechsel u.ae. brauchen keine neue Analyse des OCR-Texts
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in STEM_SOURCE_COLUMNS):
+        _update_stems(target)
+
+
 class Tag(Base):
     __tablename__ = "tags"
 
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class LlmCall(Base):
+    """Telemetrie eines einzelnen LLM-Aufrufs (Zeiten von Ollama in Nanosekunden)."""
+
+    __tablename__ = "llm_calls"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_id: Mapped[str | None] = mapped_column(String(36), nullable=True, index=True)
+    template: Mapped[str | None] = mapped_column(String(100), nullable=True, index=True)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    host: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    success: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    latency_ms: Mapped[float] = mapped_column(Float, nullable=False)
+    prompt_eval_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    eval_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    load_duration_ns: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    prompt_eval_duration_ns: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    eval_duration_ns: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    total_duration_ns: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
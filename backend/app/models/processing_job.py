@@ -34,6 +34,8 @@ class ProcessingJob(Base):
     file_path: Mapped[str] = mapped_column(String(1000), nullable=False)
     file_type: Mapped[str] = mapped_column(String(10), nullable=False)
     file_size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    # SHA-256, einmalig beim Eingang berechnet
+    file_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
     source: Mapped[str] = mapped_column(
         Enum(JobSource, native_enum=False),
         nullable=False,
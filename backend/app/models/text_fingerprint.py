@@ -0,0 +1,27 @@
+from sqlalchemy import BigInteger, ForeignKey, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class DocumentFingerprint(Base):
+    """MinHash-Signatur des OCR-Texts eines Dokuments (Erkennung von Beinahe-Duplikaten)."""
+
+    __tablename__ = "document_fingerprints"
+
+    document_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True
+    )
+    signature: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    shingle_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class FingerprintBucket(Base):
+    """LSH-Bucket: ein Band der Signatur, gehasht auf eine Ganzzahl."""
+
+    __tablename__ = "fingerprint_buckets"
+
+    bucket: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    document_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
@@ -82,6 +82,8 @@ class DocumentResponse(BaseModel):
     scanned_at: datetime | None = None
     filing_scope_id: str | None = None
     filing_scope_name: str | None = None
+    near_duplicate_of_id: str | None = None
+    near_duplicate_score: float | None = None
     tags: list[TagResponse] = []
     warranty_info: WarrantyInfoResponse | None = None
     review_questions: list[ReviewQuestionResponse] = []
@@ -145,11 +147,20 @@ class DocumentListItem(BaseModel):
         return data
 
 
+class NearDuplicateResponse(BaseModel):
+    id: str
+    title: str
+    document_date: date | None = None
+    score: float
+
+
 class PaginatedDocumentsResponse(BaseModel):
     items: list[DocumentListItem]
-    total: int
+    # None, wenn mit with_total=false auf die Zaehlung verzichtet wurde
+    total: int | None
     page: int
     page_size: int
+    next_cursor: str | None = None
 
 
 class DocumentUpdate(BaseModel):
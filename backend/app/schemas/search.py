@@ -29,10 +29,12 @@ class SearchFacets(BaseModel):
 
 class SearchResponse(BaseModel):
     results: list[SearchResultItem]
-    total: int
+    # None, wenn beim Blaettern per Cursor auf die Zaehlung verzichtet wurde
+    total: int | None
     page: int
     page_size: int
     facets: SearchFacets
+    next_cursor: str | None = None
 
 
 class SuggestResponse(BaseModel):
@@ -1,11 +1,20 @@
+import asyncio
 import json
 import logging
-from dataclasses import dataclass, field
+import time
+import types
+import typing
+from dataclasses import dataclass, field, fields
+from datetime import date
 from pathlib import Path
 
 from app.config import Settings
-from app.services.llm_service import call_llm, load_prompt_template
+from app.services.llm_service import call_llm, get_prompt_template
 from app.services.ocr_service import OcrResult, extract_text
+from app.services.text_budget_service import CHARS_PER_TOKEN, select_relevant_text, split_into_chunks
+
+if typing.TYPE_CHECKING:
+    from app.services.batch_analysis_service import AnalysisBatcher
 
 logger = logging.getLogger("zettelwirtschaft.analysis")
 
@@ -74,12 +83,87 @@ class AnalysisResult:
         }
 
 
-def _truncate_text(text: str, max_chars: int = 4000) -> str:
-    """Kuerzt langen OCR-Text: erste 2000 + letzte 2000 Zeichen."""
-    if len(text) <= max_chars:
-        return text
-    half = max_chars // 2
-    return text[:half] + "\n\n[...Text gekuerzt...]\n\n" + text[-half:]
+@dataclass
+class CascadeStats:
+    """Routing-Statistik der Modell-Kaskade (prozessweit, seit Start)."""
+
+    fast_accepted: int = 0
+    escalated_low_confidence: int = 0
+    escalated_invalid: int = 0
+    fast_calls: int = 0
+    fast_seconds: float = 0.0
+    large_calls: int = 0
+    large_seconds: float = 0.0
+
+    def record(self, tier: str, seconds: float) -> None:
+        if tier == "fast":
+            self.fast_calls += 1
+            self.fast_seconds += seconds
+        else:
+            self.large_calls += 1
+            self.large_seconds += seconds
+
+    def to_dict(self) -> dict:
+        escalated = self.escalated_low_confidence + self.escalated_invalid
+        routed = self.fast_accepted + escalated
+        return {
+            "fast_accepted": self.fast_accepted,
+            "escalated_low_confidence": self.escalated_low_confidence,
+            "escalated_invalid": self.escalated_invalid,
+            "escalation_rate": escalated / routed if routed else 0.0,
+            "fast_calls": self.fast_calls,
+            "fast_avg_seconds": self.fast_seconds / self.fast_calls if self.fast_calls else 0.0,
+            "large_calls": self.large_calls,
+            "large_avg_seconds": self.large_seconds / self.large_calls if self.large_calls else 0.0,
+        }
+
+
+cascade_stats = CascadeStats()
+
+
+def get_cascade_stats() -> dict:
+    """Gibt die aktuelle Routing-Statistik der Modell-Kaskade zurueck."""
+    return cascade_stats.to_dict()
+
+
+@dataclass
+class StructuredOutputStats:
+    """Statistik zur Validierung der LLM-Antworten (prozessweit, seit Start).
+
+    analyses und valid_first_try zaehlen je Dokument (valid_first_try: die
+    erste Antwort war ohne Reparatur gueltig), die uebrigen Werte je LLM-Aufruf.
+    """
+
+    analyses: int = 0
+    valid_first_try: int = 0
+    invalid_json: int = 0
+    repair_attempts: int = 0
+    repaired: int = 0
+    sequential_fallbacks: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "analyses": self.analyses,
+            "valid_first_try": self.valid_first_try,
+            "invalid_json": self.invalid_json,
+            "repair_attempts": self.repair_attempts,
+            "repaired": self.repaired,
+            "sequential_fallbacks": self.sequential_fallbacks,
+            "valid_first_try_rate": (
+                self.valid_first_try / self.analyses if self.analyses else 0.0
+            ),
+            "fallback_rate": (
+                self.sequential_fallbacks / self.analyses if self.analyses else 0.0
+            ),
+        }
+
+
+structured_output_stats = StructuredOutputStats()
+
+
+def get_structured_output_stats() -> dict:
+    """Gibt die aktuelle Validierungs-Statistik der LLM-Antworten zurueck."""
+    return structured_output_stats.to_dict()
 
 
 def _parse_analysis_json(raw: str) -> dict | None:
@@ -111,6 +195,138 @@ def _parse_analysis_json(raw: str) -> dict | None:
     return None
 
 
+_REPAIR_INSTRUCTION = (
+    "Deine vorherige Antwort enthielt ungueltige Werte fuer folgende Felder: {fields}.\n"
+    "Antworte ausschliesslich mit einem JSON-Objekt, das nur diese Felder enthaelt."
+)
+
+
+def _field_types() -> dict[str, tuple[type, bool]]:
+    """Liefert (Basistyp, nullable) je Feld von AnalysisResult."""
+    hints = typing.get_type_hints(AnalysisResult)
+    result = {}
+    for f in fields(AnalysisResult):
+        hint = hints[f.name]
+        nullable = False
+        if isinstance(hint, types.UnionType) or typing.get_origin(hint) is typing.Union:
+            args = [a for a in typing.get_args(hint) if a is not type(None)]
+            nullable = len(args) < len(typing.get_args(hint))
+            hint = args[0]
+        result[f.name] = (typing.get_origin(hint) or hint, nullable)
+    return result
+
+
+_FIELD_TYPES = _field_types()
+
+# Felder mit Wertebereich 0..1
+_UNIT_INTERVAL_FIELDS = ("confidence", "filing_scope_confidence")
+
+_JSON_TYPES = {
+    str: "string",
+    float: "number",
+    int: "integer",
+    bool: "boolean",
+    list: "array",
+    dict: "object",
+}
+
+
+def _analysis_schema(only: list[str] | None = None) -> dict:
+    """Leitet ein JSON-Schema aus AnalysisResult ab (optional nur fuer einzelne Felder)."""
+    properties = {}
+    for name, (base, nullable) in _FIELD_TYPES.items():
+        if only is not None and name not in only:
+            continue
+        json_type = _JSON_TYPES[base]
+        prop: dict = {"type": [json_type, "null"] if nullable else json_type}
+        if name == "document_type":
+            prop["enum"] = sorted(VALID_DOCUMENT_TYPES)
+        elif base is list:
+            prop["items"] = {"type": "string"}
+        elif name in _UNIT_INTERVAL_FIELDS:
+            prop["minimum"] = 0.0
+            prop["maximum"] = 1.0
+        properties[name] = prop
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+    }
+
+
+ANALYSIS_SCHEMA = _analysis_schema()
+
+
+def _coerce_field(name: str, value):
+    """Prueft/konvertiert einen einzelnen Feldwert. Wirft ValueError bei ungueltigem Wert."""
+    base, nullable = _FIELD_TYPES[name]
+    if value is None:
+        if nullable:
+            return None
+        raise ValueError(name)
+
+    if base is bool:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.lower() in ("true", "false"):
+            return value.lower() == "true"
+        raise ValueError(name)
+    if base is float:
+        if isinstance(value, bool):
+            raise ValueError(name)
+        if isinstance(value, str):
+            value = value.replace(",", ".").strip()
+        value = float(value)
+        # Auch NaN faellt durch
+        if name in _UNIT_INTERVAL_FIELDS and not 0.0 <= value <= 1.0:
+            raise ValueError(name)
+        return value
+    if base is int:
+        if isinstance(value, bool):
+            raise ValueError(name)
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError(name)
+        return int(value)
+    if base is str:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        if not isinstance(value, str):
+            raise ValueError(name)
+        if name == "document_type" and value not in VALID_DOCUMENT_TYPES:
+            raise ValueError(name)
+        if name == "document_date":
+            date.fromisoformat(value)
+        return value
+    if base is list:
+        if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+            raise ValueError(name)
+        return value
+    if base is dict:
+        if not isinstance(value, dict):
+            raise ValueError(name)
+        return value
+    raise ValueError(name)
+
+
+def _validate_analysis_data(data: dict) -> tuple[dict, list[str]]:
+    """Typisierte Pruefung der LLM-Antwort gegen AnalysisResult.
+
+    Returns:
+        Tuple aus (gueltige Felder mit konvertierten Werten, Namen ungueltiger Felder).
+        Fehlende Felder (oder null bei Feldern mit Default) gelten nicht als ungueltig.
+    """
+    valid: dict = {}
+    invalid: list[str] = []
+    for name, (_, nullable) in _FIELD_TYPES.items():
+        if name not in data or (data[name] is None and not nullable):
+            continue
+        try:
+            valid[name] = _coerce_field(name, data[name])
+        except (ValueError, TypeError):
+            invalid.append(name)
+    return valid, invalid
+
+
 def _build_result_from_combined(data: dict, confidence_threshold: float) -> AnalysisResult:
     """Baut AnalysisResult aus der kombinierten LLM-Antwort."""
     doc_type = data.get("document_type", "SONSTIGES")
@@ -155,7 +371,8 @@ def _format_filing_scopes(filing_scopes: list[dict] | None) -> str:
     if not filing_scopes:
         return "Keine Ablagebereiche konfiguriert."
     lines = ["Verfuegbare Ablagebereiche:"]
-    for scope in filing_scopes:
+    # Feste Reihenfolge, damit der Prompt-Prefix ueber Dokumente hinweg identisch bleibt
+    for scope in sorted(filing_scopes, key=lambda s: s["name"]):
         keywords = scope.get("keywords", [])
         kw_str = f" (Schluesselwoerter: {', '.join(keywords)})" if keywords else ""
         lines.append(f"  - \"{scope['name']}\"{kw_str}")
@@ -166,28 +383,331 @@ async def _try_combined_analysis(
     ocr_text: str,
     settings: Settings,
     filing_scopes: list[dict] | None = None,
+    model: str | None = None,
+    first_try: bool = True,
 ) -> AnalysisResult | None:
-    """Versucht die kombinierte Analyse mit einem einzigen LLM-Aufruf."""
+    """Versucht die kombinierte Analyse mit einem einzigen LLM-Aufruf.
+
+    first_try: erste Antwort fuer das Dokument (zaehlt fuer valid_first_try).
+    """
     try:
-        template = load_prompt_template("analyze_document.txt")
+        template = get_prompt_template("analyze_document.txt")
     except FileNotFoundError:
         logger.error("Kombiniertes Prompt-Template nicht gefunden")
         return None
 
-    prompt = template.replace("{ocr_text}", ocr_text)
-    prompt = prompt.replace("{filing_scopes}", _format_filing_scopes(filing_scopes))
-    raw_response = await call_llm(prompt, settings)
+    # Statische Anweisungen + Ablagebereiche als stabiler System-Prefix,
+    # nur der Dokumenttext variiert im User-Prompt.
+    system_prompt, prompt = template.render(
+        ocr_text, filing_scopes=_format_filing_scopes(filing_scopes),
+    )
+    raw_response = await call_llm(
+        prompt, settings, system_prompt=system_prompt, model=model, schema=ANALYSIS_SCHEMA,
+        template=template.name,
+    )
     if not raw_response:
         return None
 
     data = _parse_analysis_json(raw_response)
-    if not data:
+    if not isinstance(data, dict):
+        structured_output_stats.invalid_json += 1
         logger.warning("Kombinierte Analyse: JSON konnte nicht geparst werden")
         return None
 
+    data, invalid_fields = _validate_analysis_data(data)
+    if invalid_fields:
+        data.update(
+            await _repair_fields(system_prompt, prompt, invalid_fields, settings, model)
+        )
+    elif first_try:
+        structured_output_stats.valid_first_try += 1
+
     return _build_result_from_combined(data, settings.CONFIDENCE_THRESHOLD)
 
 
+async def _repair_fields(
+    system_prompt: str,
+    prompt: str,
+    invalid_fields: list[str],
+    settings: Settings,
+    model: str | None = None,
+) -> dict:
+    """Fragt nur die ungueltigen Felder erneut ab (ein Versuch).
+
+    Returns:
+        Die reparierten, gueltigen Felder (leer wenn die Reparatur scheitert).
+    """
+    structured_output_stats.repair_attempts += 1
+    logger.info("Ungueltige Felder in LLM-Antwort, frage erneut ab: %s", ", ".join(invalid_fields))
+
+    repair_prompt = prompt + "\n\n" + _REPAIR_INSTRUCTION.format(fields=", ".join(invalid_fields))
+    raw = await call_llm(
+        repair_prompt,
+        settings,
+        system_prompt=system_prompt,
+        model=model,
+        schema=_analysis_schema(invalid_fields),
+        template="repair_fields",
+    )
+    data = _parse_analysis_json(raw) if raw else None
+    if not isinstance(data, dict):
+        return {}
+
+    repaired, still_invalid = _validate_analysis_data(
+        {k: v for k, v in data.items() if k in invalid_fields}
+    )
+    if repaired and not still_invalid:
+        structured_output_stats.repaired += 1
+    return repaired
+
+
+async def _try_cascade_analysis(
+    ocr_text: str,
+    settings: Settings,
+    filing_scopes: list[dict] | None = None,
+    first_try: bool = True,
+) -> AnalysisResult | None:
+    """Kombinierte Analyse als Modell-Kaskade.
+
+    Zuerst analysiert das schnelle Modell (OLLAMA_FAST_MODEL). Nur wenn dessen
+    Konfidenz unter CONFIDENCE_THRESHOLD liegt oder die Antwort kein gueltiges
+    JSON ist, wird mit OLLAMA_MODEL erneut analysiert. Ohne OLLAMA_FAST_MODEL
+    entspricht das der einfachen kombinierten Analyse.
+
+    first_try: False, wenn fuer das Dokument schon eine Antwort vorlag (Batch).
+    """
+    fast_model = settings.OLLAMA_FAST_MODEL
+    if not fast_model or fast_model == settings.OLLAMA_MODEL:
+        return await _try_combined_analysis(ocr_text, settings, filing_scopes, first_try=first_try)
+
+    start = time.monotonic()
+    fast_result = await _try_combined_analysis(
+        ocr_text, settings, filing_scopes, model=fast_model, first_try=first_try,
+    )
+    cascade_stats.record("fast", time.monotonic() - start)
+
+    if fast_result and fast_result.confidence >= settings.CONFIDENCE_THRESHOLD:
+        cascade_stats.fast_accepted += 1
+        return fast_result
+
+    if fast_result:
+        cascade_stats.escalated_low_confidence += 1
+        logger.info(
+            "Kaskade: %s unsicher (Konfidenz %.1f%%), eskaliere zu %s",
+            fast_model, fast_result.confidence * 100, settings.OLLAMA_MODEL,
+        )
+    else:
+        cascade_stats.escalated_invalid += 1
+        logger.info(
+            "Kaskade: %s ohne gueltige Antwort, eskaliere zu %s",
+            fast_model, settings.OLLAMA_MODEL,
+        )
+
+    start = time.monotonic()
+    # Zweite Antwort fuer dasselbe Dokument, zaehlt nicht als erster Versuch
+    large_result = await _try_combined_analysis(
+        ocr_text, settings, filing_scopes, model=settings.OLLAMA_MODEL, first_try=False,
+    )
+    cascade_stats.record("large", time.monotonic() - start)
+
+    # Unsicheres Ergebnis des kleinen Modells ist besser als gar keins
+    return large_result or fast_result
+
+
+# Felder, die pro Abschnitt extrahiert werden (ohne Review-Felder)
+CHUNK_FIELDS = [
+    "document_type",
+    "confidence",
+    "title",
+    "sender",
+    "recipient",
+    "document_date",
+    "amount",
+    "currency",
+    "reference_number",
+    "tags",
+    "summary",
+    "tax_relevant",
+    "tax_category",
+    "tax_year",
+    "warranty_info",
+    "filing_scope",
+    "filing_scope_confidence",
+]
+
+_CHUNK_SCHEMA = _analysis_schema(CHUNK_FIELDS)
+
+# Skalare Felder: erster Abschnitt mit Wert gewinnt (Dokumentkopf zuerst)
+_FIRST_VALUE_FIELDS = [
+    "title",
+    "sender",
+    "recipient",
+    "document_date",
+    "amount",
+    "currency",
+    "reference_number",
+    "summary",
+    "tax_category",
+    "tax_year",
+]
+
+_MAX_MERGED_TAGS = 10
+
+
+def _weighted_vote(
+    partials: list[dict], field: str, weight: str, ignore: str | None = None,
+) -> tuple[str | None, float]:
+    """Wert mit der hoechsten Summe der Konfidenzen (ignore nur, wenn nichts anderes).
+
+    Bei Gleichstand gewinnt der fruehere Abschnitt. Returns: (Wert, mittlere
+    Konfidenz der Abschnitte mit diesem Wert).
+    """
+    votes: dict[str, float] = {}
+    first_seen: dict[str, int] = {}
+    for i, data in enumerate(partials):
+        value = data.get(field)
+        if not value:
+            continue
+        votes[value] = votes.get(value, 0.0) + data.get(weight, 0.0)
+        first_seen.setdefault(value, i)
+
+    candidates = {v: w for v, w in votes.items() if v != ignore} or votes
+    if not candidates:
+        return None, 0.0
+    winner = min(candidates, key=lambda v: (-candidates[v], first_seen[v]))
+    confidences = [d.get(weight, 0.0) for d in partials if d.get(field) == winner]
+    return winner, sum(confidences) / len(confidences)
+
+
+def _merge_chunk_results(partials: list[dict]) -> dict:
+    """Fuehrt Abschnittsergebnisse deterministisch zusammen.
+
+    - document_type: nach Konfidenz gewichtete Mehrheit (SONSTIGES nur wenn nichts anderes),
+      bei Gleichstand gewinnt der fruehere Abschnitt
+    - confidence: Mittelwert der Abschnitte, die fuer den gewaehlten Typ stimmen
+    - Skalare Felder: erster Abschnitt mit Wert
+    - tags: Vereinigung in Abschnittsreihenfolge
+    - tax_relevant: wenn ein Abschnitt steuerrelevant ist
+    - warranty_info: erster Abschnitt mit has_warranty
+    - filing_scope: wie document_type nach filing_scope_confidence gewichtet,
+      nur Abschnitte mit Zuordnung stimmen ab
+    """
+    merged: dict = {}
+    doc_type, confidence = _weighted_vote(partials, "document_type", "confidence", ignore="SONSTIGES")
+    if doc_type is not None:
+        merged["document_type"] = doc_type
+        merged["confidence"] = confidence
+    scope, scope_confidence = _weighted_vote(partials, "filing_scope", "filing_scope_confidence")
+    if scope is not None:
+        merged["filing_scope"] = scope
+        merged["filing_scope_confidence"] = scope_confidence
+
+    for name in _FIRST_VALUE_FIELDS:
+        for data in partials:
+            if data.get(name) is not None:
+                merged[name] = data[name]
+                break
+
+    tags: list[str] = []
+    for data in partials:
+        for tag in data.get("tags", []):
+            if tag.lower() not in (t.lower() for t in tags):
+                tags.append(tag)
+    merged["tags"] = tags[:_MAX_MERGED_TAGS]
+
+    merged["tax_relevant"] = any(d.get("tax_relevant") for d in partials)
+
+    for data in partials:
+        warranty = data.get("warranty_info")
+        if isinstance(warranty, dict) and warranty.get("has_warranty"):
+            merged["warranty_info"] = warranty
+            break
+
+    return merged
+
+
+async def _analyze_chunk(
+    chunk: str,
+    settings: Settings,
+    semaphore: asyncio.Semaphore,
+    filing_scopes: str,
+) -> dict | None:
+    """Extrahiert die Felder eines einzelnen Abschnitts."""
+    template = get_prompt_template("extract_chunk.txt")
+    system_prompt, prompt = template.render(chunk, filing_scopes=filing_scopes)
+    async with semaphore:
+        raw = await call_llm(
+            prompt, settings, system_prompt=system_prompt, schema=_CHUNK_SCHEMA,
+            template=template.name,
+        )
+    data = _parse_analysis_json(raw) if raw else None
+    if not isinstance(data, dict):
+        return None
+    valid, _ = _validate_analysis_data({k: v for k, v in data.items() if k in CHUNK_FIELDS})
+    return valid
+
+
+def _condense_chunks(chunks: list[str], max_count: int, chunk_chars: int) -> list[str]:
+    """Fasst benachbarte Abschnitte zu hoechstens max_count Gruppen zusammen.
+
+    Jede Gruppe wird auf die relevantesten Zeilen (select_relevant_text) in
+    Abschnittsgroesse verdichtet: kein Teil des Dokuments faellt ganz weg,
+    die Zahl der LLM-Aufrufe bleibt begrenzt.
+    """
+    max_count = max(1, max_count)
+    if len(chunks) <= max_count:
+        return chunks
+    bounds = [round(i * len(chunks) / max_count) for i in range(max_count + 1)]
+    budget = max(1, chunk_chars // CHARS_PER_TOKEN)
+    return [
+        select_relevant_text("\n".join(chunks[start:end]), budget)
+        for start, end in zip(bounds, bounds[1:])
+    ]
+
+
+async def _try_chunked_analysis(
+    ocr_text: str,
+    settings: Settings,
+    filing_scopes: list[dict] | None = None,
+) -> AnalysisResult | None:
+    """Map-Reduce-Analyse fuer lange Dokumente.
+
+    Der vollstaendige Text wird in Abschnitte geteilt, die mit einem kleinen
+    Extraktions-Prompt nebenlaeufig analysiert werden (hoechstens
+    CHUNK_CONCURRENCY gleichzeitig). Mehr als CHUNK_MAX_COUNT Abschnitte
+    werden gruppenweise verdichtet statt ausgelassen. Die Teilergebnisse
+    werden anschliessend deterministisch zu einem AnalysisResult
+    zusammengefuehrt.
+    """
+    all_chunks = split_into_chunks(ocr_text, settings.CHUNK_SIZE_CHARS)
+    chunks = _condense_chunks(all_chunks, settings.CHUNK_MAX_COUNT, settings.CHUNK_SIZE_CHARS)
+    semaphore = asyncio.Semaphore(max(1, settings.CHUNK_CONCURRENCY))
+    logger.info(
+        "Chunk-Analyse: %d Abschnitte (aus %d), max. %d parallel",
+        len(chunks), len(all_chunks), settings.CHUNK_CONCURRENCY,
+    )
+
+    scopes_text = _format_filing_scopes(filing_scopes)
+    results = await asyncio.gather(
+        *(_analyze_chunk(chunk, settings, semaphore, scopes_text) for chunk in chunks),
+        return_exceptions=True,
+    )
+    partials = [r for r in results if isinstance(r, dict) and r]
+    if not partials:
+        return None
+
+    merged = _merge_chunk_results(partials)
+    if len(partials) == len(chunks):
+        structured_output_stats.valid_first_try += 1
+    else:
+        merged["needs_review"] = True
+        merged["review_questions"] = [
+            f"{len(chunks) - len(partials)} von {len(chunks)} Abschnitten konnten nicht "
+            "analysiert werden. Bitte pruefen Sie die erkannten Daten."
+        ]
+    return _build_result_from_combined(merged, settings.CONFIDENCE_THRESHOLD)
+
+
 async def _try_sequential_analysis(
     ocr_text: str,
     settings: Settings,
@@ -197,9 +717,8 @@ async def _try_sequential_analysis(
 
     # 1. Klassifikation
     try:
-        template = load_prompt_template("classify_document.txt")
-        prompt = template.replace("{ocr_text}", ocr_text)
-        raw = await call_llm(prompt, settings)
+        system_prompt, prompt = get_prompt_template("classify_document.txt").render(ocr_text)
+        raw = await call_llm(prompt, settings, system_prompt=system_prompt, template="classify_document.txt")
         if raw:
             data = _parse_analysis_json(raw)
             if data:
@@ -212,9 +731,8 @@ async def _try_sequential_analysis(
 
     # 2. Metadaten
     try:
-        template = load_prompt_template("extract_metadata.txt")
-        prompt = template.replace("{ocr_text}", ocr_text)
-        raw = await call_llm(prompt, settings)
+        system_prompt, prompt = get_prompt_template("extract_metadata.txt").render(ocr_text)
+        raw = await call_llm(prompt, settings, system_prompt=system_prompt, template="extract_metadata.txt")
         if raw:
             data = _parse_analysis_json(raw)
             if data:
@@ -232,9 +750,8 @@ async def _try_sequential_analysis(
 
     # 3. Steuerrelevanz
     try:
-        template = load_prompt_template("assess_tax_relevance.txt")
-        prompt = template.replace("{ocr_text}", ocr_text)
-        raw = await call_llm(prompt, settings)
+        system_prompt, prompt = get_prompt_template("assess_tax_relevance.txt").render(ocr_text)
+        raw = await call_llm(prompt, settings, system_prompt=system_prompt, template="assess_tax_relevance.txt")
         if raw:
             data = _parse_analysis_json(raw)
             if data:
@@ -246,9 +763,8 @@ async def _try_sequential_analysis(
 
     # 4. Garantie-Info
     try:
-        template = load_prompt_template("extract_warranty_info.txt")
-        prompt = template.replace("{ocr_text}", ocr_text)
-        raw = await call_llm(prompt, settings)
+        system_prompt, prompt = get_prompt_template("extract_warranty_info.txt").render(ocr_text)
+        raw = await call_llm(prompt, settings, system_prompt=system_prompt, template="extract_warranty_info.txt")
         if raw:
             data = _parse_analysis_json(raw)
             if data:
@@ -268,15 +784,20 @@ async def analyze_document(
     file_type: str,
     settings: Settings,
     filing_scopes: list[dict] | None = None,
+    batcher: "AnalysisBatcher | None" = None,
 ) -> tuple[OcrResult | None, AnalysisResult | None]:
     """Fuehrt die vollstaendige Dokumentenanalyse durch.
 
-    Pipeline: OCR -> Text kuerzen -> LLM-Analyse (kombiniert, Fallback sequentiell)
+    Pipeline: OCR -> Textauswahl -> LLM-Analyse (kombiniert mit optionaler
+    Modell-Kaskade, Fallback sequentiell)
 
     Args:
         file_path: Pfad zur Dokumentdatei.
         file_type: Dateityp (pdf, jpg, etc.).
         settings: App-Konfiguration.
+        filing_scopes: Ablagebereiche fuer die Zuordnung.
+        batcher: Optionaler Micro-Batcher; kurze Dokumente werden darueber
+            gemeinsam mit anderen analysiert.
 
     Returns:
         Tuple aus (OcrResult, AnalysisResult).
@@ -291,16 +812,38 @@ async def analyze_document(
             review_questions=["OCR konnte keinen Text extrahieren. Bitte Dokument manuell pruefen."],
         )
 
-    # 2. Text kuerzen fuer LLM
-    truncated_text = _truncate_text(ocr_result.full_text)
+    structured_output_stats.analyses += 1
+
+    # 2a. Sehr lange Dokumente: optionale Map-Reduce-Analyse ueber den Volltext
+    chunked = (
+        settings.CHUNKED_ANALYSIS_ENABLED
+        and len(ocr_result.full_text) > settings.CHUNKED_ANALYSIS_MIN_CHARS
+    )
+    if chunked:
+        analysis = await _try_chunked_analysis(ocr_result.full_text, settings, filing_scopes)
+        if analysis:
+            logger.info(
+                "Chunk-Analyse erfolgreich: Typ=%s, Konfidenz=%.1f%%",
+                analysis.document_type,
+                analysis.confidence * 100,
+            )
+            return ocr_result, analysis
+        logger.info("Chunk-Analyse fehlgeschlagen, nutze Einzelanalyse")
+
+    # 2. Relevante Textteile fuer LLM auswaehlen
+    selected_text = select_relevant_text(ocr_result.full_text, settings.ANALYSIS_TOKEN_BUDGET)
     logger.info(
-        "OCR abgeschlossen: %d Zeichen (gekuerzt: %d), starte LLM-Analyse...",
+        "OCR abgeschlossen: %d Zeichen (ausgewaehlt: %d), starte LLM-Analyse...",
         len(ocr_result.full_text),
-        len(truncated_text),
+        len(selected_text),
     )
 
-    # 3. Kombinierte Analyse (Primaerstrategie)
-    analysis = await _try_combined_analysis(truncated_text, settings, filing_scopes)
+    # 3. Kombinierte Analyse (Primaerstrategie); nach gescheiterter
+    # Chunk-Analyse zaehlt sie nicht mehr als erster Versuch
+    if batcher is not None and len(ocr_result.full_text) <= settings.BATCH_MAX_CHARS:
+        analysis = await batcher.submit(selected_text)
+    else:
+        analysis = await _try_cascade_analysis(selected_text, settings, filing_scopes, first_try=not chunked)
     if analysis:
         logger.info(
             "Kombinierte Analyse erfolgreich: Typ=%s, Konfidenz=%.1f%%",
@@ -311,7 +854,8 @@ async def analyze_document(
 
     # 4. Fallback: Sequentielle Analyse
     logger.info("Kombinierte Analyse fehlgeschlagen, versuche sequentielle Analyse...")
-    analysis = await _try_sequential_analysis(truncated_text, settings)
+    structured_output_stats.sequential_fallbacks += 1
+    analysis = await _try_sequential_analysis(selected_text, settings)
     if analysis:
         logger.info(
             "Sequentielle Analyse erfolgreich: Typ=%s",
@@ -1,7 +1,7 @@
-import hashlib
+import asyncio
 import json
 import logging
-import shutil
+import os
 from datetime import date, datetime, timezone
 from pathlib import Path
 
@@ -9,26 +9,28 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import Settings
+from app.core.file_utils import compute_file_hash, move_file
 from app.models.audit_log import AuditAction, AuditLog
-from app.models.document import Document, DocumentStatus, DocumentTag, DocumentType, ReviewStatus, Tag, TaxCategory
+from app.models.document import Document, DocumentStatus, DocumentType, ReviewStatus, TaxCategory
+from app.models.filing_scope import FilingScope
 from app.models.review_question import ReviewQuestion
 from app.models.warranty_info import WarrantyInfo, WarrantyType
 from app.services.analysis_service import AnalysisResult
+from app.services.blob_store_service import (
+    BLOB_DIR_NAME,
+    blob_root,
+    link_view,
+    store_blob,
+    unlink_view,
+)
 from app.services.ocr_service import OcrResult
-from app.services.search_service import index_document
+from app.services.filing_scope_service import get_keyword_matcher
+from app.services.near_duplicate_service import flag_near_duplicate
+from app.services.tag_service import attach_tags, resolve_tag_ids, tags_text
 
 logger = logging.getLogger("zettelwirtschaft.archive")
 
 
-def _compute_file_hash(file_path: Path) -> str:
-    """Berechnet SHA-256 Hash einer Datei."""
-    sha256 = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            sha256.update(chunk)
-    return sha256.hexdigest()
-
-
 def _build_archive_path(
     archive_dir: str,
     document_type: str,
@@ -48,9 +50,126 @@ def _build_archive_path(
     base = Path(archive_dir)
     if scope_slug:
         base = base / scope_slug
-    archive_path = base / year / month / document_type
-    archive_path.mkdir(parents=True, exist_ok=True)
-    return archive_path / stored_filename
+    return base / year / month / document_type / stored_filename
+
+
+def _move_to_archive(file_path: Path, archive_path: Path) -> None:
+    """Verschiebt die Datei ins Archiv (blockierend, laeuft in einem Thread)."""
+    last_logged = 0
+
+    def progress(copied: int, total: int) -> None:
+        nonlocal last_logged
+        # Bei Kopien ueber Dateisystemgrenzen (z.B. NAS) grob alle 10 MB loggen
+        if copied - last_logged >= 10 * 1024 * 1024 or copied == total:
+            last_logged = copied
+            logger.debug("Kopiere %s: %d/%d Bytes", file_path.name, copied, total)
+
+    move_file(file_path, archive_path, progress=progress)
+
+
+async def document_view_path(
+    document: Document,
+    settings: Settings,
+    session: AsyncSession,
+) -> Path:
+    """Pfad des Dokuments in der lesbaren Ordnerstruktur (aus den aktuellen Metadaten)."""
+    scope_slug = None
+    if document.filing_scope_id:
+        scope = await session.get(FilingScope, document.filing_scope_id)
+        scope_slug = scope.slug if scope else None
+    doc_type = document.document_type
+    return _build_archive_path(
+        settings.ARCHIVE_DIR,
+        doc_type.value if isinstance(doc_type, DocumentType) else str(doc_type),
+        document.document_date,
+        document.stored_filename,
+        scope_slug=scope_slug,
+    )
+
+
+async def update_document_view(
+    document: Document,
+    settings: Settings,
+    session: AsyncSession,
+    old_view_path: Path | None = None,
+) -> Path | None:
+    """Passt den Link eines Blob-Dokuments an geaenderte Metadaten an.
+
+    Geloeschte Dokumente verlieren ihren Link. Dokumente ausserhalb der
+    Blob-Ablage bleiben unberuehrt.
+
+    Returns:
+        Neuer Link-Pfad oder None.
+    """
+    if not settings.BLOB_STORE_ENABLED or blob_root(settings) not in Path(document.file_path).parents:
+        return None
+    new_view_path = None
+    if document.status != DocumentStatus.DELETED:
+        new_view_path = await document_view_path(document, settings, session)
+    if old_view_path is not None and old_view_path != new_view_path:
+        await asyncio.to_thread(unlink_view, old_view_path)
+    if new_view_path is not None:
+        await asyncio.to_thread(link_view, Path(document.file_path), new_view_path)
+    return new_view_path
+
+
+def _sync_view(archive_dir: Path, blobs: Path, desired: dict[Path, Path]) -> dict:
+    """Gleicht die Link-Struktur mit desired (link -> blob) ab. Blockierend."""
+    blob_inodes = {
+        (st.st_dev, st.st_ino)
+        for st in (p.stat() for p in blobs.rglob("*") if p.is_file())
+    }
+    removed = 0
+    for dirpath, dirnames, filenames in os.walk(archive_dir):
+        if Path(dirpath) == archive_dir and BLOB_DIR_NAME in dirnames:
+            dirnames.remove(BLOB_DIR_NAME)
+        for name in filenames:
+            path = Path(dirpath) / name
+            if path in desired:
+                continue
+            if path.is_symlink():
+                is_link = blobs.resolve() in path.resolve().parents
+            else:
+                st = path.stat()
+                is_link = (st.st_dev, st.st_ino) in blob_inodes
+            # Nur Links auf Blobs entfernen, nie eigenstaendige Dateien
+            if is_link and unlink_view(path):
+                removed += 1
+
+    linked = 0
+    for view_path, target in desired.items():
+        if not target.exists():
+            logger.warning("Blob fehlt fuer %s", view_path)
+            continue
+        if view_path.exists() and not view_path.is_symlink() and os.path.samefile(view_path, target):
+            continue
+        link_view(target, view_path)
+        linked += 1
+    return {"linked": linked, "removed": removed, "total": len(desired)}
+
+
+async def rebuild_archive_view(session: AsyncSession, settings: Settings) -> dict:
+    """Baut die lesbare Ordnerstruktur fuer alle Blob-Dokumente neu auf.
+
+    Fehlende oder veraltete Links werden angelegt bzw. entfernt; Dateien, die
+    nicht auf einen Blob zeigen (klassische Ablage), bleiben unangetastet.
+
+    Returns:
+        {"linked": neu angelegte Links, "removed": entfernte Links, "total": Soll-Anzahl}
+    """
+    blobs = blob_root(settings)
+    result = await session.execute(
+        select(Document).where(Document.status != DocumentStatus.DELETED)
+    )
+    desired: dict[Path, Path] = {}
+    for document in result.scalars():
+        target = Path(document.file_path)
+        if blobs in target.parents:
+            desired[await document_view_path(document, settings, session)] = target
+
+    stats = await asyncio.to_thread(_sync_view, Path(settings.ARCHIVE_DIR), blobs, desired)
+    logger.info("Archiv-Ansicht neu aufgebaut: %s", stats)
+    return stats
 
 
 def _parse_document_date(date_str: str | None) -> date | None:
@@ -87,28 +206,6 @@ def _parse_tax_category(category_str: str | None) -> str | None:
     return None
 
 
-async def _get_or_create_tags(
-    tag_names: list[str],
-    session: AsyncSession,
-    auto_generated: bool = True,
-) -> list[Tag]:
-    """Holt oder erstellt Tags anhand der Namen."""
-    tags = []
-    for name in tag_names:
-        name = name.strip().lower()
-        if not name:
-            continue
-
-        result = await session.execute(select(Tag).where(Tag.name == name))
-        tag = result.scalar_one_or_none()
-        if not tag:
-            tag = Tag(name=name, is_auto_generated=auto_generated)
-            session.add(tag)
-            await session.flush()
-        tags.append(tag)
-    return tags
-
-
 def _match_filing_scope(
     analysis: AnalysisResult,
     filing_scopes: list[dict],
@@ -124,16 +221,12 @@ def _match_filing_scope(
     """
     # 1. Keyword-Match im OCR-Text - hat Vorrang
     if ocr_text:
-        text_lower = ocr_text.lower()
+        hits = get_keyword_matcher(filing_scopes).count_hits(ocr_text)
         best_scope = None
         best_hits = 0
-        for scope in filing_scopes:
-            keywords = scope.get("keywords", [])
-            if not keywords:
-                continue
-            hits = sum(1 for kw in keywords if kw.lower() in text_lower)
-            if hits > best_hits:
-                best_hits = hits
+        for index, scope in enumerate(filing_scopes):
+            if hits.get(index, 0) > best_hits:
+                best_hits = hits[index]
                 best_scope = scope
         if best_scope and best_hits > 0:
             logger.info(
@@ -171,9 +264,14 @@ def _match_filing_scope(
     return None, None, new_scope_suggestion
 
 
-async def check_duplicate(file_path: Path, session: AsyncSession) -> Document | None:
+async def check_duplicate(
+    file_path: Path,
+    session: AsyncSession,
+    file_hash: str | None = None,
+) -> Document | None:
     """Prueft ob eine Datei bereits archiviert wurde (via SHA-256)."""
-    file_hash = _compute_file_hash(file_path)
+    if file_hash is None:
+        file_hash = await asyncio.to_thread(compute_file_hash, file_path)
     result = await session.execute(
         select(Document).where(Document.file_hash == file_hash)
     )
@@ -192,17 +290,31 @@ async def archive_document(
     session: AsyncSession,
     thumbnail_path: str | None = None,
     filing_scopes: list[dict] | None = None,
+    file_hash: str | None = None,
+    verify_hash: bool = False,
 ) -> Document:
     """Archiviert ein Dokument: Datei verschieben, DB-Eintrag erstellen.
 
+    Der beim Eingang berechnete Hash (file_hash) wird uebernommen; nur wenn
+    er fehlt oder verify_hash gesetzt ist, wird die Datei erneut gelesen.
+
     Returns:
         Das erstellte Document-Objekt.
 
     Raises:
-        ValueError: Bei Duplikat (gleicher SHA-256 Hash).
+        ValueError: Bei Duplikat (gleicher SHA-256 Hash) oder wenn sich die
+            Datei seit dem Eingang veraendert hat (nur mit verify_hash).
     """
-    # Hash berechnen + Duplikatcheck
-    file_hash = _compute_file_hash(file_path)
+    # Hash uebernehmen bzw. berechnen (liest die Datei ausserhalb des Event-Loops) + Duplikatcheck
+    if file_hash is None:
+        file_hash = await asyncio.to_thread(compute_file_hash, file_path)
+    elif verify_hash:
+        actual_hash = await asyncio.to_thread(compute_file_hash, file_path)
+        if actual_hash != file_hash:
+            raise ValueError(
+                f"Hash-Abweichung: Datei wurde seit dem Eingang veraendert "
+                f"({file_hash[:12]}... != {actual_hash[:12]}...)"
+            )
     existing = await session.execute(
         select(Document).where(Document.file_hash == file_hash)
     )
@@ -228,7 +340,14 @@ async def archive_document(
         settings.ARCHIVE_DIR, doc_type.value, doc_date, stored_filename,
         scope_slug=scope_slug,
     )
-    shutil.move(str(file_path), str(archive_path))
+    if settings.BLOB_STORE_ENABLED:
+        # Datei liegt unter ihrem Hash, archive_path ist nur ein Link darauf
+        stored_path = await store_blob(
+            file_path, file_hash, settings, session, view_path=archive_path,
+        )
+    else:
+        await asyncio.to_thread(_move_to_archive, file_path, archive_path)
+        stored_path = archive_path
     logger.info("Datei archiviert: %s -> %s", file_path.name, archive_path)
 
     # Review-Status bestimmen
@@ -236,11 +355,15 @@ async def archive_document(
     if analysis.needs_review:
         review_status = ReviewStatus.NEEDS_REVIEW
 
+    # Tags vorab anlegen: tags_text steht so schon beim Einfuegen fest und
+    # das Verknuepfen indiziert das Dokument nicht erneut
+    tag_ids = await resolve_tag_ids(analysis.tags, session) if analysis.tags else {}
+
     # Document erstellen
     document = Document(
         original_filename=original_filename,
         stored_filename=stored_filename,
-        file_path=str(archive_path),
+        file_path=str(stored_path),
         thumbnail_path=thumbnail_path,
         file_type=file_type,
         file_size_bytes=file_size_bytes,
@@ -264,15 +387,32 @@ async def archive_document(
         review_status=review_status,
         ai_confidence=analysis.confidence,
         scanned_at=datetime.now(timezone.utc),
+        tags_text=tags_text(list(tag_ids)),
     )
     session.add(document)
     await session.flush()
 
-    # Tags erstellen (via junction table to avoid lazy-load issues)
-    if analysis.tags:
-        tags = await _get_or_create_tags(analysis.tags, session)
-        for tag in tags:
-            session.add(DocumentTag(document_id=document.id, tag_id=tag.id))
+    # Beinahe-Duplikat (gleicher Text, andere Datei) markieren
+    if settings.NEAR_DUPLICATE_ENABLED:
+        match = await flag_near_duplicate(document, session, settings.NEAR_DUPLICATE_THRESHOLD)
+        if match:
+            original_id, _ = match
+            session.add(ReviewQuestion(
+                document_id=document.id,
+                question="Ist dieses Dokument ein Duplikat eines bereits archivierten Dokuments?",
+                question_type="duplicate",
+                suggested_answers="Ja, Duplikat|Nein, eigenes Dokument",
+                explanation=(
+                    f"Der Text stimmt zu {document.near_duplicate_score:.0%} mit Dokument {original_id} ueberein "
+                    "(z.B. Foto und PDF desselben Belegs)."
+                ),
+                priority=7,
+            ))
+            document.review_status = ReviewStatus.NEEDS_REVIEW
+
+    # Tags gesammelt verknuepfen (via junction table to avoid lazy-load issues)
+    if tag_ids:
+        await attach_tags(document.id, list(tag_ids.values()), session)
 
     # Garantie-Info erstellen
     warranty = analysis.warranty_info
@@ -341,21 +481,6 @@ async def archive_document(
 
     await session.flush()
 
-    # FTS-Index aktualisieren
-    try:
-        tag_names = " ".join(analysis.tags) if analysis.tags else ""
-        await index_document(
-            session=session,
-            doc_id=document.id,
-            title=document.title,
-            ocr_text=document.ocr_text,
-            issuer=document.issuer,
-            summary=document.summary,
-            tags=tag_names,
-        )
-    except Exception:
-        logger.warning("FTS-Indexierung fehlgeschlagen fuer %s", document.id, exc_info=True)
-
     logger.info(
         "Dokument archiviert: %s (Typ: %s, Konfidenz: %.0f%%)",
         document.id,
@@ -9,6 +9,7 @@ from datetime import datetime
 from pathlib import Path
 
 from app.config import Settings
+from app.services.blob_store_service import BLOB_DIR_NAME
 
 logger = logging.getLogger(__name__)
 
@@ -49,10 +50,19 @@ def create_backup(settings: Settings, include_documents: bool = False) -> str:
         if include_documents:
             archive_dir = Path(settings.ARCHIVE_DIR)
             if archive_dir.exists():
-                for file_path in archive_dir.rglob("*"):
-                    if file_path.is_file():
-                        arcname = f"documents/{file_path.relative_to(archive_dir)}"
-                        zf.write(file_path, arcname)
+                # Blobs zuerst; deren Links (Hardlinks/Symlinks) werden nicht
+                # ein zweites Mal gesichert
+                blobs = archive_dir / BLOB_DIR_NAME
+                seen: set[tuple[int, int]] = set()
+                for file_path in [*blobs.rglob("*"), *archive_dir.rglob("*")]:
+                    if file_path.is_symlink() or not file_path.is_file():
+                        continue
+                    st = file_path.stat()
+                    if (st.st_dev, st.st_ino) in seen:
+                        continue
+                    seen.add((st.st_dev, st.st_ino))
+                    arcname = f"documents/{file_path.relative_to(archive_dir)}"
+                    zf.write(file_path, arcname)
 
     logger.info("Backup erstellt: %s (%.1f MB)", backup_path, backup_path.stat().st_size / 1024 / 1024)
     return str(backup_path)
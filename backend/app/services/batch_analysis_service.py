@@ -0,0 +1,217 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from app.config import Settings
+from app.services.analysis_service import (
+    ANALYSIS_SCHEMA,
+    AnalysisResult,
+    _build_result_from_combined,
+    _format_filing_scopes,
+    _parse_analysis_json,
+    _try_cascade_analysis,
+    _validate_analysis_data,
+    structured_output_stats,
+)
+from app.services.llm_service import call_llm, get_prompt_template
+from app.services.llm_telemetry_service import current_job_id
+
+logger = logging.getLogger("zettelwirtschaft.batch_analysis")
+
+BATCH_TEMPLATE = "analyze_batch.txt"
+
+_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"index": {"type": "integer"}, **ANALYSIS_SCHEMA["properties"]},
+                "required": ["index", *ANALYSIS_SCHEMA["required"]],
+            },
+        },
+    },
+    "required": ["results"],
+}
+
+
+@dataclass
+class BatchStats:
+    """Micro-Batching kurzer Dokumente (prozessweit, seit Start)."""
+
+    batches: int = 0
+    batched_documents: int = 0
+    routed: int = 0
+    failed_batches: int = 0
+    individual_fallbacks: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "batches": self.batches,
+            "batched_documents": self.batched_documents,
+            "routed": self.routed,
+            "failed_batches": self.failed_batches,
+            "individual_fallbacks": self.individual_fallbacks,
+            "avg_batch_size": self.batched_documents / self.batches if self.batches else 0.0,
+        }
+
+
+batch_stats = BatchStats()
+
+
+def get_batch_stats() -> dict:
+    """Gibt die Micro-Batching-Statistiken zurueck."""
+    return batch_stats.to_dict()
+
+
+def _format_batch(texts: list[str]) -> str:
+    return "\n\n".join(f"=== Dokument {i} ===\n{text}" for i, text in enumerate(texts, start=1))
+
+
+async def analyze_batch(
+    texts: list[str],
+    settings: Settings,
+    filing_scopes: list[dict] | None = None,
+) -> list[AnalysisResult | None]:
+    """Analysiert mehrere kurze Dokumente mit einem einzigen LLM-Aufruf.
+
+    Jedes Ergebnis der Antwort wird ueber seinen Index dem Eingabetext
+    zugeordnet. Fehlende, doppelte oder ungueltige Eintraege bleiben None.
+
+    Returns:
+        Eine Liste gleicher Laenge wie texts.
+    """
+    results: list[AnalysisResult | None] = [None] * len(texts)
+    try:
+        template = get_prompt_template(BATCH_TEMPLATE)
+    except FileNotFoundError:
+        logger.error("Batch-Prompt-Template nicht gefunden")
+        return results
+
+    system_prompt, prompt = template.render(
+        _format_batch(texts), filing_scopes=_format_filing_scopes(filing_scopes),
+    )
+    raw = await call_llm(
+        prompt, settings, system_prompt=system_prompt, schema=_BATCH_SCHEMA,
+        template=template.name,
+    )
+    data = _parse_analysis_json(raw) if raw else None
+    items = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return results
+
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        index = item.pop("index", None)
+        if not isinstance(index, int) or not 1 <= index <= len(texts):
+            continue
+        if results[index - 1] is not None:
+            continue
+        valid, invalid = _validate_analysis_data(item)
+        if invalid:
+            logger.debug("Batch-Ergebnis %d ungueltig: %s", index, ", ".join(invalid))
+            continue
+        structured_output_stats.valid_first_try += 1
+        results[index - 1] = _build_result_from_combined(valid, settings.CONFIDENCE_THRESHOLD)
+    return results
+
+
+class AnalysisBatcher:
+    """Sammelt kurze Dokumente aus nebenlaeufigen Analysen zu einer LLM-Anfrage.
+
+    Eine Anfrage wird gesendet, sobald BATCH_SIZE Dokumente vorliegen oder
+    BATCH_WINDOW_SECONDS nach dem ersten wartenden Dokument vergangen sind.
+    Dokumente ohne gueltiges Ergebnis im Batch (oder bei gescheitertem Batch)
+    werden einzeln ueber die normale Kaskade analysiert.
+    """
+
+    def __init__(self, settings: Settings, filing_scopes: list[dict] | None = None):
+        self.settings = settings
+        self.filing_scopes = filing_scopes
+        self._pending: list[tuple[str, asyncio.Future, str | None]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, ocr_text: str) -> AnalysisResult | None:
+        """Reiht ein Dokument ein und wartet auf sein Analyse-Ergebnis."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((ocr_text, future, current_job_id.get()))
+        if len(self._pending) >= max(1, self.settings.BATCH_SIZE):
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.settings.BATCH_WINDOW_SECONDS, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._pending = self._pending, []
+        if not items:
+            return
+        task = asyncio.create_task(self._run(items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, items: list[tuple[str, asyncio.Future, str | None]]) -> None:
+        try:
+            await self._analyze(items)
+        finally:
+            # Abgebrochener Batch: wartende submit()-Aufrufe nicht haengen lassen
+            for _, future, _ in items:
+                if not future.done():
+                    future.cancel()
+
+    async def _analyze(self, items: list[tuple[str, asyncio.Future, str | None]]) -> None:
+        # Ein Batch gehoert zu keinem einzelnen Job
+        current_job_id.set(None)
+        texts = [text for text, _, _ in items]
+
+        results: list[AnalysisResult | None] = [None] * len(items)
+        if len(items) > 1:
+            batch_stats.batches += 1
+            batch_stats.batched_documents += len(items)
+            try:
+                results = await analyze_batch(texts, self.settings, self.filing_scopes)
+            except Exception:
+                logger.exception("Batch-Analyse fehlgeschlagen")
+            routed = sum(1 for r in results if r is not None)
+            batch_stats.routed += routed
+            if routed == 0:
+                batch_stats.failed_batches += 1
+            logger.info("Batch-Analyse: %d/%d Dokumente zugeordnet", routed, len(items))
+
+        async def resolve(item: tuple[str, asyncio.Future, str | None], result) -> None:
+            text, future, job_id = item
+            if result is None:
+                if len(items) > 1:
+                    batch_stats.individual_fallbacks += 1
+                current_job_id.set(job_id)
+                try:
+                    result = await _try_cascade_analysis(
+                        text, self.settings, self.filing_scopes, first_try=len(items) == 1,
+                    )
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                    return
+            if not future.done():
+                future.set_result(result)
+
+        # Einzelanalysen nebenlaeufig, damit ein Nachzuegler die anderen nicht aufhaelt
+        await asyncio.gather(*(resolve(item, result) for item, result in zip(items, results)))
+
+    def close(self) -> None:
+        """Bricht Zeitfenster, laufende Batches und wartende Dokumente ab."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for task in self._tasks:
+            task.cancel()
+        items, self._pending = self._pending, []
+        for _, future, _ in items:
+            if not future.done():
+                future.cancel()
@@ -0,0 +1,96 @@
+"""Inhaltsadressierte Ablage: Archivdateien liegen unter ihrem SHA-256 Hash.
+
+Layout: ARCHIVE_DIR/_blobs/ab/cd/abcd...  (zwei Ebenen Sharding)
+
+Die lesbare Ordnerstruktur (scope/jahr/monat/typ/datei) besteht in diesem
+Modus nur aus Hardlinks (Fallback: relative Symlinks) auf die Blobs und kann
+jederzeit neu aufgebaut werden.
+
+Jeder Blob gehoert zu genau einem Dokument (documents.file_hash ist
+eindeutig, Duplikate lehnt archive_document ab). Geloeschte Dokumente
+bleiben im Papierkorb und behalten ihren Blob.
+"""
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import Settings
+from app.core.file_utils import move_file
+from app.models.blob import Blob
+
+logger = logging.getLogger("zettelwirtschaft.blob_store")
+
+BLOB_DIR_NAME = "_blobs"
+
+
+def blob_root(settings: Settings) -> Path:
+    return Path(settings.ARCHIVE_DIR) / BLOB_DIR_NAME
+
+
+def blob_path(settings: Settings, file_hash: str) -> Path:
+    """Pfad eines Blobs: _blobs/{hash[0:2]}/{hash[2:4]}/{hash}."""
+    return blob_root(settings) / file_hash[:2] / file_hash[2:4] / file_hash
+
+
+def link_view(blob: Path, view_path: Path) -> None:
+    """Legt view_path als Hardlink auf den Blob an (Fallback: relativer Symlink).
+
+    Ein bereits vorhandener Eintrag wird ersetzt. Blockierend.
+    """
+    view_path.parent.mkdir(parents=True, exist_ok=True)
+    if view_path.is_symlink() or view_path.exists():
+        view_path.unlink()
+    try:
+        os.link(blob, view_path)
+    except OSError:
+        os.symlink(os.path.relpath(blob, view_path.parent), view_path)
+
+
+def unlink_view(view_path: Path) -> bool:
+    """Entfernt einen Link der Ordnerstruktur samt leerer Elternordner. Blockierend."""
+    if not (view_path.is_symlink() or view_path.exists()):
+        return False
+    view_path.unlink()
+    parent = view_path.parent
+    try:
+        while not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+    except OSError:
+        pass
+    return True
+
+
+def _store_file(file_path: Path, target: Path, view_path: Path | None) -> None:
+    # Ein Rest eines abgebrochenen Laufs mit gleichem Hash wird ersetzt
+    move_file(file_path, target)
+    if view_path is not None:
+        link_view(target, view_path)
+
+
+async def store_blob(
+    file_path: Path,
+    file_hash: str,
+    settings: Settings,
+    session: AsyncSession,
+    view_path: Path | None = None,
+) -> Path:
+    """Uebernimmt eine Datei in die Ablage und vermerkt den Blob.
+
+    Returns:
+        Pfad des Blobs.
+    """
+    target = blob_path(settings, file_hash)
+    await asyncio.to_thread(_store_file, file_path, target, view_path)
+
+    blob = await session.get(Blob, file_hash)
+    if blob is None:
+        session.add(Blob(file_hash=file_hash, size_bytes=target.stat().st_size))
+        await session.flush()
+    logger.debug("Blob gespeichert: %s", file_hash[:12])
+    return target
+
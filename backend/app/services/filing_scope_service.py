@@ -0,0 +1,138 @@
+import json
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.filing_scope import FilingScope
+
+logger = logging.getLogger("zettelwirtschaft.filing_scopes")
+
+# Wird bei jeder Aenderung an Ablagebereichen erhoeht (API create/update/delete,
+# neuer Bereich aus einer Rueckfrage-Antwort)
+_scope_version = 0
+_cached_scopes: tuple[int, list[dict]] | None = None
+
+
+def invalidate_filing_scopes() -> None:
+    """Verwirft die zwischengespeicherten Ablagebereiche (nach dem Commit aufrufen)."""
+    global _scope_version
+    _scope_version += 1
+
+
+async def load_filing_scopes(session: AsyncSession) -> list[dict]:
+    """Laedt die Ablagebereiche als einfache Dicts, zwischengespeichert bis zur naechsten Aenderung.
+
+    Die Liste wird geteilt und darf nicht veraendert werden.
+    """
+    global _cached_scopes
+    version = _scope_version
+    if _cached_scopes is not None and _cached_scopes[0] == version:
+        return _cached_scopes[1]
+
+    result = await session.execute(select(FilingScope))
+    filing_scopes = []
+    for s in result.scalars().all():
+        keywords = []
+        if s.keywords:
+            try:
+                keywords = json.loads(s.keywords)
+            except (json.JSONDecodeError, TypeError):
+                keywords = []
+        filing_scopes.append({
+            "id": s.id, "name": s.name, "slug": s.slug,
+            "keywords": keywords, "is_default": s.is_default,
+        })
+    _cached_scopes = (version, filing_scopes)
+    return filing_scopes
+
+
+def _trie_regex(words: list[str]) -> str:
+    """Baut aus Woertern einen Regex mit gemeinsamen Praefixen (Trie statt Alternativliste).
+
+    Die Regex-Engine muss so an jeder Textposition nur einen Pfad verfolgen
+    statt jede Alternative einzeln zu probieren.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def emit(node: dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Laengere Treffer zuerst (gierig), sonst endet das Wort hier
+            return ("(?:" + body + ")?") if len(branches) == 1 else body + "?"
+        return body
+
+    return emit(trie)
+
+
+@dataclass(frozen=True)
+class KeywordMatcher:
+    """Vorkompilierter Mehrfach-Mustervergleich fuer die Keywords aller Ablagebereiche.
+
+    Ein Keyword trifft nur am Wortanfang (nicht mitten in einem anderen Wort),
+    darf aber in ein laengeres Wort auslaufen ("Kassenaerztliche" findet
+    "Kassenaerztlichen"). Gross-/Kleinschreibung wird ignoriert. An einer
+    Textstelle zaehlt das laengste passende Keyword.
+    """
+
+    pattern: re.Pattern | None
+    # keyword (klein) -> Indizes der Ablagebereiche, zu denen es gehoert
+    owners: dict[str, tuple[int, ...]]
+
+    def count_hits(self, text: str) -> dict[int, int]:
+        """Zaehlt je Ablagebereich die verschiedenen gefundenen Keywords (ein Durchlauf)."""
+        if self.pattern is None or not text:
+            return {}
+        found = {m.group(0).lower() for m in self.pattern.finditer(text)}
+        hits: dict[int, int] = {}
+        for keyword in found:
+            for index in self.owners.get(keyword, ()):
+                hits[index] = hits.get(index, 0) + 1
+        return hits
+
+
+@lru_cache(maxsize=8)
+def _compile(keyword_sets: tuple[tuple[str, ...], ...]) -> KeywordMatcher:
+    owners: dict[str, list[int]] = {}
+    for index, keywords in enumerate(keyword_sets):
+        for keyword in keywords:
+            scopes = owners.setdefault(keyword, [])
+            if index not in scopes:
+                scopes.append(index)
+    if not owners:
+        return KeywordMatcher(None, {})
+
+    # Wortgrenze nur vor Keywords, die mit einem Wortzeichen beginnen
+    word_start = [kw for kw in owners if re.match(r"\w", kw)]
+    other = [kw for kw in owners if not re.match(r"\w", kw)]
+    parts = []
+    if word_start:
+        parts.append(r"(?<!\w)" + _trie_regex(word_start))
+    if other:
+        parts.append(_trie_regex(other))
+    pattern = re.compile("|".join(f"(?:{p})" for p in parts), re.IGNORECASE)
+    logger.debug("Keyword-Matcher kompiliert: %d Keywords", len(owners))
+    return KeywordMatcher(pattern, {kw: tuple(idx) for kw, idx in owners.items()})
+
+
+def get_keyword_matcher(filing_scopes: list[dict]) -> KeywordMatcher:
+    """Liefert den (zwischengespeicherten) Matcher fuer die Keywords der Ablagebereiche."""
+    keyword_sets = tuple(
+        tuple(dict.fromkeys(
+            kw.strip().lower() for kw in scope.get("keywords") or [] if isinstance(kw, str) and kw.strip()
+        ))
+        for scope in filing_scopes
+    )
+    return _compile(keyword_sets)
@@ -1,18 +1,129 @@
 import asyncio
 import logging
+import time
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
 import httpx
 
 from app.config import Settings
+from app.services.llm_telemetry_service import record_llm_call
+from app.services.ollama_router_service import get_router
 
 logger = logging.getLogger("zettelwirtschaft.llm")
 
 PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
 
 
+@dataclass(frozen=True)
+class PromptTemplate:
+    """Vorkompiliertes Prompt-Template, geteilt am {ocr_text}-Platzhalter.
+
+    Der statische Teil vor dem Dokumenttext wird als System-Prompt gesendet und
+    ist fuer alle Dokumente identisch, sodass Ollama den KV-Cache dieses Prefix
+    wiederverwenden kann. Nur der User-Prompt (Dokumenttext) variiert.
+    """
+
+    name: str
+    prefix: str
+    suffix: str
+
+    def render(self, ocr_text: str, **static: str) -> tuple[str, str]:
+        """Gibt (system_prompt, user_prompt) zurueck.
+
+        Args:
+            ocr_text: Der variable Dokumenttext.
+            **static: Werte fuer weitere Platzhalter (z.B. filing_scopes).
+        """
+        system_prompt = self.prefix
+        suffix = self.suffix
+        for key, value in static.items():
+            system_prompt = system_prompt.replace("{" + key + "}", value)
+            suffix = suffix.replace("{" + key + "}", value)
+        return system_prompt.rstrip(), ocr_text + suffix
+
+
+@dataclass
+class PromptEvalStats:
+    """Von Ollama gemeldete Prompt-Auswertung (prozessweit, seit Start)."""
+
+    calls: int = 0
+    prompt_tokens: int = 0
+    prompt_eval_ns: int = 0
+
+    def record(self, data: dict) -> None:
+        if "prompt_eval_duration" not in data and "prompt_eval_count" not in data:
+            return
+        self.calls += 1
+        self.prompt_tokens += int(data.get("prompt_eval_count") or 0)
+        self.prompt_eval_ns += int(data.get("prompt_eval_duration") or 0)
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "avg_prompt_tokens": self.prompt_tokens / self.calls if self.calls else 0.0,
+            "avg_prompt_eval_seconds": (
+                self.prompt_eval_ns / self.calls / 1e9 if self.calls else 0.0
+            ),
+        }
+
+
+prompt_eval_stats = PromptEvalStats()
+
+
+def get_prompt_eval_stats() -> dict:
+    """Gibt die aggregierten Prompt-Eval-Zeiten von Ollama zurueck."""
+    return prompt_eval_stats.to_dict()
+
+
+# Ladezeiten darueber gelten als Kaltstart (Modell war nicht im Speicher)
+_COLD_START_LOAD_SECONDS = 1.0
+
+
+@dataclass
+class ModelResidencyStats:
+    """Warm-up, Keep-Alive und Kaltstarts des Modells (prozessweit, seit Start)."""
+
+    warmups: int = 0
+    warmup_failures: int = 0
+    last_warmup_seconds: float | None = None
+    keeper_pings: int = 0
+    cold_starts: int = 0
+    last_load_seconds: float = 0.0
+    first_call_seconds: float | None = None
+
+    def record_call(self, data: dict, seconds: float) -> None:
+        load_seconds = int(data.get("load_duration") or 0) / 1e9
+        self.last_load_seconds = load_seconds
+        if load_seconds > _COLD_START_LOAD_SECONDS:
+            self.cold_starts += 1
+        if self.first_call_seconds is None:
+            self.first_call_seconds = seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "warmups": self.warmups,
+            "warmup_failures": self.warmup_failures,
+            "last_warmup_seconds": self.last_warmup_seconds,
+            "keeper_pings": self.keeper_pings,
+            "cold_starts": self.cold_starts,
+            "last_load_seconds": self.last_load_seconds,
+            "first_call_seconds": self.first_call_seconds,
+        }
+
+
+model_residency_stats = ModelResidencyStats()
+
+
+def get_model_residency_stats() -> dict:
+    """Gibt Warm-up- und Kaltstart-Statistiken zurueck."""
+    return model_residency_stats.to_dict()
+
+
+@lru_cache
 def load_prompt_template(name: str) -> str:
-    """Laedt ein Prompt-Template aus dem prompts-Verzeichnis.
+    """Laedt ein Prompt-Template aus dem prompts-Verzeichnis (einmalig, danach gecacht).
 
     Args:
         name: Dateiname ohne Pfad (z.B. "analyze_document.txt").
@@ -29,20 +140,53 @@ def load_prompt_template(name: str) -> str:
     return path.read_text(encoding="utf-8")
 
 
+@lru_cache
+def get_prompt_template(name: str) -> PromptTemplate:
+    """Liefert das vorkompilierte Prompt-Template.
+
+    Raises:
+        FileNotFoundError: Wenn das Template nicht existiert.
+    """
+    content = load_prompt_template(name)
+    prefix, marker, suffix = content.partition("{ocr_text}")
+    if not marker:
+        return PromptTemplate(name=name, prefix=content, suffix="")
+    return PromptTemplate(name=name, prefix=prefix, suffix=suffix)
+
+
+def preload_prompt_templates() -> int:
+    """Laedt und kompiliert alle Templates vorab. Gibt die Anzahl zurueck."""
+    count = 0
+    for path in sorted(PROMPTS_DIR.glob("*.txt")):
+        get_prompt_template(path.name)
+        count += 1
+    return count
+
+
 async def call_llm(
     prompt: str,
     settings: Settings,
     system_prompt: str | None = None,
+    model: str | None = None,
+    schema: dict | None = None,
+    template: str | None = None,
 ) -> str | None:
     """Sendet einen Prompt an Ollama und gibt die Antwort zurueck.
 
     Nutzt die /api/chat Schnittstelle mit format: "json" fuer strukturierte Ausgabe.
-    Bei Verbindungsfehlern wird automatisch wiederholt (OLLAMA_MAX_RETRIES).
+    Mit schema wird die Ausgabe per JSON-Schema eingeschraenkt (Structured Outputs).
+    Bei mehreren Hosts (OLLAMA_BASE_URLS) waehlt der Router den am wenigsten
+    ausgelasteten gesunden Host; bei Verbindungsfehlern wird sofort auf einen
+    anderen Host ausgewichen. Sind alle Hosts nicht erreichbar, wird automatisch
+    wiederholt (OLLAMA_MAX_RETRIES).
 
     Args:
         prompt: Der User-Prompt fuer das LLM.
         settings: App-Konfiguration.
         system_prompt: Optionaler System-Prompt.
+        model: Abweichendes Modell (Default: settings.OLLAMA_MODEL).
+        schema: Optionales JSON-Schema fuer die Antwort.
+        template: Name des Prompt-Templates (fuer die Telemetrie).
 
     Returns:
         Die LLM-Antwort als String, oder None bei Fehler.
@@ -53,26 +197,45 @@ async def call_llm(
     messages.append({"role": "user", "content": prompt})
 
     payload = {
-        "model": settings.OLLAMA_MODEL,
+        "model": model or settings.OLLAMA_MODEL,
         "messages": messages,
-        "format": "json",
+        "format": schema or "json",
         "stream": False,
+        "keep_alive": settings.OLLAMA_KEEP_ALIVE,
         "options": {
             "temperature": 0.1,
         },
     }
 
-    url = f"{settings.OLLAMA_BASE_URL}/api/chat"
+    router = get_router(settings)
+    failed_hosts: set[str] = set()
+    attempt = 0
+    call_started = time.monotonic()
+
+    def record_failure(host_url: str) -> None:
+        record_llm_call(
+            None, model=payload["model"], template=template, host=host_url,
+            latency_seconds=time.monotonic() - call_started, success=False,
+        )
 
-    for attempt in range(settings.OLLAMA_MAX_RETRIES + 1):
+    while attempt <= settings.OLLAMA_MAX_RETRIES:
+        host = router.pick(exclude=failed_hosts)
+        started = router.acquire(host)
         try:
             async with httpx.AsyncClient(
                 timeout=httpx.Timeout(settings.OLLAMA_TIMEOUT)
             ) as client:
-                response = await client.post(url, json=payload)
+                response = await client.post(f"{host.url}/api/chat", json=payload)
                 response.raise_for_status()
+                router.record_success(host, started)
 
                 data = response.json()
+                prompt_eval_stats.record(data)
+                model_residency_stats.record_call(data, time.monotonic() - started)
+                record_llm_call(
+                    data, model=payload["model"], template=template, host=host.url,
+                    latency_seconds=time.monotonic() - started,
+                )
                 content = data.get("message", {}).get("content", "")
                 if content:
                     logger.info("LLM-Antwort erhalten (%d Zeichen)", len(content))
@@ -82,6 +245,13 @@ async def call_llm(
                 return None
 
         except httpx.ConnectError:
+            router.mark_down(host)
+            failed_hosts.add(host.url)
+            if router.has_healthy(exclude=failed_hosts):
+                # Failover: sofort anderen Host versuchen, zaehlt nicht als Wiederholung
+                logger.warning("Ollama-Host %s nicht erreichbar, weiche aus", host.url)
+                continue
+            failed_hosts.clear()
             if attempt < settings.OLLAMA_MAX_RETRIES:
                 logger.warning(
                     "Ollama nicht erreichbar (Versuch %d/%d), warte 2s...",
@@ -94,6 +264,7 @@ async def call_llm(
                     "Ollama nicht erreichbar nach %d Versuchen",
                     settings.OLLAMA_MAX_RETRIES + 1,
                 )
+                record_failure(host.url)
                 return None
 
         except httpx.TimeoutException:
@@ -109,16 +280,24 @@ async def call_llm(
                     "Ollama Timeout nach %d Versuchen",
                     settings.OLLAMA_MAX_RETRIES + 1,
                 )
+                record_failure(host.url)
                 return None
 
         except httpx.HTTPStatusError as e:
             logger.error("Ollama HTTP-Fehler: %s", e)
+            record_failure(host.url)
             return None
 
         except Exception:
             logger.exception("Unerwarteter Fehler bei LLM-Aufruf")
+            record_failure(host.url)
             return None
 
+        finally:
+            router.release(host)
+
+        attempt += 1
+
     return None
 
 
@@ -126,11 +305,62 @@ async def check_ollama_available(settings: Settings) -> bool:
     """Prueft ob Ollama erreichbar ist.
 
     Returns:
-        True wenn Ollama antwortet, False sonst.
+        True wenn mindestens ein Ollama-Host antwortet, False sonst.
     """
-    try:
-        async with httpx.AsyncClient(timeout=httpx.Timeout(5.0)) as client:
-            resp = await client.get(f"{settings.OLLAMA_BASE_URL}/api/tags")
-            return resp.status_code == 200
-    except Exception:
-        return False
+    for url in settings.ollama_base_urls_list:
+        try:
+            async with httpx.AsyncClient(timeout=httpx.Timeout(5.0)) as client:
+                resp = await client.get(f"{url}/api/tags")
+                if resp.status_code == 200:
+                    return True
+        except Exception:
+            continue
+    return False
+
+
+async def warm_up_model(settings: Settings, keeper: bool = False) -> bool:
+    """Laedt die Analyse-Modelle auf allen Ollama-Hosts in den Speicher.
+
+    Sendet einen leeren /api/generate-Aufruf mit keep_alive, wodurch Ollama das
+    Modell laedt (bzw. die Keep-Alive-Frist verlaengert), ohne Text zu erzeugen.
+
+    Args:
+        settings: App-Konfiguration.
+        keeper: True fuer periodische Keep-Alive-Pings (nur fuer die Statistik).
+
+    Returns:
+        True wenn mindestens ein Host das Modell geladen hat.
+    """
+    models = [settings.OLLAMA_MODEL]
+    if settings.OLLAMA_FAST_MODEL and settings.OLLAMA_FAST_MODEL != settings.OLLAMA_MODEL:
+        models.insert(0, settings.OLLAMA_FAST_MODEL)
+
+    started = time.monotonic()
+    loaded = False
+    for host in get_router(settings).hosts:
+        for model in models:
+            try:
+                async with httpx.AsyncClient(
+                    timeout=httpx.Timeout(settings.OLLAMA_TIMEOUT)
+                ) as client:
+                    resp = await client.post(
+                        f"{host.url}/api/generate",
+                        json={"model": model, "keep_alive": settings.OLLAMA_KEEP_ALIVE},
+                    )
+                    resp.raise_for_status()
+                loaded = True
+            except Exception as e:
+                logger.warning("Warm-up von %s auf %s fehlgeschlagen: %s", model, host.url, e)
+
+    if keeper:
+        model_residency_stats.keeper_pings += 1
+    elif loaded:
+        model_residency_stats.warmups += 1
+        model_residency_stats.last_warmup_seconds = time.monotonic() - started
+        logger.info(
+            "Modell-Warm-up abgeschlossen (%.1fs): %s",
+            model_residency_stats.last_warmup_seconds, ", ".join(models),
+        )
+    else:
+        model_residency_stats.warmup_failures += 1
+    return loaded
@@ -0,0 +1,198 @@
+import logging
+import math
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.llm_call import LlmCall
+
+logger = logging.getLogger("zettelwirtschaft.llm_telemetry")
+
+# Job, dessen Verarbeitung gerade LLM-Aufrufe ausloest (vom Queue-Worker gesetzt)
+current_job_id: ContextVar[str | None] = ContextVar("current_job_id", default=None)
+
+# Obergrenze fuer noch nicht gespeicherte Aufrufe; aelteste fallen heraus
+_MAX_PENDING = 1000
+
+_pending: deque[dict] = deque(maxlen=_MAX_PENDING)
+
+# Standardfenster der Auswertung in Stunden
+DEFAULT_WINDOW_HOURS = 24
+# Alte Aufrufe werden hoechstens so oft geloescht
+_PRUNE_INTERVAL_SECONDS = 3600
+_last_prune: float | None = None
+
+_OLLAMA_FIELDS = {
+    "prompt_eval_count": "prompt_eval_count",
+    "eval_count": "eval_count",
+    "load_duration": "load_duration_ns",
+    "prompt_eval_duration": "prompt_eval_duration_ns",
+    "eval_duration": "eval_duration_ns",
+    "total_duration": "total_duration_ns",
+}
+
+
+def record_llm_call(
+    data: dict | None,
+    *,
+    model: str,
+    template: str | None,
+    host: str | None,
+    latency_seconds: float,
+    success: bool = True,
+) -> None:
+    """Merkt einen LLM-Aufruf zur Speicherung vor.
+
+    Die Zaehler und Zeiten aus der Ollama-Antwort werden uebernommen; die
+    Job-ID stammt aus dem Kontext des aufrufenden Tasks. Gespeichert wird
+    gesammelt per flush_llm_calls(), damit call_llm ohne DB-Session auskommt.
+    """
+    data = data or {}
+    record = {
+        "job_id": current_job_id.get(),
+        "template": template,
+        "model": model,
+        "host": host,
+        "success": success,
+        "latency_ms": latency_seconds * 1000,
+    }
+    for key, column in _OLLAMA_FIELDS.items():
+        value = data.get(key)
+        record[column] = int(value) if value is not None else None
+    _pending.append(record)
+
+
+async def flush_llm_calls(session: AsyncSession) -> int:
+    """Schreibt vorgemerkte LLM-Aufrufe in die Datenbank.
+
+    Nebenbei (hoechstens stuendlich) werden Aufrufe ausserhalb der
+    Aufbewahrungsfrist geloescht.
+
+    Returns:
+        Anzahl der gespeicherten Aufrufe.
+    """
+    records = []
+    while _pending:
+        records.append(_pending.popleft())
+    if not records:
+        return 0
+    session.add_all(LlmCall(**record) for record in records)
+    await session.commit()
+
+    global _last_prune
+    now = time.monotonic()
+    if _last_prune is None or now - _last_prune >= _PRUNE_INTERVAL_SECONDS:
+        _last_prune = now
+        await prune_llm_calls(session, get_settings().LLM_TELEMETRY_RETENTION_DAYS)
+    return len(records)
+
+
+async def prune_llm_calls(session: AsyncSession, retention_days: int) -> int:
+    """Loescht Aufrufe, die aelter als retention_days sind (0 = nie).
+
+    Returns:
+        Anzahl der geloeschten Aufrufe.
+    """
+    if retention_days <= 0:
+        return 0
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    result = await session.execute(delete(LlmCall).where(LlmCall.created_at < cutoff))
+    await session.commit()
+    if result.rowcount:
+        logger.info("%d LLM-Aufrufe aelter als %d Tage geloescht", result.rowcount, retention_days)
+    return result.rowcount
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float | None:
+    """Perzentil per Naechster-Rang-Methode."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values), math.ceil(pct / 100 * len(sorted_values))) - 1)
+    return sorted_values[rank]
+
+
+# Summen je Gruppe, in SQL berechnet
+_SUMS = {
+    "calls": func.count(),
+    "failures": func.sum(case((LlmCall.success.is_(False), 1), else_=0)),
+    "prompt_tokens": func.sum(func.coalesce(LlmCall.prompt_eval_count, 0)),
+    "eval_tokens": func.sum(func.coalesce(LlmCall.eval_count, 0)),
+    "prompt_ns": func.sum(func.coalesce(LlmCall.prompt_eval_duration_ns, 0)),
+    "eval_ns": func.sum(func.coalesce(LlmCall.eval_duration_ns, 0)),
+    "load_ns": func.sum(func.coalesce(LlmCall.load_duration_ns, 0)),
+    "total_ns": func.sum(func.coalesce(LlmCall.total_duration_ns, 0)),
+}
+
+
+def _aggregate(sums: dict, latencies: list[float]) -> dict:
+    prompt_ns, eval_ns, total_ns = sums["prompt_ns"], sums["eval_ns"], sums["total_ns"]
+    return {
+        "calls": sums["calls"],
+        "failures": sums["failures"],
+        "p50_latency_ms": _percentile(latencies, 50),
+        "p95_latency_ms": _percentile(latencies, 95),
+        "prompt_tokens": sums["prompt_tokens"],
+        "eval_tokens": sums["eval_tokens"],
+        "prompt_tokens_per_second": sums["prompt_tokens"] / (prompt_ns / 1e9) if prompt_ns else None,
+        "eval_tokens_per_second": sums["eval_tokens"] / (eval_ns / 1e9) if eval_ns else None,
+        "load_share": sums["load_ns"] / total_ns if total_ns else None,
+    }
+
+
+async def get_llm_telemetry(
+    session: AsyncSession,
+    hours: int = DEFAULT_WINDOW_HOURS,
+    template: str | None = None,
+    model: str | None = None,
+    job_id: str | None = None,
+) -> dict:
+    """Aggregiert die LLM-Aufrufe der letzten hours Stunden, gesamt und je Template/Modell.
+
+    Zaehler und Summen rechnet SQLite; geladen werden nur die Latenzen
+    erfolgreicher Aufrufe im Zeitfenster (fuer die Perzentile).
+    """
+    await flush_llm_calls(session)
+
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    conditions = [LlmCall.created_at >= since]
+    if template:
+        conditions.append(LlmCall.template == template)
+    if model:
+        conditions.append(LlmCall.model == model)
+    if job_id:
+        conditions.append(LlmCall.job_id == job_id)
+
+    template_key = func.coalesce(LlmCall.template, "")
+    result = await session.execute(
+        select(template_key, LlmCall.model, *(column.label(name) for name, column in _SUMS.items()))
+        .where(*conditions)
+        .group_by(template_key, LlmCall.model)
+        .order_by(template_key, LlmCall.model)
+    )
+    groups = {(row[0], row[1]): dict(zip(_SUMS, row[2:])) for row in result.tuples()}
+
+    result = await session.execute(
+        select(template_key, LlmCall.model, LlmCall.latency_ms)
+        .where(*conditions, LlmCall.success.is_(True))
+        .order_by(LlmCall.latency_ms)
+    )
+    latencies: dict[tuple[str, str], list[float]] = {}
+    all_latencies: list[float] = []
+    for key_template, key_model, latency in result.tuples():
+        latencies.setdefault((key_template, key_model), []).append(latency)
+        all_latencies.append(latency)
+
+    totals = {name: sum(group[name] for group in groups.values()) for name in _SUMS}
+    return {
+        "hours": hours,
+        "total": _aggregate(totals, all_latencies),
+        "by_template": [
+            {"template": key[0] or None, "model": key[1], **_aggregate(sums, latencies.get(key, []))}
+            for key, sums in groups.items()
+        ],
+    }
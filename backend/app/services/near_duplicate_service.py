@@ -0,0 +1,221 @@
+"""Erkennung von Beinahe-Duplikaten ueber MinHash-Signaturen des OCR-Texts.
+
+Derselbe Brief zweimal gescannt oder Foto und PDF derselben Rechnung haben
+verschiedene SHA-256 Hashes, aber fast denselben Text. Pro Dokument wird eine
+MinHash-Signatur ueber Wort-Shingles gespeichert; Kandidaten werden ueber
+LSH-Buckets (Baender der Signatur) per Index gefunden und anschliessend
+anhand der geschaetzten Jaccard-Aehnlichkeit bewertet.
+"""
+
+import hashlib
+import logging
+import random
+import re
+from array import array
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document, DocumentStatus
+from app.models.text_fingerprint import DocumentFingerprint, FingerprintBucket
+
+logger = logging.getLogger("zettelwirtschaft.near_duplicates")
+
+# 128 Hashfunktionen = 16 Baender x 8 Zeilen: Kandidat erst ab ca. 70 %
+# Aehnlichkeit (wenige Fehlkandidaten bei Vorlagen wie Monatsrechnungen),
+# bei 85 % wird ein Duplikat mit > 99 % Wahrscheinlichkeit gefunden
+NUM_HASHES = 128
+BANDS = 16
+ROWS = NUM_HASHES // BANDS
+SHINGLE_SIZE = 3
+# Kuerzere Texte sind fuer eine verlaessliche Schaetzung zu knapp
+MIN_SHINGLES = 8
+
+_TOKEN_RE = re.compile(r"\w+")
+_MASK64 = (1 << 64) - 1
+# Feste Parameter der Hashfunktionen (multiply-shift: (a*x + b) mod 2^64, obere
+# 32 Bit) - muessen ueber Neustarts gleich bleiben
+_rng = random.Random(20240315)
+_PERMUTATIONS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_HASHES)]
+del _rng
+
+
+def _shingles(text: str) -> set[str]:
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < SHINGLE_SIZE:
+        return set()
+    return {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def compute_signature(text: str | None) -> tuple[tuple[int, ...], int] | None:
+    """MinHash-Signatur ueber Wort-3-Gramme (Shingles) des Textes.
+
+    Returns:
+        (Signatur, Anzahl Shingles) oder None bei zu kurzem Text.
+    """
+    shingles = _shingles(text or "")
+    if len(shingles) < MIN_SHINGLES:
+        return None
+
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little")
+        for shingle in shingles
+    ]
+    signature = tuple(min([(a * h + b) & _MASK64 for h in hashes]) >> 32 for a, b in _PERMUTATIONS)
+    return signature, len(shingles)
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Geschaetzte Jaccard-Aehnlichkeit zweier Signaturen (0..1)."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_HASHES
+
+
+def band_buckets(signature: tuple[int, ...]) -> list[int]:
+    """Ein Bucket-Schluessel (vorzeichenbehaftete 64-Bit-Zahl) je Band."""
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(
+            array("I", (band, *rows)).tobytes(), digest_size=8,
+        ).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
+
+
+def _pack(signature: tuple[int, ...]) -> bytes:
+    return array("I", signature).tobytes()
+
+
+def _unpack(data: bytes) -> tuple[int, ...]:
+    values = array("I")
+    values.frombytes(data)
+    return tuple(values)
+
+
+async def find_near_duplicates(
+    signature: tuple[int, ...],
+    session: AsyncSession,
+    threshold: float,
+    exclude_id: str | None = None,
+    limit: int = 5,
+) -> list[tuple[str, float]]:
+    """Sucht aktive Dokumente mit aehnlicher Signatur.
+
+    Eine indizierte Abfrage ueber alle Buckets liefert die Kandidaten samt
+    Signaturen; nur diese werden verglichen.
+
+    Returns:
+        [(document_id, score)] absteigend nach Aehnlichkeit, score >= threshold.
+    """
+    candidates = (
+        select(FingerprintBucket.document_id)
+        .where(FingerprintBucket.bucket.in_(band_buckets(signature)))
+        .distinct()
+    )
+    if exclude_id is not None:
+        candidates = candidates.where(FingerprintBucket.document_id != exclude_id)
+
+    result = await session.execute(
+        select(DocumentFingerprint.document_id, DocumentFingerprint.signature)
+        .join(Document, Document.id == DocumentFingerprint.document_id)
+        .where(
+            DocumentFingerprint.document_id.in_(candidates),
+            Document.status != DocumentStatus.DELETED,
+        )
+    )
+    matches = []
+    for doc_id, packed in result.tuples():
+        score = similarity(signature, _unpack(packed))
+        if score >= threshold:
+            matches.append((doc_id, score))
+    matches.sort(key=lambda m: m[1], reverse=True)
+    return matches[:limit]
+
+
+async def store_fingerprint(
+    document_id: str,
+    signature: tuple[int, ...],
+    shingle_count: int,
+    session: AsyncSession,
+) -> None:
+    """Speichert (bzw. ersetzt) Signatur und LSH-Buckets eines Dokuments."""
+    await session.execute(delete(FingerprintBucket).where(FingerprintBucket.document_id == document_id))
+    await session.execute(delete(DocumentFingerprint).where(DocumentFingerprint.document_id == document_id))
+    await session.execute(insert(DocumentFingerprint).values(
+        document_id=document_id, signature=_pack(signature), shingle_count=shingle_count,
+    ))
+    await session.execute(
+        insert(FingerprintBucket),
+        [{"bucket": b, "document_id": document_id} for b in set(band_buckets(signature))],
+    )
+
+
+async def flag_near_duplicate(
+    document: Document,
+    session: AsyncSession,
+    threshold: float,
+) -> tuple[str, float] | None:
+    """Fingerabdruck eines neuen Dokuments speichern und es ggf. als Beinahe-Duplikat markieren.
+
+    Returns:
+        (document_id des aehnlichsten Dokuments, score) oder None.
+    """
+    computed = compute_signature(document.ocr_text)
+    if computed is None:
+        return None
+    signature, shingle_count = computed
+
+    matches = await find_near_duplicates(signature, session, threshold, exclude_id=document.id, limit=1)
+    await store_fingerprint(document.id, signature, shingle_count, session)
+    if not matches:
+        return None
+
+    original_id, score = matches[0]
+    document.near_duplicate_of_id = original_id
+    document.near_duplicate_score = round(score, 3)
+    logger.info(
+        "Dokument %s ist wahrscheinlich ein Duplikat von %s (Aehnlichkeit %.0f%%)",
+        document.id, original_id, score * 100,
+    )
+    return original_id, score
+
+
+async def rebuild_fingerprints(session: AsyncSession, batch_size: int = 500) -> int:
+    """Berechnet die Fingerabdruecke aller Dokumente neu (z.B. nach der Migration).
+
+    Returns:
+        Anzahl der Dokumente mit Fingerabdruck.
+    """
+    await session.execute(delete(FingerprintBucket))
+    await session.execute(delete(DocumentFingerprint))
+
+    count = 0
+    last_id = ""
+    while True:
+        result = await session.execute(
+            select(Document.id, Document.ocr_text)
+            .where(Document.id > last_id)
+            .order_by(Document.id)
+            .limit(batch_size)
+        )
+        rows = result.tuples().all()
+        if not rows:
+            break
+        fingerprints, buckets = [], []
+        for doc_id, ocr_text in rows:
+            computed = compute_signature(ocr_text)
+            if computed is None:
+                continue
+            signature, shingle_count = computed
+            fingerprints.append({
+                "document_id": doc_id, "signature": _pack(signature), "shingle_count": shingle_count,
+            })
+            buckets.extend({"bucket": b, "document_id": doc_id} for b in set(band_buckets(signature)))
+        if fingerprints:
+            await session.execute(insert(DocumentFingerprint), fingerprints)
+            await session.execute(insert(FingerprintBucket), buckets)
+        count += len(fingerprints)
+        last_id = rows[-1][0]
+    await session.commit()
+    logger.info("Fingerabdruecke fuer %d Dokumente neu berechnet", count)
+    return count
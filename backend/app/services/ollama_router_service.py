@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import httpx
+
+from app.config import Settings
+
+logger = logging.getLogger("zettelwirtschaft.ollama_router")
+
+# Anzahl der letzten Antwortzeiten fuer den gleitenden Mittelwert
+_LATENCY_WINDOW = 20
+
+
+@dataclass
+class OllamaHost:
+    url: str
+    in_flight: int = 0
+    healthy: bool = True
+    requests: int = 0
+    failures: int = 0
+    last_failure: float = 0.0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=_LATENCY_WINDOW))
+
+    @property
+    def avg_latency(self) -> float:
+        """Gleitender Mittelwert der Antwortzeit (0.0 solange keine Messung vorliegt)."""
+        if not self.latencies:
+            return 0.0
+        return sum(self.latencies) / len(self.latencies)
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "avg_latency_seconds": self.avg_latency,
+        }
+
+
+class OllamaRouter:
+    """Verteilt LLM-Aufrufe auf mehrere Ollama-Hosts.
+
+    Gewaehlt wird der gesunde Host mit den wenigsten laufenden Anfragen, bei
+    Gleichstand der mit der geringsten gleitenden Antwortzeit. Hosts mit
+    Verbindungsfehlern werden aus der Rotation genommen, bis ein Health-Probe
+    (GET /api/tags) wieder erfolgreich ist.
+    """
+
+    def __init__(self, urls: list[str]):
+        self.hosts = [OllamaHost(url=url.rstrip("/")) for url in urls]
+
+    def pick(self, exclude: set[str] | None = None) -> OllamaHost:
+        """Waehlt den naechsten Host.
+
+        Sind alle Hosts ausgefallen, wird der mit dem aeltesten Fehler versucht,
+        damit Anfragen nie ganz ohne Ziel bleiben.
+        """
+        exclude = exclude or set()
+        candidates = [h for h in self.hosts if h.healthy and h.url not in exclude]
+        if candidates:
+            return min(
+                candidates,
+                key=lambda h: (h.in_flight, h.avg_latency, self.hosts.index(h)),
+            )
+        fallback = [h for h in self.hosts if h.url not in exclude] or self.hosts
+        return min(fallback, key=lambda h: h.last_failure)
+
+    def has_healthy(self, exclude: set[str] | None = None) -> bool:
+        exclude = exclude or set()
+        return any(h.healthy and h.url not in exclude for h in self.hosts)
+
+    def acquire(self, host: OllamaHost) -> float:
+        """Markiert den Beginn einer Anfrage. Gibt den Startzeitpunkt zurueck."""
+        host.in_flight += 1
+        host.requests += 1
+        return time.monotonic()
+
+    def release(self, host: OllamaHost) -> None:
+        host.in_flight -= 1
+
+    def record_success(self, host: OllamaHost, started: float) -> None:
+        host.latencies.append(time.monotonic() - started)
+        if not host.healthy:
+            logger.info("Ollama-Host %s wieder erreichbar", host.url)
+        host.healthy = True
+
+    def mark_down(self, host: OllamaHost) -> None:
+        host.failures += 1
+        host.last_failure = time.monotonic()
+        if host.healthy:
+            logger.warning("Ollama-Host %s aus der Rotation genommen", host.url)
+        host.healthy = False
+
+    async def probe_unhealthy(self, timeout: float = 3.0) -> None:
+        """Prueft ausgefallene Hosts und nimmt erreichbare wieder in die Rotation auf."""
+        for host in self.hosts:
+            if host.healthy:
+                continue
+            try:
+                async with httpx.AsyncClient(timeout=httpx.Timeout(timeout)) as client:
+                    resp = await client.get(f"{host.url}/api/tags")
+                if resp.status_code == 200:
+                    host.healthy = True
+                    logger.info("Ollama-Host %s nach Health-Probe wieder aktiv", host.url)
+            except Exception:
+                logger.debug("Health-Probe fuer %s fehlgeschlagen", host.url)
+
+    def status(self) -> list[dict]:
+        return [h.to_dict() for h in self.hosts]
+
+
+_routers: dict[tuple[str, ...], OllamaRouter] = {}
+
+
+def get_router(settings: Settings) -> OllamaRouter:
+    """Liefert den (prozessweiten) Router fuer die konfigurierten Ollama-Hosts."""
+    urls = tuple(settings.ollama_base_urls_list)
+    router = _routers.get(urls)
+    if router is None:
+        router = OllamaRouter(list(urls))
+        _routers[urls] = router
+    return router
+
+
+async def run_ollama_health_probe(settings: Settings) -> None:
+    """Endlos-Loop: Prueft ausgefallene Ollama-Hosts in festen Abstaenden."""
+    router = get_router(settings)
+    if len(router.hosts) < 2:
+        return
+    logger.info(
+        "Ollama-Health-Probe gestartet (%d Hosts, Intervall: %ds)",
+        len(router.hosts), settings.OLLAMA_HEALTH_PROBE_INTERVAL,
+    )
+    while True:
+        try:
+            await asyncio.sleep(settings.OLLAMA_HEALTH_PROBE_INTERVAL)
+            await router.probe_unhealthy()
+        except asyncio.CancelledError:
+            logger.info("Ollama-Health-Probe wird beendet")
+            return
+        except Exception:
+            logger.exception("Fehler in der Ollama-Health-Probe")
@@ -3,52 +3,54 @@ import json
 import logging
 from pathlib import Path
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.config import Settings
-from app.models.filing_scope import FilingScope
 from app.models.processing_job import JobStatus, ProcessingJob
-from app.services.analysis_service import analyze_document
+from app.services.analysis_service import AnalysisResult, analyze_document
 from app.services.archive_service import archive_document
+from app.services.batch_analysis_service import AnalysisBatcher
+from app.services.filing_scope_service import load_filing_scopes
+from app.services.llm_service import warm_up_model
+from app.services.llm_telemetry_service import current_job_id, flush_llm_calls
+from app.services.ocr_service import OcrResult
 from app.services.thumbnail_service import generate_thumbnail
 
 logger = logging.getLogger("zettelwirtschaft.queue_worker")
 
 
-async def _process_job(
+async def _prepare_job(
     job: ProcessingJob,
     settings: Settings,
-    session: AsyncSession,
-) -> None:
-    """Verarbeitet einen einzelnen Job: Thumbnail + OCR + KI-Analyse + Archivierung."""
+    filing_scopes: list[dict],
+    batcher: AnalysisBatcher | None = None,
+) -> tuple[Path | None, OcrResult | None, AnalysisResult | None]:
+    """Thumbnail + OCR + KI-Analyse eines Jobs (ohne Datenbankzugriff)."""
     file_path = Path(job.file_path)
     if not file_path.exists():
         raise FileNotFoundError(f"Datei nicht gefunden: {file_path}")
 
-    # Filing Scopes laden
-    scope_result = await session.execute(select(FilingScope))
-    scope_records = scope_result.scalars().all()
-    filing_scopes = []
-    for s in scope_records:
-        keywords = []
-        if s.keywords:
-            try:
-                keywords = json.loads(s.keywords)
-            except (json.JSONDecodeError, TypeError):
-                keywords = []
-        filing_scopes.append({
-            "id": s.id, "name": s.name, "slug": s.slug,
-            "keywords": keywords, "is_default": s.is_default,
-        })
-
     # Thumbnail generieren
     thumbnail_path = await generate_thumbnail(file_path, job.file_type, job.id, settings)
 
     # OCR + KI-Analyse
     ocr_result, analysis_result = await analyze_document(
-        file_path, job.file_type, settings, filing_scopes=filing_scopes,
+        file_path, job.file_type, settings, filing_scopes=filing_scopes, batcher=batcher,
     )
+    return thumbnail_path, ocr_result, analysis_result
+
+
+async def _archive_job(
+    job: ProcessingJob,
+    prepared: tuple[Path | None, OcrResult | None, AnalysisResult | None],
+    settings: Settings,
+    session: AsyncSession,
+    filing_scopes: list[dict],
+) -> None:
+    """Speichert die Analyse im Job und archiviert das Dokument."""
+    thumbnail_path, ocr_result, analysis_result = prepared
+    file_path = Path(job.file_path)
 
     # OCR-Ergebnisse im Job speichern
     if ocr_result:
@@ -77,6 +79,8 @@ async def _process_job(
             session=session,
             thumbnail_path=thumbnail_str,
             filing_scopes=filing_scopes,
+            file_hash=job.file_hash,
+            verify_hash=settings.VERIFY_FILE_HASH,
         )
 
         if analysis_result and analysis_result.needs_review:
@@ -94,7 +98,7 @@ async def _process_job(
         )
 
     except ValueError as e:
-        # Duplikat erkannt
+        # Duplikat erkannt bzw. Datei seit dem Eingang veraendert
         job.status = JobStatus.NEEDS_REVIEW
         job.error_message = str(e)
         logger.warning("Job %s: %s", job.id, e)
@@ -102,64 +106,181 @@ async def _process_job(
     await session.commit()
 
 
+async def _process_job(
+    job: ProcessingJob,
+    settings: Settings,
+    session: AsyncSession,
+) -> None:
+    """Verarbeitet einen einzelnen Job: Thumbnail + OCR + KI-Analyse + Archivierung."""
+    filing_scopes = await load_filing_scopes(session)
+    prepared = await _prepare_job(job, settings, filing_scopes)
+    await _archive_job(job, prepared, settings, session, filing_scopes)
+
+
+def _mark_failed(job: ProcessingJob, error: Exception, settings: Settings) -> None:
+    """Zaehlt einen Fehlversuch: zurueck auf PENDING (Retry) oder endgueltig FAILED."""
+    job.retry_count += 1
+    if job.retry_count >= settings.MAX_RETRIES:
+        job.status = JobStatus.FAILED
+        job.error_message = str(error)
+        logger.error(
+            "Job %s endgueltig fehlgeschlagen nach %d Versuchen: %s",
+            job.id,
+            job.retry_count,
+            error,
+        )
+    else:
+        job.status = JobStatus.PENDING
+        job.error_message = str(error)
+        logger.warning(
+            "Job %s fehlgeschlagen (Versuch %d/%d): %s",
+            job.id,
+            job.retry_count,
+            settings.MAX_RETRIES,
+            error,
+        )
+
+
+async def _run_job(
+    job: ProcessingJob,
+    settings: Settings,
+    session: AsyncSession,
+) -> None:
+    """Verarbeitet einen Job und setzt den Endstatus."""
+    logger.info("Verarbeite Job %s: %s", job.id, job.original_filename)
+    job_token = current_job_id.set(job.id)
+    try:
+        await _process_job(job, settings, session)
+        # Nur auf COMPLETED setzen wenn noch PROCESSING
+        if job.status == JobStatus.PROCESSING:
+            job.status = JobStatus.COMPLETED
+        await session.commit()
+        logger.info("Job %s abgeschlossen (Status: %s)", job.id, job.status)
+
+    except Exception as e:
+        _mark_failed(job, e, settings)
+        await session.commit()
+
+    finally:
+        current_job_id.reset(job_token)
+
+
+async def _run_job_batch(
+    jobs: list[ProcessingJob],
+    settings: Settings,
+    session: AsyncSession,
+) -> None:
+    """Verarbeitet mehrere Jobs mit gemeinsamem Micro-Batcher.
+
+    Thumbnail, OCR und Analyse laufen nebenlaeufig, damit kurze Dokumente
+    gemeinsam beim Batcher ankommen. Jeder Job wird archiviert, sobald seine
+    Analyse fertig ist, damit ein langsames Dokument die anderen nicht
+    aufhaelt; die Archivierung selbst laeuft nacheinander in der einen Session.
+    """
+    filing_scopes = await load_filing_scopes(session)
+    batcher = AnalysisBatcher(settings, filing_scopes)
+    logger.info("Verarbeite %d Jobs im Batch-Modus", len(jobs))
+
+    async def prepare(job: ProcessingJob):
+        current_job_id.set(job.id)
+        return await _prepare_job(job, settings, filing_scopes, batcher)
+
+    tasks = {asyncio.create_task(prepare(job)): job for job in jobs}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                job = tasks[task]
+                job_token = current_job_id.set(job.id)
+                try:
+                    if task.cancelled():
+                        raise RuntimeError("Analyse abgebrochen")
+                    await _archive_job(job, task.result(), settings, session, filing_scopes)
+                    if job.status == JobStatus.PROCESSING:
+                        job.status = JobStatus.COMPLETED
+                    await session.commit()
+                    logger.info("Job %s abgeschlossen (Status: %s)", job.id, job.status)
+
+                except Exception as e:
+                    _mark_failed(job, e, settings)
+                    await session.commit()
+
+                finally:
+                    current_job_id.reset(job_token)
+    finally:
+        for task in pending:
+            task.cancel()
+        batcher.close()
+
+
+async def _claim_jobs(session: AsyncSession, settings: Settings) -> list[ProcessingJob]:
+    """Holt die naechsten PENDING-Jobs (aeltester zuerst).
+
+    Mit BATCH_ANALYSIS_ENABLED kommen zum aeltesten Job weitere hinzu, aber nur
+    kleine Dateien bis BATCH_MAX_FILE_MB: grosse Dateien bringen meist langen
+    Text mit, der ohnehin nicht in den Batch passt, und laufen daher einzeln.
+    """
+    query = (
+        select(ProcessingJob)
+        .where(ProcessingJob.status == JobStatus.PENDING)
+        .order_by(ProcessingJob.created_at.asc())
+    )
+    result = await session.execute(query.limit(1))
+    first = result.scalar_one_or_none()
+    if first is None:
+        return []
+
+    max_bytes = settings.BATCH_MAX_FILE_MB * 1024 * 1024
+    if (
+        not settings.BATCH_ANALYSIS_ENABLED
+        or settings.BATCH_SIZE <= 1
+        or first.file_size_bytes > max_bytes
+    ):
+        return [first]
+
+    result = await session.execute(
+        query.where(
+            ProcessingJob.id != first.id,
+            ProcessingJob.file_size_bytes <= max_bytes,
+        ).limit(settings.BATCH_SIZE - 1)
+    )
+    return [first, *result.scalars().all()]
+
+
 async def run_queue_worker(
     session_factory: async_sessionmaker[AsyncSession],
     settings: Settings,
 ) -> None:
-    """Endlos-Loop: Pollt nach PENDING-Jobs und verarbeitet sie."""
+    """Endlos-Loop: Pollt nach PENDING-Jobs und verarbeitet sie.
+
+    Mit BATCH_ANALYSIS_ENABLED werden bis zu BATCH_SIZE Jobs gemeinsam
+    uebernommen, damit kurze Dokumente in einer LLM-Anfrage analysiert werden
+    (siehe _claim_jobs).
+    """
     logger.info("Queue-Worker gestartet (Poll-Intervall: %ds)", settings.QUEUE_POLL_INTERVAL)
 
     while True:
         try:
             async with session_factory() as session:
-                # Naechsten PENDING-Job holen
-                result = await session.execute(
-                    select(ProcessingJob)
-                    .where(ProcessingJob.status == JobStatus.PENDING)
-                    .order_by(ProcessingJob.created_at.asc())
-                    .limit(1)
-                )
-                job = result.scalar_one_or_none()
+                # Naechste PENDING-Jobs holen
+                jobs = await _claim_jobs(session, settings)
 
-                if job is None:
+                if not jobs:
                     await asyncio.sleep(settings.QUEUE_POLL_INTERVAL)
                     continue
 
                 # Status auf PROCESSING setzen
-                job.status = JobStatus.PROCESSING
+                for job in jobs:
+                    job.status = JobStatus.PROCESSING
                 await session.commit()
-                logger.info("Verarbeite Job %s: %s", job.id, job.original_filename)
 
-                try:
-                    await _process_job(job, settings, session)
-                    # Nur auf COMPLETED setzen wenn noch PROCESSING
-                    if job.status == JobStatus.PROCESSING:
-                        job.status = JobStatus.COMPLETED
-                    await session.commit()
-                    logger.info("Job %s abgeschlossen (Status: %s)", job.id, job.status)
+                if len(jobs) == 1:
+                    await _run_job(jobs[0], settings, session)
+                else:
+                    await _run_job_batch(jobs, settings, session)
 
-                except Exception as e:
-                    job.retry_count += 1
-                    if job.retry_count >= settings.MAX_RETRIES:
-                        job.status = JobStatus.FAILED
-                        job.error_message = str(e)
-                        logger.error(
-                            "Job %s endgueltig fehlgeschlagen nach %d Versuchen: %s",
-                            job.id,
-                            job.retry_count,
-                            e,
-                        )
-                    else:
-                        job.status = JobStatus.PENDING
-                        job.error_message = str(e)
-                        logger.warning(
-                            "Job %s fehlgeschlagen (Versuch %d/%d): %s",
-                            job.id,
-                            job.retry_count,
-                            settings.MAX_RETRIES,
-                            e,
-                        )
-                    await session.commit()
+                await flush_llm_calls(session)
 
         except asyncio.CancelledError:
             logger.info("Queue-Worker wird beendet")
@@ -167,3 +288,32 @@ async def run_queue_worker(
         except Exception:
             logger.exception("Unerwarteter Fehler im Queue-Worker")
             await asyncio.sleep(settings.QUEUE_POLL_INTERVAL)
+
+
+async def run_model_keeper(
+    session_factory: async_sessionmaker[AsyncSession],
+    settings: Settings,
+) -> None:
+    """Endlos-Loop: Haelt das Modell im Speicher, solange Jobs in der Queue warten."""
+    logger.info("Modell-Keeper gestartet (Intervall: %ds)", settings.OLLAMA_KEEPER_INTERVAL)
+
+    while True:
+        try:
+            await asyncio.sleep(settings.OLLAMA_KEEPER_INTERVAL)
+            async with session_factory() as session:
+                result = await session.execute(
+                    select(func.count(ProcessingJob.id)).where(
+                        ProcessingJob.status.in_([JobStatus.PENDING, JobStatus.PROCESSING])
+                    )
+                )
+                open_jobs = result.scalar() or 0
+
+            if open_jobs:
+                logger.debug("Modell-Keeper: %d offene Jobs, sende Keep-Alive", open_jobs)
+                await warm_up_model(settings, keeper=True)
+
+        except asyncio.CancelledError:
+            logger.info("Modell-Keeper wird beendet")
+            return
+        except Exception:
+            logger.exception("Unerwarteter Fehler im Modell-Keeper")
@@ -0,0 +1,190 @@
+"""Ergebniscache fuer Suche und Vorschlaege.
+
+Gueltigkeit ueber einen Generationszaehler in der Datenbank: Trigger auf
+documents, document_tags, tags und filing_scopes erhoehen ihn bei jedem
+Schreibzugriff (auch aus dem Queue-Worker oder per SQL). Weicht die aktuelle
+Generation von der des Caches ab, wird dieser komplett verworfen.
+"""
+
+import functools
+import inspect
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+
+logger = logging.getLogger("zettelwirtschaft.search_cache")
+
+_BUMP = "UPDATE archive_generation SET generation = generation + 1;"
+
+GENERATION_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS archive_generation (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        generation INTEGER NOT NULL
+    )
+    """,
+    "INSERT OR IGNORE INTO archive_generation (id, generation) VALUES (1, 0)",
+    *(
+        f"CREATE TRIGGER IF NOT EXISTS {table}_generation_{suffix} AFTER {event} ON {table} BEGIN {_BUMP} END"
+        for table in ("documents", "document_tags", "tags", "filing_scopes")
+        for suffix, event in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+    ),
+]
+
+
+@dataclass
+class SearchCacheStats:
+    """Trefferstatistik des Suchcaches (prozessweit, seit Start)."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    def to_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class SearchCache:
+    """LRU-Cache mit fester Eintragszahl, gebunden an eine Archiv-Generation.
+
+    Eintraege sind begrenzt gross (eine Ergebnisseite bzw. Vorschlagsliste),
+    die Eintragszahl begrenzt damit den Speicher.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.stats = SearchCacheStats()
+        self._entries: OrderedDict[tuple, object] = OrderedDict()
+        self._generation: int | None = None
+
+    def _sync(self, generation: int) -> None:
+        if generation != self._generation:
+            if self._entries:
+                self.stats.invalidations += 1
+                self._entries.clear()
+            self._generation = generation
+
+    def get(self, key: tuple, generation: int) -> object | None:
+        self._sync(generation)
+        value = self._entries.get(key)
+        if value is None:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def put(self, key: tuple, generation: int, value: object) -> None:
+        self._sync(generation)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._generation = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache: SearchCache | None = None
+
+
+def get_search_cache() -> SearchCache | None:
+    """Prozessweiter Cache; None bei SEARCH_CACHE_SIZE = 0."""
+    global _cache
+    if _cache is None:
+        size = get_settings().SEARCH_CACHE_SIZE
+        if size <= 0:
+            return None
+        _cache = SearchCache(size)
+    return _cache
+
+
+def clear_search_cache() -> None:
+    """Verwirft alle Eintraege (z.B. wenn die Datenbank ausgetauscht wurde)."""
+    if _cache is not None:
+        _cache.clear()
+
+
+def get_search_cache_stats() -> dict:
+    cache = get_search_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "entries": len(cache),
+        "max_entries": cache.max_entries,
+        **cache.stats.to_dict(),
+    }
+
+
+async def archive_generation(session: AsyncSession) -> int | None:
+    """Aktuelle Archiv-Generation; None, wenn die Tabelle (noch) fehlt."""
+    try:
+        result = await session.execute(text("SELECT generation FROM archive_generation WHERE id = 1"))
+    except OperationalError:
+        return None
+    return result.scalar()
+
+
+async def bump_archive_generation(session: AsyncSession) -> None:
+    """Verwirft zwischengespeicherte Ergebnisse aller Prozesse (z.B. nach Umbau eines Index)."""
+    try:
+        await session.execute(text(_BUMP))
+    except OperationalError:
+        # Ohne Tabelle gibt es auch keinen Cache
+        pass
+
+
+def _normalize(name: str, value: object) -> object:
+    if name == "query" and isinstance(value, str):
+        # Gross-/Kleinschreibung und Leerraum aendern das FTS-Ergebnis nicht
+        return " ".join(value.split()).casefold()
+    return value
+
+
+def cached_search(func):
+    """Cacht das Ergebnis einer Such-Coroutine (erstes Argument: Session).
+
+    Schluessel sind die normalisierten Argumente. Das Ergebnis wird zwischen
+    Aufrufern geteilt und darf nicht veraendert werden.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(session: AsyncSession, *args, **kwargs):
+        cache = get_search_cache()
+        generation = await archive_generation(session) if cache is not None else None
+        if generation is None:
+            return await func(session, *args, **kwargs)
+
+        bound = signature.bind(session, *args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__name__, *(
+            (name, _normalize(name, value)) for name, value in bound.arguments.items() if name != "session"
+        ))
+        result = cache.get(key, generation)
+        if result is None:
+            result = await func(session, *args, **kwargs)
+            cache.put(key, generation, result)
+        return result
+
+    return wrapper
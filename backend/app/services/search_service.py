@@ -4,89 +4,430 @@ import re
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
+from app.core.pagination import decode_cursor, encode_cursor, keyset_conditions
+from app.core.text_analysis import analyze_text, query_stems
+from app.models.document import STEM_SOURCE_COLUMNS
+from app.services.search_cache_service import GENERATION_SCHEMA, bump_archive_generation, cached_search
+from app.services.suggestion_service import ensure_suggestion_index, lookup_suggestions
+from app.services.tag_service import TAGS_TEXT
+
 logger = logging.getLogger("zettelwirtschaft.search")
 
 
-async def ensure_fts_table(session: AsyncSession) -> None:
-    """Erstellt die FTS5-Tabelle falls nicht vorhanden."""
-    await session.execute(text("""
-        CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
-            doc_id UNINDEXED,
-            title,
-            ocr_text,
-            issuer,
-            summary,
-            tags,
-            tokenize='unicode61 remove_diacritics 2'
+# Der Index speichert nur Tokens (external content): Texte fuer snippet()
+# liest FTS5 bei Bedarf ueber die View aus documents, Schluessel ist die
+# rowid von documents. Geloeschte Dokumente sind nicht im Index.
+FTS_TOKENIZE = "unicode61 remove_diacritics 2"
+# stems: deutsche Wortstaemme samt Kompositateilen (documents.search_stems)
+_FTS_COLUMNS = "title, ocr_text, issuer, summary, tags, stems"
+_TRIGRAM_COLUMNS = "title, ocr_text, issuer, summary, tags"
+# Indexspalten, die in documents anders heissen
+_DOCUMENT_COLUMNS = {"tags": "tags_text", "stems": "search_stems"}
+
+
+def _document_columns(columns: str) -> list[str]:
+    return [_DOCUMENT_COLUMNS.get(column, column) for column in columns.split(", ")]
+
+
+def _row_values(prefix: str, columns: str) -> str:
+    """rowid und Spaltenwerte einer documents-Zeile (old/new) in Indexreihenfolge."""
+    return ", ".join(f"{prefix}.{column}" for column in ["rowid", *_document_columns(columns)])
+
+
+def _content_index(table: str, tokenize: str, columns: str) -> list[str]:
+    """FTS5-Tabelle ueber die View documents_fts_content samt Triggern auf documents."""
+    old, new = _row_values("old", columns), _row_values("new", columns)
+    watched = ", ".join([*_document_columns(columns), "status"])
+    return [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(
+            {columns},
+            content='documents_fts_content',
+            content_rowid='doc_rowid',
+            tokenize='{tokenize}'
         )
-    """))
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON documents
+        WHEN new.status != 'DELETED' BEGIN
+            INSERT INTO {table}(rowid, {columns}) VALUES ({new});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON documents
+        WHEN old.status != 'DELETED' BEGIN
+            INSERT INTO {table}({table}, rowid, {columns}) VALUES ('delete', {old});
+        END
+        """,
+        # Ein Trigger fuer beide Schritte: mehrere Trigger feuern in umgekehrter
+        # Reihenfolge ihrer Anlage, das Entfernen muss aber vor dem Einfuegen laufen
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE OF {watched} ON documents BEGIN
+            INSERT INTO {table}({table}, rowid, {columns})
+            SELECT 'delete', {old} WHERE old.status != 'DELETED';
+            INSERT INTO {table}(rowid, {columns})
+            SELECT {new} WHERE new.status != 'DELETED';
+        END
+        """,
+    ]
+
+
+FTS_SCHEMA = [
+    """
+    CREATE VIEW IF NOT EXISTS documents_fts_content AS
+    SELECT rowid AS doc_rowid, title, ocr_text, issuer, summary, tags_text AS tags, search_stems AS stems
+    FROM documents WHERE status != 'DELETED'
+    """,
+    *_content_index("documents_fts", FTS_TOKENIZE, _FTS_COLUMNS),
+    # Neue Verknuepfungen setzt attach_tags einmal je Dokument statt je Zeile:
+    # jede Aenderung von tags_text indiziert auch den ganzen OCR-Text neu
+    "DROP TRIGGER IF EXISTS document_tags_fts_ai",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS document_tags_fts_ad AFTER DELETE ON document_tags BEGIN
+        UPDATE documents SET tags_text = {TAGS_TEXT.format(doc_id="old.document_id")}
+        WHERE id = old.document_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tags_fts_au AFTER UPDATE OF name ON tags BEGIN
+        UPDATE documents SET tags_text = {TAGS_TEXT.format(doc_id="documents.id")}
+        WHERE id IN (SELECT document_id FROM document_tags WHERE tag_id = new.id);
+    END
+    """,
+]
+
+# Optionaler Zweitindex (SEARCH_TRIGRAM_ENABLED): jede Folge von drei Zeichen
+# ist ein Token, MATCH findet damit beliebige Teilzeichenketten per Index
+# (Rechnungsnummern, Wortteile) und unscharfe Anfragen trotz OCR-Fehlern
+TRIGRAM_SCHEMA = _content_index("documents_trigram", "trigram", _TRIGRAM_COLUMNS)
+# Kuerzere Terme kennt der Trigramm-Index nicht
+TRIGRAM_MIN_LENGTH = 3
+# Anfragen aus so kurzen Termen suchen als Teilwort statt per Praefix
+SHORT_TERM_LENGTH = 4
+# Unscharf (ein OCR-Fehler erlaubt) erst ab dieser Wortlaenge
+FUZZY_MIN_LENGTH = 8
+
+
+async def _table_exists(session: AsyncSession, name: str) -> bool:
+    result = await session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": name}
+    )
+    return result.scalar() is not None
+
+
+async def _fill_missing_stems(session: AsyncSession, batch_size: int = 500) -> int:
+    """Berechnet search_stems fuer Dokumente, die noch keine haben (z.B. nach der Migration).
+
+    Returns:
+        Anzahl der aktualisierten Dokumente.
+    """
+    sources = ", ".join(STEM_SOURCE_COLUMNS)
+    filled = 0
+    last_rowid = -1
+    while True:
+        result = await session.execute(
+            text(f"""
+                SELECT rowid, {sources} FROM documents
+                WHERE search_stems = '' AND rowid > :last ORDER BY rowid LIMIT :limit
+            """),
+            {"last": last_rowid, "limit": batch_size},
+        )
+        rows = result.tuples().all()
+        if not rows:
+            break
+        last_rowid = rows[-1][0]
+        updates = [{"rowid": rowid, "stems": analyze_text(*values)} for rowid, *values in rows]
+        updates = [update for update in updates if update["stems"]]
+        if updates:
+            await session.execute(text("UPDATE documents SET search_stems = :stems WHERE rowid = :rowid"), updates)
+            filled += len(updates)
+        await session.commit()
+    if filled:
+        logger.info("Wortstaemme fuer %d Dokumente berechnet", filled)
+    return filled
+
+
+async def _create_fts_schema(session: AsyncSession) -> bool:
+    """Legt Index, View, Trigger und den Generationszaehler des Suchcaches an.
+
+    Ein Index im alten Format wird ersetzt.
+
+    Returns:
+        True, wenn der Index neu angelegt wurde (und noch leer ist).
+    """
+    result = await session.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'documents_fts'")
+    )
+    existing = result.scalar()
+    if existing is not None and "stems" not in existing:
+        # Eigenstaendige Tabelle mit Textkopie oder Index ohne Wortstaemme
+        logger.info("FTS-Index im alten Format gefunden, wird ersetzt")
+        for suffix in ("ai", "ad", "au"):
+            await session.execute(text(f"DROP TRIGGER IF EXISTS documents_fts_{suffix}"))
+        await session.execute(text("DROP TABLE documents_fts"))
+        await session.execute(text("DROP VIEW IF EXISTS documents_fts_content"))
+        existing = None
+    if existing is None:
+        # Vor den Triggern, sonst indiziert jede Aktualisierung einzeln
+        await _fill_missing_stems(session)
+
+    for statement in (*FTS_SCHEMA, *GENERATION_SCHEMA):
+        await session.execute(text(statement))
     await session.commit()
+    return existing is None
 
 
-async def rebuild_fts_index(session: AsyncSession) -> None:
-    """Baut den FTS-Index komplett neu auf aus der documents-Tabelle."""
-    await ensure_fts_table(session)
-    # Clear existing index
-    await session.execute(text("DELETE FROM documents_fts"))
-    # Rebuild from documents table
-    await session.execute(text("""
-        INSERT INTO documents_fts(doc_id, title, ocr_text, issuer, summary, tags)
-        SELECT
-            d.id,
-            COALESCE(d.title, ''),
-            COALESCE(d.ocr_text, ''),
-            COALESCE(d.issuer, ''),
-            COALESCE(d.summary, ''),
-            COALESCE(
-                (SELECT GROUP_CONCAT(t.name, ' ')
-                 FROM document_tags dt JOIN tags t ON dt.tag_id = t.id
-                 WHERE dt.document_id = d.id),
-                ''
-            )
-        FROM documents d
-        WHERE d.status != 'DELETED'
-    """))
+async def ensure_fts_table(session: AsyncSession, trigram: bool | None = None) -> None:
+    """Erstellt FTS5- und Vorschlagsindex samt Triggern falls nicht vorhanden und fuellt sie.
+
+    trigram: Trigramm-Index anlegen bzw. entfernen (Standard: SEARCH_TRIGRAM_ENABLED).
+    """
+    if await _create_fts_schema(session):
+        await rebuild_fts_index(session)
+    await ensure_trigram_index(session, get_settings().SEARCH_TRIGRAM_ENABLED if trigram is None else trigram)
+    await ensure_suggestion_index(session)
+
+
+async def ensure_trigram_index(session: AsyncSession, enabled: bool) -> None:
+    """Legt den Trigramm-Index an und fuellt ihn, abgeschaltet wird er entfernt.
+
+    Ohne den Index (und seine Trigger) entfallen Platz und Schreibaufwand.
+    """
+    exists = await _table_exists(session, "documents_trigram")
+    if enabled:
+        for statement in TRIGRAM_SCHEMA:
+            await session.execute(text(statement))
+        if not exists:
+            await session.execute(text("INSERT INTO documents_trigram(documents_trigram) VALUES ('rebuild')"))
+            logger.info("Trigramm-Index angelegt")
+    elif exists:
+        for suffix in ("ai", "ad", "au"):
+            await session.execute(text(f"DROP TRIGGER IF EXISTS documents_trigram_{suffix}"))
+        await session.execute(text("DROP TABLE documents_trigram"))
+        logger.info("Trigramm-Index entfernt (SEARCH_TRIGRAM_ENABLED ist aus)")
+    if enabled != exists:
+        # Anfragen werden jetzt anders verteilt
+        await bump_archive_generation(session)
     await session.commit()
-    logger.info("FTS-Index neu aufgebaut")
 
 
-async def index_document(
-    session: AsyncSession,
-    doc_id: str,
-    title: str,
-    ocr_text: str,
-    issuer: str | None,
-    summary: str | None,
-    tags: str,
-) -> None:
-    """Fuegt ein einzelnes Dokument zum FTS-Index hinzu oder aktualisiert es."""
-    # Remove old entry if exists
-    await session.execute(
-        text("DELETE FROM documents_fts WHERE doc_id = :doc_id"),
-        {"doc_id": doc_id},
+async def rebuild_fts_index(session: AsyncSession) -> int:
+    """Baut den FTS-Index (und ggf. den Trigramm-Index) aus der documents-Tabelle neu auf.
+
+    Im Normalbetrieb halten die Trigger den Index aktuell; der Neuaufbau ist
+    fuer Wartung gedacht (z.B. nach VACUUM, das rowids neu vergeben kann).
+
+    Returns:
+        Anzahl der indizierten Dokumente.
+    """
+    await _create_fts_schema(session)
+    await _fill_missing_stems(session)
+    # Abweichende Tag-Texte zuerst korrigieren, der Neuaufbau liest sie
+    await session.execute(text(f"""
+        UPDATE documents SET tags_text = {TAGS_TEXT.format(doc_id="documents.id")}
+        WHERE tags_text IS NOT {TAGS_TEXT.format(doc_id="documents.id")}
+    """))
+    await session.execute(text("INSERT INTO documents_fts(documents_fts) VALUES ('rebuild')"))
+    if await _table_exists(session, "documents_trigram"):
+        await session.execute(text("INSERT INTO documents_trigram(documents_trigram) VALUES ('rebuild')"))
+    result = await session.execute(
+        text("SELECT COUNT(*) FROM documents WHERE status != 'DELETED'")
     )
-    # Insert new entry
+    count = result.scalar() or 0
+    await session.commit()
+    logger.info("FTS-Index fuer %d Dokumente neu aufgebaut", count)
+    return count
+
+
+# Kurze Spalten, die die Konsistenzpruefung zusaetzlich als Phrase sucht
+_PHRASE_COLUMNS = ("title", "issuer", "summary", "tags")
+
+
+def _phrase(column: str, value: str | None) -> str | None:
+    """FTS5-Phrase, die den kompletten Spalteninhalt in dieser Reihenfolge verlangt."""
+    if not value or not re.search(r"\w", value):
+        return None
+    escaped = value.replace('"', '""')
+    return f'{column} : "{escaped}"'
+
+
+async def _drifted_rows(session: AsyncSession, rows: list) -> list[int]:
+    """Prueft einen Stapel indizierter Dokumente gegen ihren aktuellen Inhalt.
+
+    Die Tokenanzahl je Spalte wird mit einer temporaeren Tabelle gleicher
+    Tokenisierung verglichen (erfasst auch geaenderte OCR-Texte); kurze
+    Spalten muessen zusaetzlich als Phrase im Index zu finden sein.
+    """
+    # Temporaer je Verbindung, daher bei jedem Stapel sicherstellen
+    await session.execute(text(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS temp.documents_fts_probe USING fts5(
+            {_FTS_COLUMNS}, content='', tokenize='{FTS_TOKENIZE}'
+        )
+    """))
+    rowids = [row[0] for row in rows]
+    placeholders = ", ".join(f":r_{i}" for i in range(len(rowids)))
+    params = {f"r_{i}": rowid for i, rowid in enumerate(rowids)}
     await session.execute(
-        text("""
-            INSERT INTO documents_fts(doc_id, title, ocr_text, issuer, summary, tags)
-            VALUES (:doc_id, :title, :ocr_text, :issuer, :summary, :tags)
+        text(f"""
+            INSERT INTO documents_fts_probe(rowid, {_FTS_COLUMNS})
+            SELECT doc_rowid, {_FTS_COLUMNS} FROM documents_fts_content
+            WHERE doc_rowid IN ({placeholders})
         """),
-        {
-            "doc_id": doc_id,
-            "title": title or "",
-            "ocr_text": ocr_text or "",
-            "issuer": issuer or "",
-            "summary": summary or "",
-            "tags": tags or "",
-        },
+        params,
     )
+    result = await session.execute(text("""
+        SELECT p.id FROM temp.documents_fts_probe_docsize p
+        JOIN documents_fts_docsize s ON s.id = p.id
+        WHERE s.sz != p.sz
+    """))
+    drifted = set(result.scalars().all())
+    await session.execute(text("INSERT INTO documents_fts_probe(documents_fts_probe) VALUES ('delete-all')"))
+
+    for rowid, *values in rows:
+        if rowid in drifted:
+            continue
+        phrases = [p for p in map(_phrase, _PHRASE_COLUMNS, values) if p]
+        if not phrases:
+            continue
+        match = await session.execute(
+            text("SELECT 1 FROM documents_fts WHERE documents_fts MATCH :q AND rowid = :rowid"),
+            {"q": " AND ".join(phrases), "rowid": rowid},
+        )
+        if match.scalar() is None:
+            drifted.add(rowid)
+    return sorted(drifted)
+
+
+async def check_fts_index(
+    session: AsyncSession,
+    repair: bool = True,
+    batch_size: int = 500,
+) -> dict:
+    """Vergleicht den FTS-Index mit den Dokumenten und repariert nur abweichende Zeilen.
+
+    Die Trigger halten den Index bei jeder Aenderung aktuell; Abweichungen
+    entstehen nur durch Schreibzugriffe ohne Trigger (aeltere Versionen,
+    externe Werkzeuge). Repariert werden:
+
+    - veraltete Tag-Texte und Wortstaemme (der Trigger indiziert die Zeile
+      dabei neu),
+    - fehlende Zeilen (werden eingefuegt),
+    - Zeilen geloeschter Dokumente (werden mit den gespeicherten Werten entfernt).
+
+    Zeilen mit abweichendem Inhalt lassen sich bei externem Inhalt nicht
+    einzeln entfernen, da die damals indizierten Texte unbekannt sind; nur
+    dann wird der Index komplett neu aufgebaut. Gearbeitet wird in Stapeln
+    mit je eigener Transaktion, damit Schreiber nicht lange warten.
+
+    Returns:
+        Statistik: checked, tags_repaired, stems_repaired, added, removed, mismatched, rebuilt.
+    """
+    await _create_fts_schema(session)
+    stats = {
+        "checked": 0, "tags_repaired": 0, "stems_repaired": 0,
+        "added": 0, "removed": 0, "mismatched": 0, "rebuilt": False,
+    }
+    tags_expected = TAGS_TEXT.format(doc_id="documents.id")
+
+    result = await session.execute(
+        text(f"SELECT rowid FROM documents WHERE tags_text IS NOT {tags_expected}")
+    )
+    stale_tags = result.scalars().all()
+    stats["tags_repaired"] = len(stale_tags)
+
+    result = await session.execute(text("""
+        SELECT doc_rowid FROM documents_fts_content
+        WHERE doc_rowid NOT IN (SELECT id FROM documents_fts_docsize)
+    """))
+    missing = result.scalars().all()
+    stats["added"] = len(missing)
+
+    result = await session.execute(text("""
+        SELECT s.id, d.rowid IS NOT NULL FROM documents_fts_docsize s
+        LEFT JOIN documents d ON d.rowid = s.id
+        WHERE s.id NOT IN (SELECT doc_rowid FROM documents_fts_content)
+    """))
+    orphans = result.tuples().all()
+    removable = [rowid for rowid, exists in orphans if exists]
+    stats["removed"] = len(removable)
+    # Ohne Dokumentzeile sind die indizierten Werte nicht mehr bekannt
+    stats["mismatched"] += len(orphans) - len(removable)
+
+    if repair:
+        for rowid in stale_tags:
+            await session.execute(
+                text(f"UPDATE documents SET tags_text = {tags_expected} WHERE rowid = :rowid"),
+                {"rowid": rowid},
+            )
+        for rowid in missing:
+            await session.execute(
+                text(f"""
+                    INSERT INTO documents_fts(rowid, {_FTS_COLUMNS})
+                    SELECT doc_rowid, {_FTS_COLUMNS} FROM documents_fts_content WHERE doc_rowid = :rowid
+                """),
+                {"rowid": rowid},
+            )
+        for rowid in removable:
+            await session.execute(
+                text(f"""
+                    INSERT INTO documents_fts(documents_fts, rowid, {_FTS_COLUMNS})
+                    SELECT 'delete', {_row_values("documents", _FTS_COLUMNS)}
+                    FROM documents WHERE rowid = :rowid
+                """),
+                {"rowid": rowid},
+            )
+    await session.commit()
+
+    skip = set(missing)
+    last_rowid = -1
+    while True:
+        result = await session.execute(
+            text("""
+                SELECT doc_rowid, title, issuer, summary, tags, ocr_text, stems FROM documents_fts_content
+                WHERE doc_rowid > :last ORDER BY doc_rowid LIMIT :limit
+            """),
+            {"last": last_rowid, "limit": batch_size},
+        )
+        rows = result.tuples().all()
+        if not rows:
+            break
+        last_rowid = rows[-1][0]
+        stats["checked"] += len(rows)
+        checked = [row[:5] for row in rows if row[0] not in skip]
+        if checked:
+            stats["mismatched"] += len(await _drifted_rows(session, checked))
+        # Staemme fehlen oder veralten bei Schreibzugriffen ohne ORM; erst nach
+        # der Pruefung korrigieren, der Trigger indiziert die Zeile dabei neu
+        stale_stems = [
+            {"rowid": rowid, "stems": expected}
+            for rowid, title, issuer, summary, _tags, ocr_text, stems in rows
+            if (expected := analyze_text(title, ocr_text, issuer, summary)) != stems
+        ]
+        stats["stems_repaired"] += len(stale_stems)
+        if repair and stale_stems:
+            await session.execute(
+                text("UPDATE documents SET search_stems = :stems WHERE rowid = :rowid"), stale_stems
+            )
+        await session.commit()
+
+    if stats["mismatched"] and repair:
+        await rebuild_fts_index(session)
+        stats["rebuilt"] = True
+
+    logger.info("FTS-Index geprueft: %s", stats)
+    return stats
 
 
 def _sanitize_fts_query(query: str) -> str:
     """Bereinigt eine Suchanfrage fuer FTS5.
 
     - Behaelt Anfuehrungszeichen fuer Phrase-Suche bei
-    - Fuegt * fuer Prefix-Suche an Woerter an (sofern nicht bereits vorhanden)
+    - Woerter treffen per Praefix ("Telek" findet "Telekom") oder ueber ihre
+      Wortstaemme (Spalte stems): "Versicherung" findet so auch
+      "Versicherungen" und "Kfz-Versicherungsbeitrag"
+    - Woerter mit Teilen ohne Stamm (Nummern, Kuerzel wie "RE-2019") suchen
+      nur per Praefix, die Staemme der uebrigen Teile waeren zu unscharf
     - Entfernt gefaehrliche Zeichen
     """
     if not query or not query.strip():
@@ -98,19 +439,72 @@ def _sanitize_fts_query(query: str) -> str:
     if '"' in query:
         return re.sub(r'[^\w\s"*äöüÄÖÜß-]', "", query)
 
-    # Split into words, add prefix search
     words = query.split()
     sanitized = []
     for word in words:
         word = re.sub(r"[^\w*äöüÄÖÜß-]", "", word)
-        if word:
-            if not word.endswith("*"):
-                word += "*"
+        if not word:
+            continue
+        if word.endswith("*"):
             sanitized.append(word)
+        elif stems := query_stems(word):
+            stem_clause = " AND ".join(f'"{stem}"' for stem in stems)
+            sanitized.append(f'("{word}"* OR stems : ({stem_clause}))')
+        else:
+            sanitized.append(f'"{word}"*')
 
-    return " ".join(sanitized)
+    # Klammerausdruecke verlangen ein explizites AND
+    return " AND ".join(sanitized)
 
 
+def _trigram_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _fuzzy_term(term: str) -> str:
+    """FTS5-Ausdruck fuer den Term mit hoechstens einem OCR-Fehler.
+
+    Bei einem falschen, fehlenden oder zusaetzlichen Zeichen an Position i
+    stehen term[:i] und term[i+1:] unveraendert im Text, hoechstens vier
+    Trigramme voneinander entfernt. Fehler in den ersten bzw. letzten drei
+    Zeichen deckt der jeweils andere Teil allein ab.
+    """
+    clauses = [_trigram_phrase(term[3:]), _trigram_phrase(term[:-3])]
+    clauses += [
+        f"NEAR({_trigram_phrase(term[:i])} {_trigram_phrase(term[i + 1:])}, 4)"
+        for i in range(3, len(term) - 3)
+    ]
+    return "(" + " OR ".join(clauses) + ")"
+
+
+def _trigram_query(query: str, fuzzy: bool = False) -> str | None:
+    """FTS5-Abfrage fuer den Trigramm-Index, falls die Anfrage dorthin gehoert.
+
+    Dorthin gehen unscharfe Anfragen (fuzzy) und solche, die der Wortindex
+    per Praefix nicht findet: Fragmente mit Ziffern oder Satzzeichen
+    (Rechnungsnummern wie "RE-2019") und kurze Terme, die auch mitten im Wort
+    treffen sollen. Jeder Term wird als Teilzeichenkette gesucht.
+
+    Returns:
+        Abfrage oder None (Wortindex verwenden).
+    """
+    if not query or '"' in query:
+        return None
+    terms = [term.strip("*") for term in query.split()]
+    terms = [term for term in terms if term]
+    if not terms or any(len(term) < TRIGRAM_MIN_LENGTH for term in terms):
+        return None
+    fragments = any(not term.isalpha() for term in terms)
+    short = all(len(term) <= SHORT_TERM_LENGTH for term in terms)
+    if not (fuzzy or fragments or short):
+        return None
+    return " AND ".join(
+        _fuzzy_term(term) if fuzzy and len(term) >= FUZZY_MIN_LENGTH else _trigram_phrase(term)
+        for term in terms
+    )
+
+
+@cached_search
 async def search_documents(
     session: AsyncSession,
     query: str | None = None,
@@ -130,10 +524,29 @@ async def search_documents(
     sort_order: str = "desc",
     page: int = 1,
     page_size: int = 25,
+    include_facets: bool = True,
+    cursor: str | None = None,
+    include_total: bool = True,
+    fuzzy: bool = False,
 ) -> dict:
-    """Fuehrt eine kombinierte Volltextsuche + Metadatenfilter durch."""
+    """Fuehrt eine kombinierte Volltextsuche + Metadatenfilter durch.
+
+    Fragmente, kurze Terme und unscharfe Anfragen (fuzzy, toleriert je Wort
+    einen OCR-Fehler) laufen ueber den Trigramm-Index, sofern er angelegt ist.
+    include_facets=False spart die Facettenberechnung (z.B. beim Blaettern).
+    Mit cursor (next_cursor der Vorseite) wird statt page per Keyset
+    weitergeblaettert; include_total=False spart dabei auch die Zaehlung
+    (total ist dann None, sofern keine Facetten angefordert sind).
+
+    Raises:
+        ValueError: Ungueltiger Cursor.
+    """
     use_fts = bool(query and query.strip())
-    fts_query = _sanitize_fts_query(query) if use_fts else ""
+    fts_table, fts_query = "documents_fts", _sanitize_fts_query(query) if use_fts else ""
+    if use_fts:
+        trigram_query = _trigram_query(query, fuzzy)
+        if trigram_query and await _table_exists(session, "documents_trigram"):
+            fts_table, fts_query = "documents_trigram", trigram_query
 
     # Build WHERE clauses
     conditions = ["d.status != 'DELETED'"]
@@ -189,89 +602,74 @@ async def search_documents(
             params[f"tag_{i}"] = tag_name
 
     where_clause = " AND ".join(conditions)
+    descending = sort_order != "asc"
+    sort_columns = {"date": "d.document_date", "amount": "d.amount", "title": "d.title"}
+    sort_column = sort_columns.get(sort_by, "d.created_at")
 
     if use_fts and fts_query:
         params["fts_query"] = fts_query
-
         base_query = f"""
             FROM documents d
-            JOIN documents_fts fts ON d.id = fts.doc_id
-            WHERE fts.documents_fts MATCH :fts_query
+            JOIN {fts_table} fts ON fts.rowid = d.rowid
+            WHERE fts.{fts_table} MATCH :fts_query
             AND {where_clause}
         """
-
-        # Count
-        count_sql = f"SELECT COUNT(*) {base_query}"
-        count_result = await session.execute(text(count_sql), params)
-        total = count_result.scalar() or 0
-
-        # Sort
-        if sort_by == "relevance":
-            order = "fts.rank"
-        elif sort_by == "date":
-            order = f"d.document_date {'ASC' if sort_order == 'asc' else 'DESC'}"
-        elif sort_by == "amount":
-            order = f"d.amount {'ASC' if sort_order == 'asc' else 'DESC'}"
-        elif sort_by == "title":
-            order = f"d.title {'ASC' if sort_order == 'asc' else 'DESC'}"
-        else:
-            order = f"d.created_at {'ASC' if sort_order == 'asc' else 'DESC'}"
-
-        offset = (page - 1) * page_size
-        params["limit"] = page_size
-        params["offset"] = offset
-
-        results_sql = f"""
-            SELECT d.id, d.title, d.document_type, d.document_date,
-                   d.amount, d.currency, d.issuer, d.thumbnail_path,
-                   d.tax_relevant, d.ai_confidence, d.created_at,
-                   snippet(documents_fts, 2, '<mark>', '</mark>', '...', 32) as highlight,
-                   -fts.rank as relevance_score
-            {base_query}
-            ORDER BY {order}
-            LIMIT :limit OFFSET :offset
+        # Spalte 1 ist ocr_text (in beiden Indizes), dort steht der Treffer im Kontext
+        scores = f"""
+            snippet({fts_table}, 1, '<mark>', '</mark>', '...', 32) as highlight,
+            -fts.rank as relevance_score
         """
-
-        results = await session.execute(text(results_sql), params)
-        rows = results.fetchall()
-
-        facets = await _compute_facets(session, base_query, params)
-
+        if sort_by == "relevance":
+            # rank ist negativ, kleiner = relevanter
+            sort_column, descending = "fts.rank", False
     else:
         base_query = f"FROM documents d WHERE {where_clause}"
+        scores = "'' as highlight, 0.0 as relevance_score"
 
-        count_sql = f"SELECT COUNT(*) {base_query}"
-        count_result = await session.execute(text(count_sql), params)
+    # Gesamtzahl und Facetten aus einer gemeinsamen Abfrage
+    facets = {"document_types": {}, "years": {}, "top_issuers": {}, "filing_scopes": {}}
+    total = None
+    if include_facets:
+        total, facets = await _compute_facets(session, base_query, params)
+    elif include_total:
+        count_result = await session.execute(text(f"SELECT COUNT(*) {base_query}"), params)
         total = count_result.scalar() or 0
 
-        if sort_by == "date":
-            order = f"d.document_date {'ASC' if sort_order == 'asc' else 'DESC'}"
-        elif sort_by == "amount":
-            order = f"d.amount {'ASC' if sort_order == 'asc' else 'DESC'}"
-        elif sort_by == "title":
-            order = f"d.title {'ASC' if sort_order == 'asc' else 'DESC'}"
-        else:
-            order = f"d.created_at {'ASC' if sort_order == 'asc' else 'DESC'}"
-
+    # Keyset-Paginierung ueber (Sortierwert, ID); ohne Cursor wie bisher per Seite
+    direction = "DESC" if descending else "ASC"
+    sort_key = f"{sort_column} {direction}"
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_key)
+        parts = keyset_conditions(
+            sort_column, "d.id", descending, value, last_id,
+            nullable=sort_column in ("d.document_date", "d.amount"),
+        )
+        offset = 0
+    else:
+        parts = [("1 = 1", {})]
         offset = (page - 1) * page_size
-        params["limit"] = page_size
-        params["offset"] = offset
 
+    rows: list = []
+    for condition, cursor_params in parts:
         results_sql = f"""
             SELECT d.id, d.title, d.document_type, d.document_date,
                    d.amount, d.currency, d.issuer, d.thumbnail_path,
                    d.tax_relevant, d.ai_confidence, d.created_at,
-                   '' as highlight,
-                   0.0 as relevance_score
-            {base_query}
-            ORDER BY {order}
+                   {scores}, {sort_column} as sort_value
+            {base_query} AND {condition}
+            ORDER BY {sort_column} {direction}, d.id {direction}
             LIMIT :limit OFFSET :offset
         """
+        page_params = {**params, **cursor_params, "limit": page_size + 1 - len(rows), "offset": offset}
+        results = await session.execute(text(results_sql), page_params)
+        rows += results.fetchall()
+        if len(rows) > page_size:
+            break
 
-        results = await session.execute(text(results_sql), params)
-        rows = results.fetchall()
-
-        facets = await _compute_facets(session, base_query, params)
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(sort_key, rows[-1][13], rows[-1][0])
 
     # Fetch tags for results
     doc_ids = [row[0] for row in rows]
@@ -303,77 +701,68 @@ async def search_documents(
         "page": page,
         "page_size": page_size,
         "facets": facets,
+        "next_cursor": next_cursor,
     }
 
 
+def _by_count(items: list[tuple[str, int]]) -> dict[str, int]:
+    return dict(sorted(items, key=lambda item: item[1], reverse=True))
+
+
 async def _compute_facets(
     session: AsyncSession,
     base_query: str,
     params: dict,
-) -> dict:
-    """Berechnet Facetten fuer die Suchergebnisse."""
-    facets = {"document_types": {}, "years": {}, "top_issuers": {}, "filing_scopes": {}}
+) -> tuple[int, dict]:
+    """Berechnet Gesamtzahl und Facetten in einer Abfrage.
 
-    type_sql = f"""
-        SELECT d.document_type, COUNT(*) as cnt
-        {base_query}
-        GROUP BY d.document_type
-        ORDER BY cnt DESC
-    """
-    type_result = await session.execute(text(type_sql), params)
-    facets["document_types"] = {
-        row[0]: row[1] for row in type_result.fetchall() if row[0]
-    }
+    Die Treffermenge (inkl. FTS-MATCH und Filtern) wird einmal materialisiert,
+    alle Zaehlungen laufen ueber diese Zwischenmenge.
 
-    year_sql = f"""
-        SELECT CAST(strftime('%Y', d.document_date) AS TEXT) as year, COUNT(*) as cnt
-        {base_query} AND d.document_date IS NOT NULL
-        GROUP BY year
-        ORDER BY year DESC
+    Returns:
+        (Gesamtzahl, Facetten)
     """
-    year_result = await session.execute(text(year_sql), params)
-    facets["years"] = {
-        row[0]: row[1] for row in year_result.fetchall() if row[0]
-    }
+    result = await session.execute(
+        text(f"""
+            WITH matches AS MATERIALIZED (
+                SELECT d.document_type, d.document_date, d.issuer, d.filing_scope_id
+                {base_query}
+            )
+            SELECT 'total', NULL, COUNT(*) FROM matches
+            UNION ALL
+            SELECT 'type', document_type, COUNT(*) FROM matches
+            WHERE document_type IS NOT NULL GROUP BY document_type
+            UNION ALL
+            SELECT 'year', strftime('%Y', document_date), COUNT(*) FROM matches
+            WHERE document_date IS NOT NULL GROUP BY 2
+            UNION ALL
+            SELECT * FROM (
+                SELECT 'issuer', issuer, COUNT(*) AS cnt FROM matches
+                WHERE issuer IS NOT NULL AND issuer != ''
+                GROUP BY issuer ORDER BY cnt DESC, issuer LIMIT 10
+            )
+            UNION ALL
+            SELECT 'scope', fs.name, COUNT(*) FROM matches m
+            JOIN filing_scopes fs ON fs.id = m.filing_scope_id GROUP BY fs.name
+        """),
+        params,
+    )
 
-    issuer_sql = f"""
-        SELECT d.issuer, COUNT(*) as cnt
-        {base_query} AND d.issuer IS NOT NULL AND d.issuer != ''
-        GROUP BY d.issuer
-        ORDER BY cnt DESC
-        LIMIT 10
-    """
-    issuer_result = await session.execute(text(issuer_sql), params)
-    facets["top_issuers"] = {
-        row[0]: row[1] for row in issuer_result.fetchall() if row[0]
+    total = 0
+    buckets: dict[str, list[tuple[str, int]]] = {"type": [], "year": [], "issuer": [], "scope": []}
+    for kind, value, count in result.fetchall():
+        if kind == "total":
+            total = count
+        elif value:
+            buckets[kind].append((value, count))
+
+    facets = {
+        "document_types": _by_count(buckets["type"]),
+        "years": dict(sorted(buckets["year"], reverse=True)),
+        "top_issuers": _by_count(buckets["issuer"]),
+        "filing_scopes": _by_count(buckets["scope"]),
     }
-
-    scope_sql = f"""
-        SELECT fs.name, COUNT(*) as cnt
-        {base_query} AND d.filing_scope_id IS NOT NULL
-        {'AND' if 'JOIN' not in base_query.upper() or 'filing_scopes' not in base_query else 'AND'}
-        1=1
-        GROUP BY d.filing_scope_id
-    """
-    # Simpler approach: join filing_scopes
-    scope_sql = f"""
-        SELECT fs.name, COUNT(*) as cnt
-        FROM documents d
-        LEFT JOIN filing_scopes fs ON d.filing_scope_id = fs.id
-        WHERE d.id IN (SELECT d.id {base_query})
-        AND fs.name IS NOT NULL
-        GROUP BY fs.name
-        ORDER BY cnt DESC
-    """
-    try:
-        scope_result = await session.execute(text(scope_sql), params)
-        facets["filing_scopes"] = {
-            row[0]: row[1] for row in scope_result.fetchall() if row[0]
-        }
-    except Exception:
-        pass  # Graceful degradation if filing_scopes table doesn't exist yet
-
-    return facets
+    return total, facets
 
 
 async def _fetch_tags_for_docs(
@@ -407,15 +796,25 @@ async def _fetch_tags_for_docs(
     return tags_map
 
 
+@cached_search
 async def suggest(
     session: AsyncSession,
     query: str,
     limit: int = 10,
 ) -> list[str]:
-    """Liefert Autocomplete-Vorschlaege basierend auf Ausstellern und Tags."""
+    """Liefert Autocomplete-Vorschlaege aus Ausstellern, Tags und Titeln.
+
+    Sortiert nach Haeufigkeit aus dem Praefixindex; ein Wort des Vorschlags
+    muss mit der Eingabe beginnen. Ohne Index (nicht migrierte Datenbank)
+    wird wie bisher per LIKE gesucht.
+    """
     if not query or len(query) < 2:
         return []
 
+    indexed = await lookup_suggestions(session, query, limit)
+    if indexed is not None:
+        return indexed
+
     suggestions: list[str] = []
     pattern = f"%{query}%"
 
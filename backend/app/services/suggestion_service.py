@@ -0,0 +1,289 @@
+"""Praefixindex fuer Autocomplete-Vorschlaege (Aussteller, Tags, Titel).
+
+Trigger auf documents, document_tags und tags zaehlen je Begriff, wie oft er
+vorkommt (suggestion_terms). Daraus wird die Tabelle suggestion_prefixes
+abgeleitet: je Wortanfang eines Begriffs eine Zeile pro Praefix bis
+PREFIX_LENGTH Zeichen, nach (Praefix, Haeufigkeit) sortiert gespeichert. Ein
+Vorschlag liest damit nur die ersten Zeilen eines Indexbereichs, unabhaengig
+von der Groesse des Archivs.
+
+Die Praefixzeilen fuer geaenderte Begriffe zieht ein Hintergrund-Task alle
+SUGGESTION_SYNC_INTERVAL Sekunden nach (Wortzerlegung in Python, in
+SQL-Triggern nicht moeglich): geaendert ist ein Begriff, solange frequency
+von indexed_frequency abweicht. Abfragen lesen nur.
+"""
+
+import asyncio
+import logging
+import re
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.search_cache_service import bump_archive_generation
+
+logger = logging.getLogger("zettelwirtschaft.suggestions")
+
+# Laengere Eingaben suchen im Eimer der ersten PREFIX_LENGTH Zeichen weiter
+PREFIX_LENGTH = 8
+
+_WORD_RE = re.compile(r"\w+")
+
+_BUMP = """
+    INSERT INTO suggestion_terms (kind, term, frequency)
+    SELECT '{kind}', {term}, MAX({delta}, 0) WHERE {term} IS NOT NULL AND {term} != ''{condition}
+    ON CONFLICT (kind, term) DO UPDATE SET frequency = MAX(frequency + {delta}, 0);
+"""
+
+
+def _bump(kind: str, term: str, delta: str, condition: str = "") -> str:
+    return _BUMP.format(kind=kind, term=term, delta=delta, condition=f" AND {condition}" if condition else "")
+
+
+_TAG_NAME = "(SELECT name FROM tags WHERE id = {}.tag_id)"
+_TAG_USES = "(SELECT COUNT(*) FROM document_tags WHERE tag_id = new.id)"
+
+SUGGESTION_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS suggestion_terms (
+        id INTEGER PRIMARY KEY,
+        kind TEXT NOT NULL,
+        term TEXT NOT NULL,
+        frequency INTEGER NOT NULL,
+        indexed_frequency INTEGER NOT NULL DEFAULT 0,
+        UNIQUE (kind, term)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_suggestion_terms_changed ON suggestion_terms (id)
+    WHERE frequency != indexed_frequency
+    """,
+    # Nur kurze Schluessel, der Begriff selbst steht einmal in suggestion_terms
+    """
+    CREATE TABLE IF NOT EXISTS suggestion_prefixes (
+        prefix TEXT NOT NULL,
+        frequency INTEGER NOT NULL,
+        term_id INTEGER NOT NULL,
+        PRIMARY KEY (prefix, frequency DESC, term_id)
+    ) WITHOUT ROWID
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS documents_suggest_ai AFTER INSERT ON documents
+    WHEN new.status != 'DELETED' BEGIN
+        {_bump("issuer", "new.issuer", "1")}
+        {_bump("title", "new.title", "1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS documents_suggest_ad AFTER DELETE ON documents
+    WHEN old.status != 'DELETED' BEGIN
+        {_bump("issuer", "old.issuer", "-1")}
+        {_bump("title", "old.title", "-1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS documents_suggest_au AFTER UPDATE OF title, issuer, status ON documents
+    WHEN old.title IS NOT new.title OR old.issuer IS NOT new.issuer
+        OR (old.status = 'DELETED') != (new.status = 'DELETED') BEGIN
+        {_bump("issuer", "old.issuer", "-1", "old.status != 'DELETED'")}
+        {_bump("title", "old.title", "-1", "old.status != 'DELETED'")}
+        {_bump("issuer", "new.issuer", "1", "new.status != 'DELETED'")}
+        {_bump("title", "new.title", "1", "new.status != 'DELETED'")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS document_tags_suggest_ai AFTER INSERT ON document_tags BEGIN
+        {_bump("tag", _TAG_NAME.format("new"), "1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS document_tags_suggest_ad AFTER DELETE ON document_tags BEGIN
+        {_bump("tag", _TAG_NAME.format("old"), "-1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tags_suggest_au AFTER UPDATE OF name ON tags
+    WHEN old.name IS NOT new.name BEGIN
+        {_bump("tag", "old.name", f"-{_TAG_USES}")}
+        {_bump("tag", "new.name", _TAG_USES)}
+    END
+    """,
+]
+
+# Haeufigkeiten aus dem aktuellen Datenbestand (Neuaufbau, Migration)
+_COUNT_TERMS = """
+    INSERT INTO suggestion_terms (kind, term, frequency)
+    SELECT 'issuer', issuer, COUNT(*) FROM documents
+    WHERE status != 'DELETED' AND issuer IS NOT NULL AND issuer != '' GROUP BY issuer
+    UNION ALL
+    SELECT 'title', title, COUNT(*) FROM documents
+    WHERE status != 'DELETED' AND title IS NOT NULL AND title != '' GROUP BY title
+    UNION ALL
+    SELECT 'tag', t.name, COUNT(*) FROM document_tags dt JOIN tags t ON t.id = dt.tag_id
+    WHERE t.name != '' GROUP BY t.name
+"""
+
+
+def _key(value: str) -> str:
+    return " ".join(value.split()).casefold()
+
+
+def term_prefixes(term: str) -> set[str]:
+    """Praefixe (1 bis PREFIX_LENGTH Zeichen) ab jedem Wortanfang des Begriffs."""
+    key = _key(term)
+    return {
+        key[m.start():m.start() + length]
+        for m in _WORD_RE.finditer(key)
+        for length in range(1, PREFIX_LENGTH + 1)
+        if m.start() + length <= len(key)
+    }
+
+
+def _matches(term: str, query_key: str) -> bool:
+    """Beginnt ein Wort des Begriffs mit der (ggf. mehrwortigen) Eingabe?"""
+    key = _key(term)
+    return any(key.startswith(query_key, m.start()) for m in _WORD_RE.finditer(key))
+
+
+async def _index_exists(session: AsyncSession) -> bool:
+    result = await session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'suggestion_terms'")
+    )
+    return result.scalar() is not None
+
+
+async def sync_suggestion_index(session: AsyncSession, batch_size: int = 1000) -> int:
+    """Zieht die Praefixzeilen fuer alle geaenderten Begriffe nach.
+
+    Alte Zeilen werden ueber die zuletzt indizierte Haeufigkeit gezielt per
+    Primaerschluessel entfernt.
+
+    Returns:
+        Anzahl der aktualisierten Begriffe.
+    """
+    synced = 0
+    while True:
+        result = await session.execute(
+            text("""
+                SELECT id, term, frequency, indexed_frequency FROM suggestion_terms
+                WHERE frequency != indexed_frequency LIMIT :limit
+            """),
+            {"limit": batch_size},
+        )
+        rows = result.tuples().all()
+        if not rows:
+            break
+        removed, added = [], []
+        for term_id, term, frequency, indexed_frequency in rows:
+            prefixes = term_prefixes(term)
+            if indexed_frequency > 0:
+                removed.extend({"prefix": p, "frequency": indexed_frequency, "term_id": term_id} for p in prefixes)
+            if frequency > 0:
+                added.extend({"prefix": p, "frequency": frequency, "term_id": term_id} for p in prefixes)
+        if removed:
+            await session.execute(
+                text("""
+                    DELETE FROM suggestion_prefixes
+                    WHERE prefix = :prefix AND frequency = :frequency AND term_id = :term_id
+                """),
+                removed,
+            )
+        if added:
+            await session.execute(
+                text("""
+                    INSERT INTO suggestion_prefixes (prefix, frequency, term_id)
+                    VALUES (:prefix, :frequency, :term_id)
+                """),
+                added,
+            )
+        ids = [{"id": term_id} for term_id, *_ in rows]
+        await session.execute(text("UPDATE suggestion_terms SET indexed_frequency = frequency WHERE id = :id"), ids)
+        # Nicht mehr vorkommende Begriffe werden nicht mehr gebraucht
+        await session.execute(text("DELETE FROM suggestion_terms WHERE id = :id AND frequency = 0"), ids)
+        # Zwischengespeicherte Vorschlaege vom Stand vor dem Nachziehen verwerfen
+        await bump_archive_generation(session)
+        await session.commit()
+        synced += len(rows)
+    if synced:
+        logger.debug("Vorschlagsindex: %d Begriffe aktualisiert", synced)
+    return synced
+
+
+async def rebuild_suggestion_index(session: AsyncSession) -> int:
+    """Zaehlt alle Begriffe neu und baut den Praefixindex komplett auf.
+
+    Returns:
+        Anzahl der Begriffe im Index.
+    """
+    for statement in SUGGESTION_SCHEMA:
+        await session.execute(text(statement))
+    await session.execute(text("DELETE FROM suggestion_prefixes"))
+    await session.execute(text("DELETE FROM suggestion_terms"))
+    await session.execute(text(_COUNT_TERMS))
+    await session.commit()
+    count = await sync_suggestion_index(session)
+    logger.info("Vorschlagsindex fuer %d Begriffe neu aufgebaut", count)
+    return count
+
+
+async def ensure_suggestion_index(session: AsyncSession) -> None:
+    """Legt Tabellen und Trigger an und fuellt den Index, falls er neu ist."""
+    if await _index_exists(session):
+        for statement in SUGGESTION_SCHEMA:
+            await session.execute(text(statement))
+        await session.commit()
+        await sync_suggestion_index(session)
+    else:
+        await rebuild_suggestion_index(session)
+
+
+async def run_suggestion_sync(session_factory, settings) -> None:
+    """Background-Task: Zieht geaenderte Begriffe in den Praefixindex nach."""
+    logger.info("Vorschlagsindex-Sync gestartet (Intervall: %ds)", settings.SUGGESTION_SYNC_INTERVAL)
+    while True:
+        try:
+            async with session_factory() as session:
+                if await _index_exists(session):
+                    await sync_suggestion_index(session)
+        except asyncio.CancelledError:
+            break
+        except Exception:
+            logger.exception("Fehler beim Nachziehen des Vorschlagsindex")
+        await asyncio.sleep(settings.SUGGESTION_SYNC_INTERVAL)
+
+
+async def lookup_suggestions(session: AsyncSession, query: str, limit: int = 10) -> list[str] | None:
+    """Haeufigste Begriffe, bei denen ein Wort mit der Eingabe beginnt.
+
+    Liest nur; Aenderungen seit dem letzten sync_suggestion_index fehlen noch.
+
+    Returns:
+        Vorschlaege oder None, wenn der Index (noch) nicht angelegt ist.
+    """
+    if not await _index_exists(session):
+        return None
+
+    query_key = _key(query)
+    words = _WORD_RE.findall(query_key)
+    if not words or not query_key.startswith(words[0]):
+        return []
+    # Jedes Wort der Eingabe beginnt an einem Wortanfang des Begriffs, das
+    # laengste grenzt den Eimer am staerksten ein
+    bucket = max(words, key=len)[:PREFIX_LENGTH]
+    # Innerhalb des Eimers passt dann jede Zeile, sonst wird nachgefiltert
+    exact = bucket == query_key
+
+    statement = text("""
+        SELECT t.term FROM suggestion_prefixes p JOIN suggestion_terms t ON t.id = p.term_id
+        WHERE p.prefix = :prefix
+        ORDER BY p.frequency DESC, p.term_id
+    """)
+    suggestions: list[str] = []
+    result = await session.stream(statement, {"prefix": bucket})
+    async for term in result.scalars():
+        if term not in suggestions and (exact or _matches(term, query_key)):
+            suggestions.append(term)
+            if len(suggestions) >= limit:
+                break
+    await result.close()
+    return suggestions
@@ -0,0 +1,86 @@
+import logging
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import DocumentTag, Tag
+
+logger = logging.getLogger("zettelwirtschaft.tags")
+
+# Tag-Namen eines Dokuments fuer den Volltextindex (documents.tags_text)
+TAGS_TEXT = """
+    (SELECT COALESCE(GROUP_CONCAT(name, ' '), '') FROM (
+        SELECT t.name FROM document_tags dt JOIN tags t ON dt.tag_id = t.id
+        WHERE dt.document_id = {doc_id} ORDER BY t.name
+    ))
+"""
+
+
+def tags_text(tag_names: list[str]) -> str:
+    """tags_text fuer normalisierte Tag-Namen, wie TAGS_TEXT ihn berechnet."""
+    return " ".join(sorted(set(tag_names)))
+
+
+def normalize_tag_names(tag_names: list[str]) -> list[str]:
+    """Kleinschreibung, ohne Leerraum, ohne leere Namen und Duplikate (Reihenfolge bleibt)."""
+    names = (name.strip().lower() for name in tag_names if name)
+    return list(dict.fromkeys(name for name in names if name))
+
+
+async def resolve_tag_ids(
+    tag_names: list[str],
+    session: AsyncSession,
+    auto_generated: bool = True,
+) -> dict[str, int]:
+    """Holt oder erstellt Tags in konstant vielen Datenbank-Zugriffen.
+
+    Fehlende Namen werden mit einem einzigen INSERT ... ON CONFLICT DO NOTHING
+    angelegt (auch bei nebenlaeufig angelegten Tags konfliktfrei), danach
+    werden alle IDs mit einer Abfrage gelesen.
+
+    Returns:
+        Normalisierter Name -> Tag-ID, in der Reihenfolge der Eingabe.
+    """
+    names = normalize_tag_names(tag_names)
+    if not names:
+        return {}
+
+    await session.execute(
+        insert(Tag)
+        .values([{"name": name, "is_auto_generated": auto_generated} for name in names])
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+    result = await session.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names)))
+    ids = dict(result.tuples().all())
+    return {name: ids[name] for name in names if name in ids}
+
+
+async def attach_tags(
+    document_id: str,
+    tag_ids: list[int],
+    session: AsyncSession,
+) -> int:
+    """Verknuepft Tags mit einem Dokument (ein INSERT, bestehende bleiben).
+
+    documents.tags_text wird danach einmal nachgezogen (nicht je Zeile per
+    Trigger) und nur, wenn er sich aendert: jede Aenderung indiziert das
+    Dokument samt OCR-Text neu.
+
+    Returns:
+        Anzahl neu angelegter Verknuepfungen.
+    """
+    if not tag_ids:
+        return 0
+    result = await session.execute(
+        insert(DocumentTag)
+        .values([{"document_id": document_id, "tag_id": tag_id} for tag_id in tag_ids])
+        .on_conflict_do_nothing()
+    )
+    if result.rowcount:
+        expected = TAGS_TEXT.format(doc_id=":id")
+        await session.execute(
+            text(f"UPDATE documents SET tags_text = {expected} WHERE id = :id AND tags_text IS NOT {expected}"),
+            {"id": document_id},
+        )
+    return result.rowcount
@@ -0,0 +1,160 @@
+import logging
+import re
+
+logger = logging.getLogger("zettelwirtschaft.text_budget")
+
+# Grobe Schaetzung: ~4 Zeichen pro Token bei deutschem Text
+CHARS_PER_TOKEN = 4
+
+# Zeilen am Dokumentanfang (Absender, Titel, Anschrift) erhalten einen Bonus
+_HEADER_LINES = 8
+
+# Ueberlange Zeilen (z.B. OCR ohne Zeilenumbrueche) werden in Segmente geteilt
+_MAX_SEGMENT_CHARS = 400
+
+_GAP_MARKER = "[...]"
+
+_AMOUNT_RE = re.compile(r"\d{1,3}(?:[.\s]\d{3})*,\d{2}\b|\d+\.\d{2}\b|€|\bEUR\b", re.IGNORECASE)
+_DATE_RE = re.compile(
+    r"\b\d{1,2}\.\s?\d{1,2}\.\s?(?:\d{4}|\d{2})\b"
+    r"|\b\d{4}-\d{2}-\d{2}\b"
+    r"|\b\d{1,2}\.\s?(?:januar|februar|maerz|märz|april|mai|juni|juli|august|september"
+    r"|oktober|november|dezember)\b",
+    re.IGNORECASE,
+)
+_IBAN_RE = re.compile(r"\b[A-Z]{2}\d{2}(?:\s?[A-Z0-9]{4}){3,7}\b")
+_TOTAL_RE = re.compile(
+    r"\b(?:summe|gesamt\w*|endbetrag|rechnungsbetrag|zu zahlen|zahlbetrag|brutto|total"
+    r"|netto|mwst|ust|umsatzsteuer|beitrag)\b",
+    re.IGNORECASE,
+)
+_KEYWORD_RE = re.compile(
+    r"\b(?:rechnung\w*|quittung|beleg|kundennummer|vertragsnummer|aktenzeichen"
+    r"|referenz|versicherungs\w*|police|vertrag\w*|garantie\w*|gewaehrleistung|gewährleistung"
+    r"|steuer\w*|finanzamt|lohn\w*|miete|kuendigung|kündigung|laufzeit|faellig\w*|fällig\w*"
+    r"|datum|zeitraum)\b",
+    re.IGNORECASE,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Schaetzt die Tokenanzahl eines Textes."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _split_segments(text: str) -> list[str]:
+    """Teilt den Text in Zeilen; ueberlange Zeilen werden an Leerzeichen aufgeteilt."""
+    segments: list[str] = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        while len(line) > _MAX_SEGMENT_CHARS:
+            cut = line.rfind(" ", 0, _MAX_SEGMENT_CHARS)
+            if cut <= 0:
+                cut = _MAX_SEGMENT_CHARS
+            segments.append(line[:cut].strip())
+            line = line[cut:].strip()
+        if line:
+            segments.append(line)
+    return segments
+
+
+def score_segment(segment: str, position: int) -> float:
+    """Bewertet ein Textsegment nach extraktionsrelevanten Signalen."""
+    score = 0.0
+    if _AMOUNT_RE.search(segment):
+        score += 3.0
+        if _TOTAL_RE.search(segment):
+            score += 3.0
+    if _DATE_RE.search(segment):
+        score += 3.0
+    if _IBAN_RE.search(segment):
+        score += 2.0
+    score += 2.0 * min(len(_KEYWORD_RE.findall(segment)), 2)
+    if position < _HEADER_LINES:
+        score += 2.5
+
+    # Rauschen (Trennlinien, OCR-Muell) abwerten
+    alnum = sum(c.isalnum() for c in segment)
+    if alnum < 3 or alnum / len(segment) < 0.4:
+        score -= 3.0
+    return score
+
+
+def select_relevant_text(text: str, token_budget: int) -> str:
+    """Waehlt die relevantesten Segmente eines OCR-Textes innerhalb eines Token-Budgets.
+
+    Segmente werden nach Signalen bewertet (Betraege, Datumsangaben, IBAN,
+    Schluesselwoerter, Dokumentkopf) und nach Relevanz pro Token gepackt. Die
+    Ausgabe behaelt die Originalreihenfolge; Luecken werden mit "[...]" markiert.
+
+    Args:
+        text: Vollstaendiger OCR-Text.
+        token_budget: Maximale (geschaetzte) Tokenanzahl der Ausgabe.
+
+    Returns:
+        Der unveraenderte Text, wenn er ins Budget passt, sonst die Auswahl.
+    """
+    if estimate_tokens(text) <= token_budget:
+        return text
+
+    segments = _split_segments(text)
+    costs = [estimate_tokens(seg) for seg in segments]
+    scores = [score_segment(seg, i) for i, seg in enumerate(segments)]
+
+    ranked = sorted(
+        range(len(segments)),
+        key=lambda i: (scores[i] / costs[i], scores[i], -i),
+        reverse=True,
+    )
+
+    selected: set[int] = set()
+    used = 0
+    for i in ranked:
+        if scores[i] <= 0:
+            break
+        if used + costs[i] > token_budget:
+            continue
+        selected.add(i)
+        used += costs[i]
+
+    # Restbudget mit Kontext um ausgewaehlte Segmente auffuellen
+    for i in sorted(selected):
+        for neighbor in (i - 1, i + 1):
+            if 0 <= neighbor < len(segments) and neighbor not in selected:
+                if used + costs[neighbor] <= token_budget:
+                    selected.add(neighbor)
+                    used += costs[neighbor]
+
+    parts: list[str] = []
+    previous = -1
+    for i in sorted(selected):
+        if i != previous + 1:
+            parts.append(_GAP_MARKER)
+        parts.append(segments[i])
+        previous = i
+    if previous != len(segments) - 1:
+        parts.append(_GAP_MARKER)
+
+    logger.debug(
+        "Textauswahl: %d/%d Segmente, ~%d/%d Tokens",
+        len(selected), len(segments), used, estimate_tokens(text),
+    )
+    return "\n".join(parts)
+
+
+def split_into_chunks(text: str, chunk_chars: int) -> list[str]:
+    """Teilt einen Text an Zeilengrenzen in Abschnitte von hoechstens chunk_chars Zeichen."""
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for segment in _split_segments(text):
+        if current and size + len(segment) + 1 > chunk_chars:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(segment)
+        size += len(segment) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
@@ -1,17 +1,32 @@
+import asyncio
 import logging
-import shutil
 from pathlib import Path
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import Settings
-from app.core.file_utils import generate_stored_filename, get_file_extension
+from app.core.file_utils import (
+    compute_file_hash,
+    copy_file_with_hash,
+    generate_stored_filename,
+    get_file_extension,
+    move_file,
+)
 from app.models.processing_job import JobSource, JobStatus, ProcessingJob
 from app.services.file_validation_service import validate_file
 
 logger = logging.getLogger("zettelwirtschaft.upload")
 
 
+def _store_upload(file_path: Path, dest_path: Path, source: JobSource) -> str:
+    """Legt die Datei in UPLOAD_DIR ab und gibt ihren Hash zurueck (blockierend)."""
+    if source == JobSource.WATCH_FOLDER:
+        move_file(file_path, dest_path)
+        return compute_file_hash(dest_path)
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    return copy_file_with_hash(file_path, dest_path)
+
+
 async def process_upload(
     file_path: Path,
     original_name: str,
@@ -42,15 +57,11 @@ async def process_upload(
     # Eindeutigen Dateinamen generieren und in UPLOAD_DIR speichern
     stored_name = generate_stored_filename(original_name)
     ext = get_file_extension(original_name)
-    upload_dir = Path(settings.UPLOAD_DIR)
-    upload_dir.mkdir(parents=True, exist_ok=True)
-    dest_path = upload_dir / stored_name
+    dest_path = Path(settings.UPLOAD_DIR) / stored_name
 
-    # Datei kopieren/verschieben
-    if source == JobSource.WATCH_FOLDER:
-        shutil.move(str(file_path), str(dest_path))
-    else:
-        shutil.copy2(str(file_path), str(dest_path))
+    # Datei kopieren/verschieben (ausserhalb des Event-Loops); der Hash wird
+    # hier einmalig berechnet
+    file_hash = await asyncio.to_thread(_store_upload, file_path, dest_path, source)
 
     # Queue-Eintrag erstellen
     job = ProcessingJob(
@@ -59,6 +70,7 @@ async def process_upload(
         file_path=str(dest_path),
         file_type=ext,
         file_size_bytes=file_size,
+        file_hash=file_hash,
         source=source,
         status=JobStatus.PENDING,
     )
@@ -0,0 +1 @@
+"""Werkzeuge fuer Durchsatzmessungen (nicht Teil der Anwendung)."""
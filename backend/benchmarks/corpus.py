@@ -0,0 +1,460 @@
+"""Synthetischer Dokumentkorpus fuer Last- und Skalierungstests.
+
+Erzeugt deutsche Rechnungen, Kassenbons, Lohnabrechnungen und mehrseitige
+Vertraege mit bekannten Sollwerten (ground_truth.jsonl) als digitale PDFs,
+gescannte PDFs (Rasterbild mit Rauschen und Drehung) oder Bilder.
+
+Aufruf:
+    python -m benchmarks.corpus ./korpus --count 200 --formats pdf,scan,jpg --noise 0.3 --rotation 2
+"""
+
+import argparse
+import json
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+
+DOCUMENT_KINDS = ("rechnung", "quittung", "lohn", "vertrag")
+FORMATS = ("pdf", "scan", "jpg", "png")
+
+_FIRST_NAMES = ["Anna", "Lukas", "Marie", "Jonas", "Sophie", "Felix", "Lea", "Paul", "Emma", "Ben"]
+_LAST_NAMES = ["Mueller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker"]
+_STREETS = ["Hauptstrasse", "Bahnhofstrasse", "Gartenweg", "Lindenallee", "Schulstrasse", "Am Markt"]
+_CITIES = [
+    ("10115", "Berlin"), ("80331", "Muenchen"), ("50667", "Koeln"), ("20095", "Hamburg"),
+    ("70173", "Stuttgart"), ("04109", "Leipzig"), ("90402", "Nuernberg"), ("28195", "Bremen"),
+]
+_SHOPS = [
+    ("REWE Markt GmbH", ["Milch 1,5%", "Vollkornbrot", "Aepfel lose", "Kaffee 500g", "Butter"]),
+    ("dm-drogerie markt", ["Zahnpasta", "Shampoo", "Duschgel", "Taschentuecher"]),
+    ("OBI Baumarkt", ["Schrauben 4x40", "Duebel 8mm", "Wandfarbe weiss 10l", "Malerrolle"]),
+    ("Aral Tankstelle", ["Super E10", "Scheibenreiniger", "Autowaesche Premium"]),
+    ("MediaMarkt", ["USB-C Kabel", "Kopfhoerer", "HDMI Adapter", "Powerbank 10000mAh"]),
+]
+_TRADES = [
+    ("Elektro Wagner GmbH", "HANDWERKER_RECHNUNG", ["Arbeitszeit Elektriker", "Steckdose Unterputz", "Anfahrt"]),
+    ("Sanitaer Becker & Sohn", "HANDWERKER_RECHNUNG", ["Arbeitszeit Installateur", "Eckventil", "Dichtungsmaterial"]),
+    ("Stadtwerke Musterstadt", "RECHNUNG", ["Stromverbrauch", "Grundpreis", "Zaehlermiete"]),
+    ("Telekom Deutschland GmbH", "RECHNUNG", ["MagentaZuhause L", "Router-Miete", "Verbindungen"]),
+    ("Zahnarztpraxis Dr. Fischer", "ARZTRECHNUNG", ["Professionelle Zahnreinigung", "Befund", "Beratung"]),
+]
+_EMPLOYERS = ["Musterbau AG", "Logistik Nord GmbH", "Stadtverwaltung Musterstadt", "Praxis am Park"]
+_CONTRACTS = [
+    ("MIETVERTRAG", "Mietvertrag ueber Wohnraum", "Vermieter"),
+    ("KAUFVERTRAG", "Kaufvertrag Gebrauchtfahrzeug", "Verkaeufer"),
+    ("VERSICHERUNGSPOLICE", "Versicherungsschein Hausratversicherung", "Versicherer"),
+]
+_CONTRACT_CLAUSES = [
+    "Die Vertragsparteien verpflichten sich, die nachstehenden Bedingungen einzuhalten.",
+    "Die Kuendigung bedarf der Schriftform und ist mit einer Frist von drei Monaten zulaessig.",
+    "Zahlungen sind jeweils zum dritten Werktag eines Monats faellig.",
+    "Nebenabreden wurden nicht getroffen; Aenderungen beduerfen der Schriftform.",
+    "Sollte eine Bestimmung unwirksam sein, bleibt die Wirksamkeit der uebrigen unberuehrt.",
+    "Der Gerichtsstand ist der Sitz des Vertragsgegenstandes.",
+    "Die Haftung ist auf Vorsatz und grobe Fahrlaessigkeit beschraenkt.",
+    "Schoenheitsreparaturen sind nach Massgabe der gesetzlichen Regelungen durchzufuehren.",
+]
+
+TAG_VOCABULARY = [
+    "einkauf", "lebensmittel", "drogerie", "baumarkt", "elektronik", "tanken", "auto",
+    "handwerker", "strom", "internet", "gesundheit", "zahnarzt", "gehalt", "lohn",
+    "wohnung", "miete", "vertrag", "versicherung", "hausrat", "steuer", "haushalt",
+]
+
+
+@dataclass
+class SyntheticDocument:
+    """Inhalt und Sollwerte eines synthetischen Dokuments."""
+
+    document_type: str
+    title: str
+    sender: str
+    recipient: str
+    document_date: date
+    amount: float | None
+    reference_number: str
+    tags: list[str]
+    pages: list[list[str]] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return "\n\n".join("\n".join(lines) for lines in self.pages)
+
+    def ground_truth(self) -> dict:
+        return {
+            "document_type": self.document_type,
+            "title": self.title,
+            "sender": self.sender,
+            "recipient": self.recipient,
+            "document_date": self.document_date.isoformat(),
+            "amount": self.amount,
+            "currency": "EUR",
+            "reference_number": self.reference_number,
+            "tags": self.tags,
+            "pages": len(self.pages),
+        }
+
+
+def format_amount(value: float) -> str:
+    """Deutsches Zahlenformat: 1.234,56"""
+    return f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _person(rng: random.Random) -> tuple[str, str]:
+    name = f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+    plz, city = rng.choice(_CITIES)
+    return name, f"{rng.choice(_STREETS)} {rng.randint(1, 120)}, {plz} {city}"
+
+
+def _random_date(rng: random.Random) -> date:
+    return date(2019, 1, 1) + timedelta(days=rng.randint(0, 6 * 365))
+
+
+def _paginate(lines: list[str], pages: int) -> list[list[str]]:
+    per_page = max(1, -(-len(lines) // pages))
+    return [lines[i:i + per_page] for i in range(0, len(lines), per_page)][:pages] or [[]]
+
+
+def _receipt(rng: random.Random, size: float) -> SyntheticDocument:
+    shop, items = rng.choice(_SHOPS)
+    _, address = _person(rng)
+    day = _random_date(rng)
+    lines = [shop, address, ""]
+    total = 0.0
+    for _ in range(max(1, round(rng.randint(2, 8) * size))):
+        price = round(rng.uniform(0.5, 40), 2)
+        total += price
+        lines.append(f"{rng.choice(items):<28}{format_amount(price):>10}")
+    total = round(total, 2)
+    ref = f"{rng.randint(1000, 9999)}-{rng.randint(100000, 999999)}"
+    lines += [
+        "-" * 38,
+        f"{'SUMME EUR':<28}{format_amount(total):>10}",
+        f"MwSt 19%  {format_amount(round(total * 0.19 / 1.19, 2))}",
+        f"Bon-Nr. {ref}   {day:%d.%m.%Y} {rng.randint(8, 20):02d}:{rng.randint(0, 59):02d}",
+        "Vielen Dank fuer Ihren Einkauf!",
+    ]
+    tag = {"REWE": "lebensmittel", "dm-d": "drogerie", "OBI ": "baumarkt", "Aral": "tanken"}
+    return SyntheticDocument(
+        document_type="QUITTUNG",
+        title=f"Kassenbon {shop}",
+        sender=shop,
+        recipient="",
+        document_date=day,
+        amount=total,
+        reference_number=ref,
+        tags=["einkauf", tag.get(shop[:4], "elektronik")],
+        pages=[lines],
+    )
+
+
+def _invoice(rng: random.Random, size: float, pages: int) -> SyntheticDocument:
+    issuer, doc_type, items = rng.choice(_TRADES)
+    customer, customer_address = _person(rng)
+    day = _random_date(rng)
+    ref = f"RE-{day.year}-{rng.randint(10000, 99999)}"
+    lines = [
+        issuer, f"{rng.choice(_STREETS)} {rng.randint(1, 90)}, {rng.choice(_CITIES)[0]}", "",
+        customer, customer_address, "",
+        f"Rechnung Nr. {ref}", f"Rechnungsdatum: {day:%d.%m.%Y}",
+        f"Kundennummer: {rng.randint(100000, 999999)}", "",
+        "Pos  Beschreibung                     Betrag",
+    ]
+    net = 0.0
+    for pos in range(1, max(2, round(rng.randint(3, 12) * size * pages)) + 1):
+        price = round(rng.uniform(8, 450), 2)
+        net += price
+        lines.append(f"{pos:<5}{rng.choice(items):<33}{format_amount(price):>10}")
+    net = round(net, 2)
+    vat = round(net * 0.19, 2)
+    total = round(net + vat, 2)
+    lines += [
+        "",
+        f"Nettobetrag {format_amount(net)} EUR",
+        f"Umsatzsteuer 19% {format_amount(vat)} EUR",
+        f"Rechnungsbetrag {format_amount(total)} EUR",
+        "",
+        f"Zahlbar bis {(day + timedelta(days=14)):%d.%m.%Y} ohne Abzug.",
+        f"IBAN DE{rng.randint(10, 99)} {rng.randint(1000, 9999)} {rng.randint(1000, 9999)} "
+        f"{rng.randint(1000, 9999)} {rng.randint(1000, 9999)} {rng.randint(10, 99)}",
+    ]
+    tags = {
+        "HANDWERKER_RECHNUNG": ["handwerker", "haushalt", "steuer"],
+        "ARZTRECHNUNG": ["gesundheit", "zahnarzt"],
+    }.get(doc_type, ["strom" if "Stadtwerke" in issuer else "internet", "haushalt"])
+    return SyntheticDocument(
+        document_type=doc_type,
+        title=f"Rechnung {issuer} {ref}",
+        sender=issuer,
+        recipient=customer,
+        document_date=day,
+        amount=total,
+        reference_number=ref,
+        tags=tags,
+        pages=_paginate(lines, pages),
+    )
+
+
+def _payslip(rng: random.Random, size: float) -> SyntheticDocument:
+    employer = rng.choice(_EMPLOYERS)
+    employee, address = _person(rng)
+    day = _random_date(rng).replace(day=28)
+    gross = round(rng.uniform(2200, 6500), 2)
+    tax = round(gross * rng.uniform(0.08, 0.2), 2)
+    social = round(gross * 0.205, 2)
+    net = round(gross - tax - social, 2)
+    ref = f"PN {rng.randint(10000, 99999)}"
+    lines = [
+        employer, "Personalabteilung", "",
+        employee, address, "",
+        f"Verdienstabrechnung {day:%m/%Y}", f"Personalnummer: {ref}",
+        f"Steuerklasse {rng.randint(1, 5)}   Kinderfreibetrag {rng.choice(['0,0', '0,5', '1,0'])}", "",
+        f"Grundgehalt                     {format_amount(gross)}",
+        f"Gesamtbrutto                    {format_amount(gross)}",
+        f"Lohnsteuer                      {format_amount(tax)}",
+        f"Sozialversicherung              {format_amount(social)}",
+    ]
+    lines += [f"Hinweis {i}: Bitte bewahren Sie diese Abrechnung auf." for i in range(round(3 * size))]
+    lines.append(f"Auszahlungsbetrag               {format_amount(net)}")
+    return SyntheticDocument(
+        document_type="LOHNABRECHNUNG",
+        title=f"Lohnabrechnung {day:%m/%Y} {employer}",
+        sender=employer,
+        recipient=employee,
+        document_date=day,
+        amount=net,
+        reference_number=ref,
+        tags=["gehalt", "lohn", "steuer"],
+        pages=[lines],
+    )
+
+
+def _contract(rng: random.Random, size: float, pages: int) -> SyntheticDocument:
+    doc_type, heading, role = rng.choice(_CONTRACTS)
+    party_a, address_a = _person(rng)
+    party_b, address_b = _person(rng)
+    day = _random_date(rng)
+    ref = f"V-{rng.randint(100000, 999999)}"
+    amount = round(rng.choice([450, 780, 1150, 8900, 12.9, 24.5]) * rng.uniform(0.9, 1.1), 2)
+    lines = [
+        heading, "", f"Vertragsnummer: {ref}", "",
+        f"zwischen {party_a}, {address_a} ({role})",
+        f"und {party_b}, {address_b}", "",
+    ]
+    paragraphs = max(pages * 8, round(pages * 10 * size))
+    for number in range(1, paragraphs + 1):
+        lines.append(f"§ {number}")
+        lines.append(rng.choice(_CONTRACT_CLAUSES))
+        if number == 2:
+            lines.append(f"Der monatliche Betrag betraegt {format_amount(amount)} EUR.")
+    lines += ["", f"Musterstadt, den {day:%d.%m.%Y}", "", "Unterschrift                Unterschrift"]
+    tags = {
+        "MIETVERTRAG": ["wohnung", "miete", "vertrag"],
+        "KAUFVERTRAG": ["auto", "vertrag"],
+        "VERSICHERUNGSPOLICE": ["versicherung", "hausrat"],
+    }[doc_type]
+    return SyntheticDocument(
+        document_type=doc_type,
+        title=f"{heading} {ref}",
+        sender=party_a,
+        recipient=party_b,
+        document_date=day,
+        amount=amount,
+        reference_number=ref,
+        tags=tags,
+        pages=_paginate(lines, pages),
+    )
+
+
+def generate_document(
+    rng: random.Random,
+    kind: str | None = None,
+    pages: int = 1,
+    size: float = 1.0,
+) -> SyntheticDocument:
+    """Erzeugt Inhalt und Sollwerte eines Dokuments.
+
+    Args:
+        rng: Zufallsgenerator (fuer reproduzierbare Korpora).
+        kind: rechnung, quittung, lohn oder vertrag (None = zufaellig).
+        pages: Seitenzahl (nur Rechnungen und Vertraege sind mehrseitig).
+        size: Skalierung der Textmenge (1.0 = typisch).
+    """
+    kind = kind or rng.choice(DOCUMENT_KINDS)
+    if kind == "quittung":
+        return _receipt(rng, size)
+    if kind == "rechnung":
+        return _invoice(rng, size, pages)
+    if kind == "lohn":
+        return _payslip(rng, size)
+    if kind == "vertrag":
+        return _contract(rng, size, max(pages, 2))
+    raise ValueError(f"Unbekannte Dokumentart: {kind}")
+
+
+def write_digital_pdf(doc: SyntheticDocument, path: Path) -> None:
+    """Digitales PDF mit eingebettetem Text (pdfplumber-lesbar)."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(str(path), pagesize=A4)
+    _, height = A4
+    for lines in doc.pages:
+        c.setFont("Courier", 10)
+        y = height - 60
+        for line in lines:
+            if y < 50:
+                break
+            c.drawString(50, y, line)
+            y -= 14
+        c.showPage()
+    c.save()
+
+
+def _load_font(size: int):
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def render_page(
+    lines: list[str],
+    rng: random.Random,
+    noise: float = 0.0,
+    rotation: float = 0.0,
+    dpi: int = 150,
+):
+    """Rendert eine Seite als Graustufenbild wie ein Scan.
+
+    Args:
+        noise: 0.0 (sauber) bis 1.0 (stark verrauscht, unscharf).
+        rotation: Maximale Schraeglage in Grad (zufaellig +/-).
+    """
+    from PIL import Image, ImageDraw, ImageFilter
+
+    width, height = int(8.27 * dpi), int(11.69 * dpi)
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    font_size = max(10, dpi // 7)
+    font = _load_font(font_size)
+    y = dpi // 2
+    for line in lines:
+        if y > height - dpi // 2:
+            break
+        draw.text((dpi // 2, y), line, fill=rng.randint(0, 40), font=font)
+        y += int(font_size * 1.4)
+
+    if noise > 0:
+        for _ in range(int(width * height * 0.002 * noise)):
+            draw.point((rng.randrange(width), rng.randrange(height)), fill=rng.randint(0, 160))
+        image = image.filter(ImageFilter.GaussianBlur(radius=noise * 1.2))
+    if rotation:
+        image = image.rotate(rng.uniform(-rotation, rotation), expand=False, fillcolor=255)
+    return image
+
+
+def write_scanned_pdf(
+    doc: SyntheticDocument, path: Path, rng: random.Random, noise: float, rotation: float,
+) -> None:
+    """PDF aus Rasterbildern (ohne Textebene, erfordert OCR)."""
+    images = [render_page(lines, rng, noise, rotation) for lines in doc.pages]
+    images[0].save(path, "PDF", save_all=True, append_images=images[1:], resolution=150)
+
+
+def write_image(
+    doc: SyntheticDocument, path: Path, rng: random.Random, noise: float, rotation: float,
+) -> None:
+    """Erste Seite als JPEG/PNG (wie ein Smartphone-Foto)."""
+    image = render_page(doc.pages[0], rng, noise, rotation)
+    if path.suffix == ".jpg":
+        image.save(path, "JPEG", quality=85)
+    else:
+        image.save(path, "PNG")
+
+
+def generate_corpus(
+    target: Path,
+    count: int,
+    kinds: tuple[str, ...] = DOCUMENT_KINDS,
+    formats: tuple[str, ...] = ("pdf",),
+    pages: tuple[int, int] = (1, 3),
+    size: float = 1.0,
+    noise: float = 0.0,
+    rotation: float = 0.0,
+    seed: int = 1,
+) -> list[Path]:
+    """Schreibt count Dokumente nach target und die Sollwerte nach ground_truth.jsonl.
+
+    Returns:
+        Die erzeugten Dateipfade.
+    """
+    rng = random.Random(seed)
+    target.mkdir(parents=True, exist_ok=True)
+    paths = []
+    with open(target / "ground_truth.jsonl", "w", encoding="utf-8") as truth:
+        for i in range(count):
+            kind = rng.choice(kinds)
+            fmt = rng.choice(formats)
+            page_count = rng.randint(*pages) if fmt in ("pdf", "scan") else 1
+            doc = generate_document(rng, kind, page_count, size)
+
+            suffix = {"pdf": ".pdf", "scan": ".pdf", "jpg": ".jpg", "png": ".png"}[fmt]
+            path = target / f"{i:06d}_{kind}_{fmt}{suffix}"
+            if fmt == "pdf":
+                write_digital_pdf(doc, path)
+            elif fmt == "scan":
+                write_scanned_pdf(doc, path, rng, noise, rotation)
+            else:
+                write_image(doc, path, rng, noise, rotation)
+
+            truth.write(json.dumps(
+                {"file": path.name, "format": fmt, **doc.ground_truth()}, ensure_ascii=False,
+            ) + "\n")
+            paths.append(path)
+    return paths
+
+
+def _csv(value: str, allowed: tuple[str, ...]) -> tuple[str, ...]:
+    items = tuple(v.strip() for v in value.split(",") if v.strip())
+    unknown = set(items) - set(allowed)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unbekannt: {', '.join(sorted(unknown))}")
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetischen Dokumentkorpus erzeugen")
+    parser.add_argument("target", type=Path)
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--kinds", default=",".join(DOCUMENT_KINDS),
+                        type=lambda v: _csv(v, DOCUMENT_KINDS))
+    parser.add_argument("--formats", default="pdf", type=lambda v: _csv(v, FORMATS),
+                        help="pdf (digital), scan (Bild-PDF), jpg, png")
+    parser.add_argument("--pages", default="1-3", help="Seitenzahl min-max")
+    parser.add_argument("--size", type=float, default=1.0, help="Skalierung der Textmenge")
+    parser.add_argument("--noise", type=float, default=0.0, help="0.0 bis 1.0")
+    parser.add_argument("--rotation", type=float, default=0.0, help="max. Grad")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    low, _, high = args.pages.partition("-")
+    paths = generate_corpus(
+        args.target,
+        args.count,
+        kinds=args.kinds,
+        formats=args.formats,
+        pages=(int(low), int(high or low)),
+        size=args.size,
+        noise=args.noise,
+        rotation=args.rotation,
+        seed=args.seed,
+    )
+    print(f"{len(paths)} Dokumente in {args.target} erzeugt (Sollwerte: ground_truth.jsonl)")
+
+
+if __name__ == "__main__":
+    main()
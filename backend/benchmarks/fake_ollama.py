@@ -0,0 +1,256 @@
+"""Lokaler Ollama-Ersatz, der aufgezeichnete Antworten wiedergibt.
+
+Beantwortet /api/chat, /api/generate und /api/tags mit konfigurierbarer
+Latenz und Fehlerinjektion. Ohne Aufzeichnung wird eine gueltige
+Analyse-Antwort (QUITTUNG) erzeugt.
+
+Aufruf:
+    python -m benchmarks.fake_ollama --port 11434 --latency-ms 800 --responses antworten.jsonl
+
+Die Aufzeichnung ist eine JSONL-Datei: pro Zeile entweder ein vollstaendiger
+/api/chat-Antwortkoerper (mit "message") oder direkt das Analyse-JSON.
+"""
+
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+_BATCH_DOC_RE = re.compile(r"^=== Dokument (\d+) ===", re.MULTILINE)
+
+
+def default_analysis(text: str) -> dict:
+    """Gueltige Analyse-Antwort mit einem Titel aus der ersten Textzeile."""
+    first_line = next((line.strip() for line in text.splitlines() if line.strip()), "Beleg")
+    return {
+        "document_type": "QUITTUNG",
+        "confidence": 0.9,
+        "title": first_line[:80],
+        "sender": first_line[:80],
+        "recipient": None,
+        "document_date": "2024-03-15",
+        "amount": 12.5,
+        "currency": "EUR",
+        "reference_number": None,
+        "tags": ["einkauf"],
+        "summary": "Synthetischer Beleg.",
+        "tax_relevant": False,
+        "tax_category": None,
+        "tax_year": None,
+        "warranty_info": None,
+        "filing_scope": None,
+        "filing_scope_confidence": 0.0,
+        "needs_review": False,
+        "review_questions": [],
+    }
+
+
+def load_recording(path: Path) -> list[dict]:
+    """Liest eine JSONL-Aufzeichnung."""
+    entries = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            entries.append(json.loads(line))
+    return entries
+
+
+class FakeOllama:
+    """Ollama-Ersatz in einem Hintergrund-Thread.
+
+    Args:
+        responses: Aufgezeichnete Antworten (werden reihum wiedergegeben).
+        latency_ms: Grundlatenz je /api/chat-Anfrage.
+        jitter_ms: Zufaellige Zusatzlatenz (gleichverteilt 0..jitter_ms).
+        failure_rate: Anteil der Anfragen, die mit HTTP 500 scheitern.
+        load_ms: Simulierte Ladezeit des Modells beim ersten Aufruf.
+        seed: Startwert fuer reproduzierbare Latenzen und Fehler.
+    """
+
+    def __init__(
+        self,
+        responses: list[dict] | None = None,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        failure_rate: float = 0.0,
+        load_ms: float = 0.0,
+        seed: int | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.load_ms = load_ms
+        self.requests = 0
+        self.failures = 0
+        self._responses = itertools.cycle(responses) if responses else None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._loaded = False
+
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.startswith("/api/tags"):
+                    self._send(200, {"models": []})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.startswith("/api/generate"):
+                    self._send(200, outer._generate(payload))
+                elif self.path.startswith("/api/chat"):
+                    status, body = outer._chat(payload)
+                    self._send(status, body)
+                else:
+                    self._send(404, {"error": "not found"})
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllama":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllama":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _load_ns(self) -> int:
+        """Ladezeit nur beim ersten Aufruf (Kaltstart)."""
+        with self._lock:
+            if self._loaded:
+                return 0
+            self._loaded = True
+        time.sleep(self.load_ms / 1000)
+        return int(self.load_ms * 1e6)
+
+    def _generate(self, payload: dict) -> dict:
+        load_ns = self._load_ns()
+        return {"model": payload.get("model"), "done": True, "load_duration": load_ns}
+
+    def _next_analysis(self, text: str) -> dict:
+        with self._lock:
+            entry = next(self._responses) if self._responses else None
+        if entry is None:
+            return default_analysis(text)
+        if "message" in entry:
+            try:
+                return json.loads(entry["message"]["content"])
+            except (KeyError, TypeError, json.JSONDecodeError):
+                return default_analysis(text)
+        return dict(entry)
+
+    def _content_for(self, payload: dict) -> str:
+        messages = payload.get("messages") or []
+        text = messages[-1].get("content", "") if messages else ""
+        schema = payload.get("format")
+
+        if isinstance(schema, dict) and "results" in schema.get("properties", {}):
+            # Micro-Batch: ein Ergebnis pro "=== Dokument N ==="-Abschnitt
+            parts = _BATCH_DOC_RE.split(text)[1:]
+            results = []
+            for index, doc_text in zip(parts[::2], parts[1::2]):
+                results.append({"index": int(index), **self._next_analysis(doc_text)})
+            return json.dumps({"results": results}, ensure_ascii=False)
+
+        analysis = self._next_analysis(text)
+        if isinstance(schema, dict) and "properties" in schema:
+            # Teilschemata (Reparatur, Abschnitte) nur mit den verlangten Feldern
+            analysis = {k: v for k, v in analysis.items() if k in schema["properties"]}
+        return json.dumps(analysis, ensure_ascii=False)
+
+    def _chat(self, payload: dict) -> tuple[int, dict]:
+        with self._lock:
+            self.requests += 1
+            fail = self._random.random() < self.failure_rate
+            delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+        load_ns = self._load_ns()
+        time.sleep(delay / 1000)
+
+        if fail:
+            with self._lock:
+                self.failures += 1
+            return 500, {"error": "injected failure"}
+
+        prompt_chars = sum(len(m.get("content", "")) for m in payload.get("messages") or [])
+        content = self._content_for(payload)
+        eval_ns = int(delay * 1e6 * 0.8)
+        prompt_eval_ns = int(delay * 1e6) - eval_ns
+        return 200, {
+            "model": payload.get("model"),
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+            "prompt_eval_count": prompt_chars // 4,
+            "eval_count": len(content) // 4,
+            "load_duration": load_ns,
+            "prompt_eval_duration": prompt_eval_ns,
+            "eval_duration": eval_ns,
+            "total_duration": load_ns + prompt_eval_ns + eval_ns,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lokaler Ollama-Ersatz mit Wiedergabe")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--responses", type=Path, help="JSONL-Aufzeichnung")
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--load-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    responses = load_recording(args.responses) if args.responses else None
+    server = FakeOllama(
+        responses=responses,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        load_ms=args.load_ms,
+        seed=args.seed,
+        host=args.host,
+        port=args.port,
+    )
+    print(f"Fake-Ollama laeuft auf {server.url} (Strg+C zum Beenden)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
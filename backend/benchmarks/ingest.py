@@ -0,0 +1,300 @@
+"""End-to-End-Durchsatzmessung der Ingest-Pipeline gegen den Fake-Ollama.
+
+Schiebt einen Korpus durch process_upload -> run_queue_worker ->
+archive_document und berichtet Dokumente pro Minute, Latenz-Perzentile je
+Stufe und den Spitzen-Speicherverbrauch (RSS).
+
+Aufruf:
+    python -m benchmarks.ingest --docs 50 --latency-ms 300 --json ergebnis.json
+    python -m benchmarks.ingest --docs 50 --baseline ergebnis.json
+
+Alle Daten (Datenbank, Uploads, Archiv) landen in einem temporaeren
+Verzeichnis; die Konfiguration aus .env wird nicht gelesen.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import Settings
+from app.database import Base
+from app.models.processing_job import JobSource, JobStatus, ProcessingJob
+from app.services import analysis_service, batch_analysis_service, queue_worker_service
+from app.services.llm_telemetry_service import _percentile
+from app.services.search_service import ensure_fts_table
+from app.services.upload_service import process_upload
+from benchmarks.corpus import generate_corpus
+from benchmarks.fake_ollama import FakeOllama, load_recording
+
+_TERMINAL = (JobStatus.COMPLETED, JobStatus.NEEDS_REVIEW, JobStatus.FAILED)
+
+_DOCUMENT_SUFFIXES = {".pdf", ".jpg", ".jpeg", ".png", ".tiff", ".bmp"}
+
+
+def _corpus_files(corpus: Path, docs: int) -> list[Path]:
+    files = sorted(
+        p for p in corpus.rglob("*")
+        if p.is_file() and p.suffix.lower() in _DOCUMENT_SUFFIXES
+    )
+    return files[:docs] if docs else files
+
+
+class StageTimer:
+    """Misst die Dauer einzelner Pipeline-Stufen durch Umhuellen der Funktionen."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    def wrap(self, stage: str, func):
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.samples[stage].append((time.perf_counter() - start) * 1000)
+        return timed
+
+    def instrument(self, stack: ExitStack) -> None:
+        targets = [
+            ("thumbnail", queue_worker_service, "generate_thumbnail"),
+            ("ocr", analysis_service, "extract_text"),
+            ("llm", analysis_service, "call_llm"),
+            ("llm", batch_analysis_service, "call_llm"),
+            ("archive", queue_worker_service, "archive_document"),
+        ]
+        for stage, module, name in targets:
+            stack.enter_context(
+                patch.object(module, name, self.wrap(stage, getattr(module, name)))
+            )
+
+    def summary(self) -> dict:
+        return {stage: _latency_summary(values) for stage, values in sorted(self.samples.items())}
+
+
+def _latency_summary(values: list[float]) -> dict:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "p50_ms": _percentile(ordered, 50),
+        "p95_ms": _percentile(ordered, 95),
+        "max_ms": ordered[-1] if ordered else None,
+    }
+
+
+def peak_rss_mb() -> float | None:
+    """Spitzen-RSS des Prozesses in MB (None, wenn nicht ermittelbar)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux meldet KB, macOS Bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+async def run_benchmark(
+    docs: int = 20,
+    corpus: Path | None = None,
+    latency_ms: float = 200.0,
+    jitter_ms: float = 0.0,
+    failure_rate: float = 0.0,
+    load_ms: float = 0.0,
+    responses: list[dict] | None = None,
+    settings_overrides: dict | None = None,
+    timeout: float = 600.0,
+) -> dict:
+    """Fuehrt eine Messung durch und gibt den Bericht als Dict zurueck."""
+    with tempfile.TemporaryDirectory(prefix="zw-bench-") as tmp, FakeOllama(
+        responses=responses,
+        latency_ms=latency_ms,
+        jitter_ms=jitter_ms,
+        failure_rate=failure_rate,
+        load_ms=load_ms,
+        seed=42,
+    ) as fake:
+        workdir = Path(tmp)
+        for name in ("uploads", "watch", "archive", "thumbnails"):
+            (workdir / name).mkdir()
+
+        settings = Settings(
+            _env_file=None,
+            DATABASE_URL=f"sqlite+aiosqlite:///{workdir / 'bench.db'}",
+            UPLOAD_DIR=str(workdir / "uploads"),
+            WATCH_DIR=str(workdir / "watch"),
+            ARCHIVE_DIR=str(workdir / "archive"),
+            THUMBNAIL_DIR=str(workdir / "thumbnails"),
+            OLLAMA_BASE_URL=fake.url,
+            OLLAMA_BASE_URLS="",
+            QUEUE_POLL_INTERVAL=1,
+            LOG_LEVEL="WARNING",
+            **(settings_overrides or {}),
+        )
+
+        files = (
+            _corpus_files(corpus, docs) if corpus
+            else generate_corpus(workdir / "corpus", docs, formats=("pdf",), pages=(1, 2))
+        )
+
+        engine = create_async_engine(settings.DATABASE_URL, echo=False)
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with session_factory() as session:
+            await ensure_fts_table(session)
+
+        timer = StageTimer()
+        job_started: dict[str, float] = {}
+        job_finished: dict[str, float] = {}
+
+        with ExitStack() as stack:
+            timer.instrument(stack)
+            bench_start = time.perf_counter()
+
+            # 1. Upload
+            async with session_factory() as session:
+                for path in files:
+                    start = time.perf_counter()
+                    job = await process_upload(
+                        path, path.name, path.stat().st_size, JobSource.UPLOAD, settings, session,
+                    )
+                    await session.commit()
+                    job_started[job.id] = start
+                    timer.samples["upload"].append((time.perf_counter() - start) * 1000)
+
+            # 2. Queue-Worker bis alle Jobs einen Endstatus haben
+            worker = asyncio.create_task(
+                queue_worker_service.run_queue_worker(session_factory, settings)
+            )
+            try:
+                deadline = time.perf_counter() + timeout
+                while len(job_finished) < len(job_started):
+                    if time.perf_counter() > deadline:
+                        raise TimeoutError("Benchmark-Zeitlimit ueberschritten")
+                    await asyncio.sleep(0.05)
+                    async with session_factory() as session:
+                        result = await session.execute(
+                            select(ProcessingJob.id).where(ProcessingJob.status.in_(_TERMINAL))
+                        )
+                        now = time.perf_counter()
+                        for job_id in result.scalars():
+                            job_finished.setdefault(job_id, now)
+            finally:
+                worker.cancel()
+                try:
+                    await worker
+                except asyncio.CancelledError:
+                    pass
+
+            elapsed = time.perf_counter() - bench_start
+
+        async with session_factory() as session:
+            result = await session.execute(
+                select(ProcessingJob.status, func.count()).group_by(ProcessingJob.status)
+            )
+            statuses = {str(status.value): count for status, count in result.all()}
+        await engine.dispose()
+
+        end_to_end = [
+            (job_finished[job_id] - job_started[job_id]) * 1000 for job_id in job_finished
+        ]
+        return {
+            "documents": len(files),
+            "elapsed_seconds": elapsed,
+            "docs_per_minute": len(files) / elapsed * 60 if elapsed else 0.0,
+            "statuses": statuses,
+            "end_to_end": _latency_summary(end_to_end),
+            "stages": timer.summary(),
+            "llm_requests": fake.requests,
+            "llm_failures": fake.failures,
+            "peak_rss_mb": peak_rss_mb(),
+            "config": {
+                "latency_ms": latency_ms,
+                "jitter_ms": jitter_ms,
+                "failure_rate": failure_rate,
+                "settings": settings_overrides or {},
+            },
+        }
+
+
+def _fmt(value) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def format_report(report: dict, baseline: dict | None = None) -> str:
+    """Menschenlesbarer Bericht, optional mit Abweichung zur Baseline."""
+
+    def delta(current, previous) -> str:
+        if baseline is None or not current or not previous:
+            return ""
+        return f"  ({(current - previous) / previous * 100:+.1f}%)"
+
+    lines = [
+        f"Dokumente:        {report['documents']}  {report['statuses']}",
+        f"Dauer:            {report['elapsed_seconds']:.1f}s",
+        f"Durchsatz:        {report['docs_per_minute']:.1f} Dok./min"
+        + delta(report["docs_per_minute"], (baseline or {}).get("docs_per_minute")),
+        f"LLM-Anfragen:     {report['llm_requests']} (Fehler: {report['llm_failures']})",
+        f"Spitzen-RSS:      {_fmt(report['peak_rss_mb'])} MB",
+        "",
+        f"{'Stufe':<12}{'Anzahl':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}",
+    ]
+    stages = {**report["stages"], "gesamt": report["end_to_end"]}
+    base_stages = {**(baseline or {}).get("stages", {}), "gesamt": (baseline or {}).get("end_to_end", {})}
+    for stage, values in stages.items():
+        lines.append(
+            f"{stage:<12}{values['count']:>8}{_fmt(values['p50_ms']):>10}"
+            f"{_fmt(values['p95_ms']):>10}{_fmt(values['max_ms']):>10}"
+            + delta(values["p95_ms"], base_stages.get(stage, {}).get("p95_ms"))
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Durchsatzmessung der Ingest-Pipeline")
+    parser.add_argument("--docs", type=int, default=20, help="Anzahl Dokumente (0 = ganzer Korpus)")
+    parser.add_argument("--corpus", type=Path, help="Verzeichnis mit Dokumenten (sonst digitale PDFs aus benchmarks.corpus)")
+    parser.add_argument("--responses", type=Path, help="JSONL-Aufzeichnung fuer den Fake-Ollama")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--load-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--set", action="append", default=[], metavar="NAME=WERT",
+        help="Einstellung ueberschreiben, z.B. --set BATCH_ANALYSIS_ENABLED=true",
+    )
+    parser.add_argument("--json", type=Path, help="Bericht als JSON speichern")
+    parser.add_argument("--baseline", type=Path, help="Frueheren JSON-Bericht zum Vergleich")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    overrides = dict(item.split("=", 1) for item in args.set)
+    report = asyncio.run(run_benchmark(
+        docs=args.docs,
+        corpus=args.corpus,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        load_ms=args.load_ms,
+        responses=load_recording(args.responses) if args.responses else None,
+        settings_overrides=overrides,
+    ))
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    print(format_report(report, baseline))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
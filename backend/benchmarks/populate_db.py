@@ -0,0 +1,161 @@
+"""Befuellt eine Datenbank direkt mit vielen synthetischen Dokumenten.
+
+Fuer Messungen von Suche, Listen und Facetten bei Archivgroessen von
+100.000 bis 1.000.000 Dokumenten. Es werden keine Dateien erzeugt; die
+Zeilen enthalten OCR-Text, Metadaten und Tags aus benchmarks.corpus.
+
+Aufruf:
+    python -m benchmarks.populate_db --database sqlite+aiosqlite:///./data/bench.db --count 100000
+
+Standardmaessig wird eine eigene Datenbank unter ./data/bench.db verwendet,
+damit die produktive Datenbank unberuehrt bleibt.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+import uuid
+from datetime import datetime, time as dt_time, timezone
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.text_analysis import analyze_text
+from app.database import Base
+from app.models.document import STEM_SOURCE_COLUMNS, Document, DocumentTag, Tag
+from app.services.search_service import ensure_fts_table, rebuild_fts_index
+from benchmarks.corpus import DOCUMENT_KINDS, TAG_VOCABULARY, generate_document
+
+DEFAULT_DATABASE = "sqlite+aiosqlite:///./data/bench.db"
+
+_TAX_CATEGORIES = {
+    "HANDWERKER_RECHNUNG": "Handwerkerleistungen",
+    "ARZTRECHNUNG": "Aussergewoehnliche_Belastungen",
+    "LOHNABRECHNUNG": "Werbungskosten",
+    "VERSICHERUNGSPOLICE": "Vorsorgeaufwendungen",
+}
+
+
+async def _ensure_tags(session: AsyncSession) -> dict[str, int]:
+    """Legt das Tag-Vokabular an und gibt name -> id zurueck."""
+    existing = {t.name: t.id for t in (await session.execute(select(Tag))).scalars()}
+    missing = [name for name in TAG_VOCABULARY if name not in existing]
+    if missing:
+        await session.execute(
+            insert(Tag), [{"name": name, "is_auto_generated": True} for name in missing]
+        )
+        await session.commit()
+        existing = {t.name: t.id for t in (await session.execute(select(Tag))).scalars()}
+    return existing
+
+
+def _document_row(rng: random.Random, index: int, size: float) -> tuple[dict, list[str]]:
+    kind = rng.choice(DOCUMENT_KINDS)
+    doc = generate_document(rng, kind, pages=rng.randint(1, 3), size=size)
+    doc_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    tax_category = _TAX_CATEGORIES.get(doc.document_type)
+    created = datetime.combine(doc.document_date, dt_time(12, 0), tzinfo=timezone.utc)
+    file_type = rng.choice(["pdf", "pdf", "jpg", "png"])
+    row = {
+        "id": doc_id,
+        "original_filename": f"scan_{index:07d}.{file_type}",
+        "stored_filename": f"{doc_id}.{file_type}",
+        "file_path": f"/archive/{doc.document_date.year}/{doc_id}.{file_type}",
+        "file_type": file_type,
+        "file_size_bytes": rng.randint(20_000, 4_000_000),
+        "file_hash": hashlib.sha256(doc_id.encode()).hexdigest(),
+        "document_type": doc.document_type,
+        "title": doc.title,
+        "document_date": doc.document_date,
+        "amount": doc.amount,
+        "currency": "EUR",
+        "issuer": doc.sender,
+        "recipient": doc.recipient or None,
+        "reference_number": doc.reference_number,
+        "summary": f"{doc.title} vom {doc.document_date:%d.%m.%Y}.",
+        "ocr_text": doc.text,
+        "ocr_confidence": round(rng.uniform(0.6, 0.99), 2),
+        "tax_relevant": tax_category is not None,
+        "tax_year": doc.document_date.year if tax_category else None,
+        "tax_category": tax_category,
+        "status": "ACTIVE",
+        "review_status": "NEEDS_REVIEW" if rng.random() < 0.05 else "OK",
+        "ai_confidence": round(rng.uniform(0.5, 0.98), 2),
+        "created_at": created,
+        "updated_at": created,
+    }
+    tags = list(dict.fromkeys(doc.tags + rng.sample(TAG_VOCABULARY, rng.randint(0, 2))))
+    # Sonst pflegt der Trigger auf document_tags die Spalte (nur mit FTS-Schema)
+    row["tags_text"] = " ".join(sorted(tags))
+    # Sammel-INSERT umgeht die ORM-Events, die search_stems sonst berechnen
+    row["search_stems"] = analyze_text(*(row[name] for name in STEM_SOURCE_COLUMNS))
+    return row, tags
+
+
+async def populate(
+    database_url: str = DEFAULT_DATABASE,
+    count: int = 100_000,
+    batch_size: int = 5_000,
+    size: float = 1.0,
+    seed: int = 1,
+    fts: bool = True,
+) -> int:
+    """Fuegt count Dokumente in Stapeln ein und baut danach den FTS-Index auf.
+
+    Returns:
+        Anzahl der eingefuegten Dokumente.
+    """
+    engine = create_async_engine(database_url, echo=False)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    async with session_factory() as session:
+        tag_ids = await _ensure_tags(session)
+
+        inserted = 0
+        while inserted < count:
+            rows, links = [], []
+            for i in range(inserted, min(count, inserted + batch_size)):
+                row, tags = _document_row(rng, i, size)
+                rows.append(row)
+                links.extend({"document_id": row["id"], "tag_id": tag_ids[t]} for t in tags)
+            await session.execute(insert(Document), rows)
+            await session.execute(insert(DocumentTag), links)
+            await session.commit()
+            inserted += len(rows)
+            rate = inserted / (time.perf_counter() - started)
+            print(f"  {inserted}/{count} Dokumente ({rate:.0f}/s)", flush=True)
+
+        if fts:
+            await ensure_fts_table(session)
+            print("Baue FTS-Index auf...", flush=True)
+            await rebuild_fts_index(session)
+
+    await engine.dispose()
+    return inserted
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Datenbank mit synthetischen Dokumenten befuellen")
+    parser.add_argument("--database", default=DEFAULT_DATABASE, help="SQLAlchemy-URL (async)")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--size", type=float, default=1.0, help="Skalierung der Textmenge")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-fts", action="store_true", help="FTS-Index nicht aufbauen")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    inserted = asyncio.run(populate(
+        args.database, args.count, args.batch_size, args.size, args.seed, fts=not args.no_fts,
+    ))
+    print(f"{inserted} Dokumente in {time.perf_counter() - started:.1f}s eingefuegt")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 import json
 from datetime import date, datetime, timezone
 
+import pytest
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import Settings
+from app.models.audit_log import AuditAction, AuditLog
 from app.models.document import Document, DocumentStatus, DocumentType, ReviewStatus, Tag
 from app.models.review_question import ReviewQuestion
 
@@ -51,6 +54,42 @@ class TestDocumentListEndpoint:
         data = resp.json()
         assert data["total"] == 2
 
+    @pytest.mark.parametrize("sort_by,sort_order", [
+        ("created_at", "desc"), ("document_date", "desc"), ("document_date", "asc"), ("amount", "asc"),
+    ])
+    async def test_list_cursor_walks_all_pages(
+        self, client, db_session: AsyncSession, sort_by: str, sort_order: str,
+    ):
+        for i in range(7):
+            await _create_test_document(
+                db_session, file_hash=f"h{i}", title=f"Doc {i}",
+                document_date=date(2024, 1, i % 3 + 1) if i % 4 else None,
+                amount=i % 2 or None,
+            )
+        await db_session.commit()
+        params = {"sort_by": sort_by, "sort_order": sort_order, "page_size": 2}
+        full = await client.get("/api/documents", params={**params, "page_size": 100})
+        expected = [d["id"] for d in full.json()["items"]]
+
+        seen, cursor = [], None
+        while True:
+            page_params = {**params, "with_total": False}
+            if cursor:
+                page_params["cursor"] = cursor
+            data = (await client.get("/api/documents", params=page_params)).json()
+            assert data["total"] is None
+            seen += [d["id"] for d in data["items"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == expected
+        assert len(seen) == 7
+
+    async def test_list_invalid_cursor(self, client):
+        resp = await client.get("/api/documents", params={"cursor": "kaputt"})
+        assert resp.status_code == 400
+
     async def test_list_filter_by_type(self, client, db_session: AsyncSession):
         await _create_test_document(
             db_session, file_hash="h1", document_type=DocumentType.RECHNUNG
@@ -90,6 +129,25 @@ class TestDocumentDetailEndpoint:
         resp = await client.get("/api/documents/nonexistent-id")
         assert resp.status_code == 404
 
+    async def test_near_duplicates(self, client, db_session: AsyncSession):
+        from app.services.near_duplicate_service import rebuild_fingerprints
+
+        text = (
+            "Zahnarztpraxis Dr. Beispiel Rechnung fuer Behandlung vom 12.02.2024 "
+            "Professionelle Zahnreinigung 95,00 EUR Gesamtbetrag zahlbar innerhalb 14 Tagen"
+        )
+        doc = await _create_test_document(db_session, title="Original", ocr_text=text)
+        await _create_test_document(db_session, title="Scan", ocr_text=text + " Kopie")
+        await _create_test_document(db_session, title="Anders", ocr_text="Ganz anderer Text " * 5)
+        await db_session.commit()
+        await rebuild_fingerprints(db_session)
+
+        resp = await client.get(f"/api/documents/{doc.id}/near-duplicates")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [d["title"] for d in data] == ["Scan"]
+        assert data[0]["score"] >= 0.8
+
 
 class TestDocumentUpdateEndpoint:
     async def test_update_title(self, client, db_session: AsyncSession):
@@ -140,6 +198,22 @@ class TestTagEndpoints:
         tags = resp.json()["tags"]
         assert any(t["name"] == "elektronik" for t in tags)
 
+    async def test_add_tag_twice_is_idempotent(self, client, db_session: AsyncSession):
+        doc = await _create_test_document(db_session)
+        await db_session.commit()
+
+        for _ in range(2):
+            resp = await client.post(f"/api/documents/{doc.id}/tags", json={"name": "strom"})
+            assert resp.status_code == 200
+        assert [t["name"] for t in resp.json()["tags"]] == ["strom"]
+
+        result = await db_session.execute(
+            select(AuditLog).where(
+                AuditLog.document_id == doc.id, AuditLog.action == AuditAction.TAG_ADDED,
+            )
+        )
+        assert len(result.scalars().all()) == 1
+
     async def test_remove_tag(self, client, db_session: AsyncSession):
         doc = await _create_test_document(db_session)
         tag = Tag(name="testag", is_auto_generated=False)
@@ -132,6 +132,18 @@ class TestUpdateFilingScope:
         assert resp.status_code == 200
         assert resp.json()["keywords"] == ["x", "y", "z"]
 
+    async def test_update_invalidates_worker_cache(self, client, db_session):
+        from app.services.filing_scope_service import load_filing_scopes
+
+        create_resp = await client.post("/api/filing-scopes", json={
+            "name": "Haus", "keywords": ["strom"], "is_default": True,
+        })
+        scope_id = create_resp.json()["id"]
+        assert (await load_filing_scopes(db_session))[0]["keywords"] == ["strom"]
+
+        await client.patch(f"/api/filing-scopes/{scope_id}", json={"keywords": ["miete"]})
+        assert (await load_filing_scopes(db_session))[0]["keywords"] == ["miete"]
+
     async def test_update_set_default(self, client):
         resp1 = await client.post("/api/filing-scopes", json={
             "name": "Scope A",
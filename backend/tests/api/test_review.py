@@ -2,6 +2,9 @@
 
 import pytest
 
+from app.models.document import Document, DocumentStatus, DocumentType, ReviewStatus
+from app.models.review_question import ReviewQuestion
+
 
 @pytest.mark.asyncio
 class TestReviewPending:
@@ -44,3 +47,23 @@ class TestReviewAnswer:
     async def test_answer_empty(self, client):
         resp = await client.post("/api/review/questions/nonexistent/answer", json={"answer": ""})
         assert resp.status_code == 400
+
+    async def test_answer_new_filing_scope_invalidates_cache(self, client, db_session):
+        from app.services.filing_scope_service import load_filing_scopes
+
+        doc = Document(
+            original_filename="test.pdf", stored_filename="abc_test.pdf", file_path="/archive/test.pdf",
+            file_type="pdf", file_size_bytes=1024, file_hash="hash_review",
+            document_type=DocumentType.RECHNUNG, status=DocumentStatus.ACTIVE,
+            review_status=ReviewStatus.NEEDS_REVIEW,
+        )
+        db_session.add(doc)
+        await db_session.flush()
+        question = ReviewQuestion(document_id=doc.id, question="Ablagebereich?", field_affected="filing_scope")
+        db_session.add(question)
+        await db_session.commit()
+        assert await load_filing_scopes(db_session) == []
+
+        resp = await client.post(f"/api/review/questions/{question.id}/answer", json={"answer": "NEU: Verein"})
+        assert resp.status_code == 200
+        assert [s["name"] for s in await load_filing_scopes(db_session)] == ["Verein"]
@@ -1,6 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.document import Document, DocumentStatus, DocumentType, ReviewStatus
+from app.models.review_question import ReviewQuestion
+from app.services.search_service import ensure_fts_table
 
 
 async def _create_doc(db: AsyncSession, **overrides) -> Document:
@@ -48,6 +50,18 @@ class TestSearchEndpoint:
         assert resp.json()["total"] == 1
 
 
+    async def test_search_fuzzy(self, client, db_session: AsyncSession):
+        await ensure_fts_table(db_session, trigram=True)
+        await _create_doc(db_session, file_hash="h1", title="Beleg", ocr_text="Versicherungsscbein Hausrat")
+        await db_session.commit()
+
+        resp = await client.get("/api/search", params={"q": "Versicherungsschein"})
+        assert resp.json()["total"] == 0
+        resp = await client.get("/api/search", params={"q": "Versicherungsschein", "fuzzy": "true"})
+        assert resp.status_code == 200
+        assert resp.json()["total"] == 1
+
+
 class TestSuggestEndpoint:
     async def test_suggest(self, client, db_session: AsyncSession):
         await _create_doc(db_session, file_hash="h1", issuer="Telekom AG")
@@ -87,3 +101,38 @@ class TestSavedSearchEndpoints:
 
         list_resp = await client.get("/api/saved-searches")
         assert len(list_resp.json()) == 0
+
+
+class TestSearchIndexSync:
+    """Jede Aenderung ueber die API ist sofort in der Volltextsuche sichtbar."""
+
+    async def _hits(self, client, query: str) -> list[str]:
+        resp = await client.get("/api/search", params={"q": query})
+        return [item["id"] for item in resp.json()["results"]]
+
+    async def test_mutations_update_index(self, client, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        doc = await _create_doc(db_session, file_hash="h1", title="Telekom Rechnung")
+        question = ReviewQuestion(
+            document_id=doc.id, question="Wer ist der Aussteller?", field_affected="issuer",
+        )
+        db_session.add(question)
+        await db_session.commit()
+
+        await client.patch(f"/api/documents/{doc.id}", json={"title": "Vodafone Rechnung"})
+        assert await self._hits(client, "Telekom") == []
+        assert await self._hits(client, "Vodafone") == [doc.id]
+
+        await client.post(f"/api/documents/{doc.id}/tags", json={"name": "Mobilfunk"})
+        assert await self._hits(client, "mobilfunk") == [doc.id]
+        await client.delete(f"/api/documents/{doc.id}/tags/mobilfunk")
+        assert await self._hits(client, "mobilfunk") == []
+
+        await client.post(f"/api/review/questions/{question.id}/answer", json={"answer": "Stadtwerke Nord"})
+        assert await self._hits(client, "Stadtwerke") == [doc.id]
+
+        await client.delete(f"/api/documents/{doc.id}")
+        assert await self._hits(client, "Vodafone") == []
+
+        resp = await client.post("/api/system/maintenance/check-index")
+        assert resp.json()["mismatched"] == 0
@@ -33,3 +33,34 @@ class TestSystemMaintenance:
     async def test_rebuild_index(self, client):
         resp = await client.post("/api/system/maintenance/rebuild-index")
         assert resp.status_code == 200
+
+    async def test_search_cache_stats(self, client):
+        await client.post("/api/system/maintenance/rebuild-index")
+        for _ in range(2):
+            await client.get("/api/search", params={"q": "Strom"})
+
+        resp = await client.get("/api/system/search/cache")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["enabled"] is True
+        assert data["entries"] >= 1
+        assert data["hits"] >= 1
+
+
+@pytest.mark.asyncio
+class TestSystemAnalysisStats:
+    async def test_cascade_stats(self, client):
+        resp = await client.get("/api/system/analysis/stats")
+        assert resp.status_code == 200
+        cascade = resp.json()["cascade"]
+        assert "fast_accepted" in cascade
+        assert "escalation_rate" in cascade
+        assert "fallback_rate" in resp.json()["structured_output"]
+
+    async def test_llm_telemetry(self, client):
+        resp = await client.get("/api/system/llm/telemetry?hours=24")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert "p95_latency_ms" in data["total"]
+        assert "load_share" in data["total"]
+        assert isinstance(data["by_template"], list)
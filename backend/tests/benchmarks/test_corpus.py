@@ -0,0 +1,64 @@
+import json
+import random
+
+import pdfplumber
+from PIL import Image
+from sqlalchemy import func, select, text
+
+from app.models.document import Document, DocumentTag
+from benchmarks.corpus import generate_corpus, generate_document
+from benchmarks.populate_db import populate
+
+
+class TestGenerateDocument:
+    def test_ground_truth_appears_in_text(self):
+        rng = random.Random(3)
+        for kind in ("rechnung", "quittung", "lohn", "vertrag"):
+            doc = generate_document(rng, kind, pages=2)
+            assert doc.reference_number in doc.text
+            assert doc.sender in doc.text
+
+    def test_contract_is_multi_page(self):
+        doc = generate_document(random.Random(1), "vertrag", pages=3)
+        assert len(doc.pages) == 3
+        assert doc.ground_truth()["pages"] == 3
+
+    def test_reproducible_with_seed(self):
+        assert generate_document(random.Random(9)).text == generate_document(random.Random(9)).text
+
+
+class TestGenerateCorpus:
+    def test_writes_ground_truth(self, tmp_path):
+        paths = generate_corpus(tmp_path, 6, formats=("pdf", "scan", "png"), noise=0.3, rotation=2)
+        truth = [
+            json.loads(line)
+            for line in (tmp_path / "ground_truth.jsonl").read_text().splitlines()
+        ]
+
+        assert len(paths) == 6 and all(p.exists() for p in paths)
+        assert [t["file"] for t in truth] == [p.name for p in paths]
+
+    def test_digital_pdf_has_text_layer(self, tmp_path):
+        paths = generate_corpus(tmp_path, 1, kinds=("rechnung",), formats=("pdf",))
+        truth = json.loads((tmp_path / "ground_truth.jsonl").read_text())
+
+        with pdfplumber.open(paths[0]) as pdf:
+            text_layer = "\n".join(page.extract_text() or "" for page in pdf.pages)
+        assert truth["reference_number"] in text_layer
+
+    def test_image_is_rendered_scan(self, tmp_path):
+        paths = generate_corpus(tmp_path, 1, formats=("png",), noise=0.5, rotation=3)
+        assert Image.open(paths[0]).size[0] > 1000
+
+
+class TestPopulateDb:
+    async def test_inserts_documents_tags_and_fts(self, test_settings, test_engine, db_session):
+        inserted = await populate(test_settings.DATABASE_URL, count=250, batch_size=100, seed=2)
+
+        assert inserted == 250
+        docs = (await db_session.execute(select(func.count(Document.id)))).scalar()
+        links = (await db_session.execute(select(func.count()).select_from(DocumentTag))).scalar()
+        fts = (await db_session.execute(text("SELECT COUNT(*) FROM documents_fts"))).scalar()
+        assert docs == 250
+        assert links >= 250
+        assert fts == 250
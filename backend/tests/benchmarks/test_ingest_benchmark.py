@@ -0,0 +1,53 @@
+import json
+
+import httpx
+
+from benchmarks.fake_ollama import FakeOllama
+from benchmarks.ingest import format_report, run_benchmark
+
+
+class TestFakeOllama:
+    async def test_replays_recorded_responses(self):
+        recorded = [{"document_type": "RECHNUNG", "title": "Aufgezeichnet"}]
+        with FakeOllama(responses=recorded) as fake:
+            async with httpx.AsyncClient() as client:
+                resp = await client.post(
+                    f"{fake.url}/api/chat",
+                    json={"model": "m", "messages": [{"role": "user", "content": "Text"}]},
+                )
+        content = json.loads(resp.json()["message"]["content"])
+        assert content["title"] == "Aufgezeichnet"
+        assert resp.json()["eval_count"] > 0
+
+    async def test_failure_injection(self):
+        with FakeOllama(failure_rate=1.0) as fake:
+            async with httpx.AsyncClient() as client:
+                resp = await client.post(f"{fake.url}/api/chat", json={"messages": []})
+        assert resp.status_code == 500
+        assert fake.failures == 1
+
+    async def test_batch_schema_answered_per_document(self):
+        schema = {"type": "object", "properties": {"results": {"type": "array"}}}
+        text = "=== Dokument 1 ===\nBon A\n\n=== Dokument 2 ===\nBon B"
+        with FakeOllama() as fake:
+            async with httpx.AsyncClient() as client:
+                resp = await client.post(
+                    f"{fake.url}/api/chat",
+                    json={"format": schema, "messages": [{"role": "user", "content": text}]},
+                )
+        results = json.loads(resp.json()["message"]["content"])["results"]
+        assert [(r["index"], r["title"]) for r in results] == [(1, "Bon A"), (2, "Bon B")]
+
+
+class TestIngestBenchmark:
+    async def test_end_to_end_report(self):
+        """Kleiner Lauf durch Upload, Queue-Worker und Archivierung."""
+        report = await run_benchmark(docs=3, latency_ms=0, timeout=60)
+
+        assert report["documents"] == 3
+        assert report["statuses"] == {"COMPLETED": 3}
+        assert report["docs_per_minute"] > 0
+        assert report["stages"]["llm"]["count"] == 3
+        assert report["stages"]["archive"]["count"] == 3
+        assert report["end_to_end"]["p95_ms"] is not None
+        assert "Dok./min" in format_report(report, baseline=report)
@@ -34,6 +34,13 @@ def test_settings(tmp_path: Path) -> Settings:
 
 @pytest.fixture
 async def test_engine(test_settings: Settings):
+    from app.services.filing_scope_service import invalidate_filing_scopes
+    from app.services.search_cache_service import clear_search_cache
+
+    # Jede Test-Datenbank beginnt ohne zwischengespeicherte Ablagebereiche
+    # und Suchergebnisse (die Generation beginnt wieder bei 0)
+    invalidate_filing_scopes()
+    clear_search_cache()
     engine = create_async_engine(test_settings.DATABASE_URL, echo=False)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
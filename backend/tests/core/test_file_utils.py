@@ -1,8 +1,16 @@
+import errno
+import hashlib
+import os
 from pathlib import Path
+from unittest.mock import patch
 
 from app.core.file_utils import (
+    HASH_CHUNK_SIZE,
+    compute_file_hash,
+    copy_file_with_hash,
     generate_stored_filename,
     get_file_extension,
+    move_file,
     sanitize_filename,
     validate_magic_bytes,
 )
@@ -88,3 +96,55 @@ class TestGetFileExtension:
 
     def test_dot_prefix(self):
         assert get_file_extension(".hidden") == ""
+
+
+class TestFileHash:
+    def test_compute_matches_sha256(self, sample_pdf: Path):
+        expected = hashlib.sha256(sample_pdf.read_bytes()).hexdigest()
+        assert compute_file_hash(sample_pdf) == expected
+
+    def test_copy_returns_hash_and_copies(self, tmp_path: Path):
+        content = b"x" * (HASH_CHUNK_SIZE * 2 + 17)
+        src = tmp_path / "gross.pdf"
+        src.write_bytes(content)
+        dest = tmp_path / "kopie.pdf"
+
+        file_hash = copy_file_with_hash(src, dest)
+
+        assert file_hash == hashlib.sha256(content).hexdigest()
+        assert dest.read_bytes() == content
+        assert src.exists()
+
+
+class TestMoveFile:
+    def test_same_device_renames(self, tmp_path: Path):
+        src = tmp_path / "a.pdf"
+        src.write_bytes(b"%PDF-1.4 inhalt")
+        dest = tmp_path / "archiv" / "2024" / "a.pdf"
+
+        move_file(src, dest)
+
+        assert not src.exists()
+        assert dest.read_bytes() == b"%PDF-1.4 inhalt"
+
+    def test_cross_device_copies_with_progress(self, tmp_path: Path):
+        content = b"y" * (HASH_CHUNK_SIZE + 5)
+        src = tmp_path / "b.pdf"
+        src.write_bytes(content)
+        dest = tmp_path / "nas" / "b.pdf"
+        real_replace = os.replace
+
+        def replace(a, b):
+            # Umbenennen der Quelle schlaegt wie ueber Dateisystemgrenzen fehl
+            if Path(a) == src:
+                raise OSError(errno.EXDEV, "Invalid cross-device link")
+            return real_replace(a, b)
+
+        calls = []
+        with patch("app.core.file_utils.os.replace", side_effect=replace):
+            move_file(src, dest, progress=lambda copied, total: calls.append((copied, total)))
+
+        assert not src.exists()
+        assert dest.read_bytes() == content
+        assert calls[-1] == (len(content), len(content))
+        assert not list(dest.parent.glob(".*.partial"))
@@ -0,0 +1,42 @@
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor, keyset_conditions
+
+
+class TestCursor:
+    def test_roundtrip(self):
+        token = encode_cursor("d.amount DESC", 12.5, "abc")
+        assert "=" not in token
+        assert decode_cursor(token, "d.amount DESC") == (12.5, "abc")
+
+    def test_rejects_other_sort(self):
+        token = encode_cursor("d.amount DESC", 12.5, "abc")
+        with pytest.raises(ValueError):
+            decode_cursor(token, "d.title ASC")
+
+    def test_rejects_garbage(self):
+        with pytest.raises(ValueError):
+            decode_cursor("kein-cursor", "d.title ASC")
+
+
+class TestKeysetConditions:
+    def test_descending_continues_with_nulls(self):
+        parts = keyset_conditions("d.amount", "d.id", True, 5, "x")
+        assert parts == [
+            (
+                "d.amount <= :cursor_value AND (d.amount < :cursor_value OR d.id < :cursor_id)",
+                {"cursor_value": 5, "cursor_id": "x"},
+            ),
+            ("d.amount IS NULL", {}),
+        ]
+
+    def test_ascending_from_null(self):
+        parts = keyset_conditions("d.amount", "d.id", False, None, "x")
+        assert parts == [
+            ("d.amount IS NULL AND d.id > :cursor_id", {"cursor_id": "x"}),
+            ("d.amount IS NOT NULL", {}),
+        ]
+
+    def test_not_nullable_is_single_range(self):
+        parts = keyset_conditions("d.title", "d.id", True, "B", "x", nullable=False)
+        assert len(parts) == 1
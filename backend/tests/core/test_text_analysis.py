@@ -0,0 +1,63 @@
+from app.core.text_analysis import analyze_text, query_stems, split_compound, stem
+
+
+class TestStem:
+    def test_inflections_share_stem(self):
+        assert stem("Versicherung") == stem("Versicherungen") == "versicher"
+        assert stem("Rechnung") == stem("Rechnungen") == "rechnung"
+        assert stem("Beiträge") == stem("Beitrag") == "beitrag"
+
+    def test_transliterated_umlauts(self):
+        assert stem("Mueller") == stem("Müller")
+        assert stem("Kuendigungen") == stem("Kündigung")
+        assert stem("Straße") == stem("Strasse")
+
+    def test_ue_after_vowel_is_no_umlaut(self):
+        # Steuer, Dauer: kein "Steür"
+        assert stem("Steuern") == stem("Steuer") == "steu"
+        assert stem("Quelle") == "quell"
+
+
+class TestSplitCompound:
+    def test_known_head(self):
+        assert split_compound("Stromrechnung") == ("strom", "rechnung")
+        assert split_compound("Lohnabrechnung") == ("lohn", "abrechnung")
+        assert split_compound("Mietverträge") == ("miet", "verträge")
+
+    def test_linking_s_is_dropped(self):
+        assert split_compound("Versicherungsbeitrag") == ("versicherung", "beitrag")
+        assert split_compound("Nebenkostenabrechnung") == ("neben", "kosten", "abrechnung")
+
+    def test_short_modifier_not_split(self):
+        assert split_compound("gesamt") == ("gesamt",)
+        assert split_compound("Abrechnung") == ("abrechnung",)
+
+    def test_words_merely_ending_in_head_not_split(self):
+        # "insgesamt" endet auf "amt", ist aber kein Kompositum
+        assert split_compound("insgesamt") == ("insgesamt",)
+        assert split_compound("allesamt") == ("allesamt",)
+        assert split_compound("Gesamtbetrag") == ("gesamt", "betrag")
+        assert "amt" not in split_compound("Rechnungsbetraginsgesamt")
+
+
+class TestAnalyzeText:
+    def test_unique_stems_of_all_texts(self):
+        stems = analyze_text("Kfz-Versicherungsbeitrag 2024", None, "Versicherungen").split()
+        assert stems == ["kfz", "versicher", "beitrag"]
+
+    def test_numbers_and_single_letters_skipped(self):
+        assert analyze_text("V 4711 / 12.03.") == ""
+
+    def test_query_stems_match_index(self):
+        indexed = set(analyze_text("Ihre Hausratversicherung").split())
+        assert set(query_stems("Versicherung")) <= indexed
+        assert set(query_stems("Hausratversicherungen")) <= indexed
+
+    def test_query_stems_need_every_part(self):
+        assert query_stems("Kfz-Versicherung") == ["kfz", "versicher"]
+        assert query_stems("RE-2019") == []
+
+    def test_amt_does_not_match_insgesamt(self):
+        indexed = set(analyze_text("Summe insgesamt 120,00 EUR").split())
+        assert not set(query_stems("Amt")) <= indexed
+        assert set(query_stems("Amt")) <= set(analyze_text("Finanzamt Dresden").split())
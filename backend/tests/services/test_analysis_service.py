@@ -1,3 +1,4 @@
+import asyncio
 import json
 from pathlib import Path
 from unittest.mock import AsyncMock, patch
@@ -6,32 +7,19 @@ import pytest
 
 from app.config import Settings
 from app.services.analysis_service import (
+    ANALYSIS_SCHEMA,
     AnalysisResult,
+    _analysis_schema,
+    _condense_chunks,
+    _merge_chunk_results,
     _parse_analysis_json,
-    _truncate_text,
+    _validate_analysis_data,
     analyze_document,
+    structured_output_stats,
 )
 from app.services.ocr_service import OcrResult, PageText
 
 
-class TestTruncateText:
-    def test_short_text_unchanged(self):
-        text = "Kurzer Text"
-        assert _truncate_text(text) == text
-
-    def test_long_text_truncated(self):
-        text = "A" * 5000
-        result = _truncate_text(text, max_chars=4000)
-        assert len(result) < 5000
-        assert "[...Text gekuerzt...]" in result
-        assert result.startswith("A" * 2000)
-        assert result.endswith("A" * 2000)
-
-    def test_exact_boundary(self):
-        text = "A" * 4000
-        assert _truncate_text(text, max_chars=4000) == text
-
-
 class TestParseAnalysisJson:
     def test_valid_json(self):
         raw = '{"document_type": "RECHNUNG", "confidence": 0.9}'
@@ -57,6 +45,63 @@ class TestParseAnalysisJson:
         assert result is None
 
 
+class TestAnalysisSchema:
+    def test_schema_covers_all_fields(self):
+        assert set(ANALYSIS_SCHEMA["properties"]) == set(AnalysisResult().to_dict())
+        assert ANALYSIS_SCHEMA["properties"]["document_type"]["enum"]
+        assert ANALYSIS_SCHEMA["properties"]["amount"]["type"] == ["number", "null"]
+        assert ANALYSIS_SCHEMA["properties"]["tags"]["items"] == {"type": "string"}
+
+    def test_partial_schema(self):
+        schema = _analysis_schema(["amount", "document_date"])
+        assert set(schema["properties"]) == {"amount", "document_date"}
+        assert schema["required"] == ["document_date", "amount"]
+
+
+class TestValidateAnalysisData:
+    def test_valid_values_coerced(self):
+        valid, invalid = _validate_analysis_data({
+            "document_type": "RECHNUNG",
+            "confidence": "0,9",
+            "amount": 119,
+            "tax_year": "2024",
+            "reference_number": 4711,
+            "tax_relevant": "true",
+        })
+        assert invalid == []
+        assert valid["confidence"] == 0.9
+        assert valid["amount"] == 119.0
+        assert valid["tax_year"] == 2024
+        assert valid["reference_number"] == "4711"
+        assert valid["tax_relevant"] is True
+
+    def test_invalid_fields_reported(self):
+        valid, invalid = _validate_analysis_data({
+            "document_type": "UNBEKANNT",
+            "document_date": "15.01.2024",
+            "amount": "ca. 100 Euro",
+            "tags": "rechnung",
+            "title": "Ok",
+        })
+        assert sorted(invalid) == ["amount", "document_date", "document_type", "tags"]
+        assert valid == {"title": "Ok"}
+
+    def test_confidence_outside_unit_interval_is_invalid(self):
+        valid, invalid = _validate_analysis_data({
+            "confidence": 85,
+            "filing_scope_confidence": -0.1,
+            "amount": 1500.0,
+        })
+        assert sorted(invalid) == ["confidence", "filing_scope_confidence"]
+        assert valid == {"amount": 1500.0}
+        assert _validate_analysis_data({"confidence": "1,0"}) == ({"confidence": 1.0}, [])
+
+    def test_null_for_defaulted_field_is_ignored(self):
+        valid, invalid = _validate_analysis_data({"tags": None, "sender": None})
+        assert invalid == []
+        assert valid == {"sender": None}
+
+
 class TestAnalysisResult:
     def test_defaults(self):
         result = AnalysisResult()
@@ -275,7 +320,7 @@ class TestAnalyzeDocument:
         # danach geben sequentielle Aufrufe gueltige Ergebnisse
         call_count = 0
 
-        async def mock_call_llm(prompt, settings, system_prompt=None):
+        async def mock_call_llm(prompt, settings, **kwargs):
             nonlocal call_count
             call_count += 1
             if call_count == 1:
@@ -313,3 +358,278 @@ class TestAnalyzeDocument:
         assert analysis.document_type == "RECHNUNG"
         assert analysis.title == "Eine Rechnung"
         assert analysis.needs_review is True  # Sequentiell setzt immer needs_review
+
+
+class TestModelCascade:
+    def _ocr(self) -> OcrResult:
+        return OcrResult(
+            full_text="Parkschein 2,50 EUR",
+            pages=[PageText(page_number=1, text="Parkschein 2,50 EUR", confidence=0.9)],
+            average_confidence=0.9,
+            page_count=1,
+        )
+
+    async def _run(self, test_settings: Settings, tmp_path: Path, responses: dict):
+        test_file = tmp_path / "test.pdf"
+        test_file.write_bytes(b"dummy")
+        models: list[str | None] = []
+
+        async def mock_call_llm(prompt, settings, **kwargs):
+            model = kwargs.get("model")
+            models.append(model)
+            return responses.get(model)
+
+        with patch(
+            "app.services.analysis_service.extract_text",
+            new_callable=AsyncMock,
+            return_value=self._ocr(),
+        ), patch(
+            "app.services.analysis_service.call_llm",
+            side_effect=mock_call_llm,
+        ):
+            _, analysis = await analyze_document(test_file, "pdf", test_settings)
+        return analysis, models
+
+    async def test_fast_model_accepted(self, test_settings: Settings, tmp_path: Path):
+        """Sicheres Ergebnis des kleinen Modells wird ohne Eskalation uebernommen."""
+        test_settings.OLLAMA_FAST_MODEL = "klein"
+        responses = {"klein": json.dumps({"document_type": "QUITTUNG", "confidence": 0.9})}
+
+        analysis, models = await self._run(test_settings, tmp_path, responses)
+
+        assert analysis.document_type == "QUITTUNG"
+        assert models == ["klein"]
+
+    async def test_low_confidence_escalates(self, test_settings: Settings, tmp_path: Path):
+        """Niedrige Konfidenz fuehrt zur erneuten Analyse mit OLLAMA_MODEL."""
+        test_settings.OLLAMA_FAST_MODEL = "klein"
+        test_settings.OLLAMA_MODEL = "gross"
+        responses = {
+            "klein": json.dumps({"document_type": "SONSTIGES", "confidence": 0.4}),
+            "gross": json.dumps({"document_type": "MIETVERTRAG", "confidence": 0.88}),
+        }
+
+        before = structured_output_stats.to_dict()
+
+        analysis, models = await self._run(test_settings, tmp_path, responses)
+
+        assert analysis.document_type == "MIETVERTRAG"
+        assert models == ["klein", "gross"]
+        # Zwei gueltige Antworten, aber ein Dokument
+        after = structured_output_stats.to_dict()
+        assert after["analyses"] == before["analyses"] + 1
+        assert after["valid_first_try"] == before["valid_first_try"] + 1
+
+    async def test_invalid_json_escalates(self, test_settings: Settings, tmp_path: Path):
+        """Ungueltiges JSON des kleinen Modells fuehrt zur Eskalation."""
+        test_settings.OLLAMA_FAST_MODEL = "klein"
+        test_settings.OLLAMA_MODEL = "gross"
+        responses = {
+            "klein": "kein JSON",
+            "gross": json.dumps({"document_type": "RECHNUNG", "confidence": 0.8}),
+        }
+
+        analysis, models = await self._run(test_settings, tmp_path, responses)
+
+        assert analysis.document_type == "RECHNUNG"
+        assert models == ["klein", "gross"]
+
+    async def test_disabled_without_fast_model(self, test_settings: Settings, tmp_path: Path):
+        """Ohne OLLAMA_FAST_MODEL wird nur ein Modell aufgerufen."""
+        responses = {None: json.dumps({"document_type": "RECHNUNG", "confidence": 0.3})}
+
+        analysis, models = await self._run(test_settings, tmp_path, responses)
+
+        assert analysis.document_type == "RECHNUNG"
+        assert models == [None]
+
+
+class TestFieldRepair:
+    async def test_only_invalid_fields_requested_again(
+        self, test_settings: Settings, tmp_path: Path
+    ):
+        """Ungueltige Felder werden gezielt mit Teilschema nachgefragt."""
+        test_file = tmp_path / "test.pdf"
+        test_file.write_bytes(b"dummy")
+        ocr_result = OcrResult(full_text="Rechnung 119,00 EUR", page_count=1)
+        calls: list[dict] = []
+
+        async def mock_call_llm(prompt, settings, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                return json.dumps({
+                    "document_type": "RECHNUNG",
+                    "confidence": 0.9,
+                    "amount": "einhundertneunzehn",
+                    "title": "Rechnung",
+                })
+            return json.dumps({"amount": 119.0, "title": "Ueberschrieben"})
+
+        before = structured_output_stats.repaired
+        with patch(
+            "app.services.analysis_service.extract_text",
+            new_callable=AsyncMock,
+            return_value=ocr_result,
+        ), patch(
+            "app.services.analysis_service.call_llm",
+            side_effect=mock_call_llm,
+        ):
+            _, analysis = await analyze_document(test_file, "pdf", test_settings)
+
+        assert len(calls) == 2
+        assert calls[0]["schema"] == ANALYSIS_SCHEMA
+        assert list(calls[1]["schema"]["properties"]) == ["amount"]
+        assert analysis.amount == 119.0
+        assert analysis.title == "Rechnung"
+        assert structured_output_stats.repaired == before + 1
+
+
+class TestChunkedAnalysis:
+    def test_merge_is_deterministic(self):
+        partials = [
+            {"document_type": "MIETVERTRAG", "confidence": 0.6, "title": "Mietvertrag",
+             "sender": "Hausverwaltung", "tags": ["wohnung"]},
+            {"document_type": "SONSTIGES", "confidence": 0.9, "amount": 950.0,
+             "tags": ["Wohnung", "miete"]},
+            {"document_type": "MIETVERTRAG", "confidence": 0.8, "amount": 1200.0,
+             "tax_relevant": True, "document_date": "2024-04-01"},
+        ]
+        merged = _merge_chunk_results(partials)
+
+        assert merged == _merge_chunk_results(list(partials))
+        assert merged["document_type"] == "MIETVERTRAG"
+        assert merged["confidence"] == 0.7
+        assert merged["title"] == "Mietvertrag"
+        assert merged["amount"] == 950.0
+        assert merged["document_date"] == "2024-04-01"
+        assert merged["tags"] == ["wohnung", "miete"]
+        assert merged["tax_relevant"] is True
+
+    def test_merge_type_tie_prefers_earlier_chunk(self):
+        partials = [
+            {"document_type": "VERSICHERUNGSPOLICE", "confidence": 0.5},
+            {"document_type": "RECHNUNG", "confidence": 0.5},
+        ]
+        assert _merge_chunk_results(partials)["document_type"] == "VERSICHERUNGSPOLICE"
+
+    def test_merge_filing_scope_by_weighted_vote(self):
+        partials = [
+            {"document_type": "MIETVERTRAG", "confidence": 0.8},
+            {"filing_scope": "Wohnung", "filing_scope_confidence": 0.6},
+            {"filing_scope": "Auto", "filing_scope_confidence": 0.5},
+            {"filing_scope": "Wohnung", "filing_scope_confidence": 0.8},
+        ]
+        merged = _merge_chunk_results(partials)
+        assert merged["filing_scope"] == "Wohnung"
+        assert merged["filing_scope_confidence"] == pytest.approx(0.7)
+        assert "filing_scope" not in _merge_chunk_results(partials[:1])
+
+    def test_excess_chunks_condensed_not_dropped(self):
+        chunks = [f"Abschnitt {i} Betrag {i},00 EUR" for i in range(100)]
+        condensed = _condense_chunks(chunks, 5, 4000)
+        assert len(condensed) == 5
+        # Gruppen benachbarter Abschnitte, jeder Abschnitt bleibt enthalten
+        assert condensed[0].startswith("Abschnitt 0 ")
+        assert "Abschnitt 50 " in condensed[2]
+        assert condensed[4].endswith("Abschnitt 99 Betrag 99,00 EUR")
+        assert _condense_chunks(chunks[:3], 5, 4000) == chunks[:3]
+
+    def test_condensed_groups_fit_chunk_size(self):
+        chunks = [f"Zeile {i} " + "x" * 150 for i in range(40)]
+        condensed = _condense_chunks(chunks, 4, 500)
+        assert len(condensed) == 4
+        assert all(len(group) <= 600 for group in condensed)
+
+    async def test_long_document_gets_filing_scope_within_chunk_limit(
+        self, test_settings: Settings, tmp_path: Path
+    ):
+        test_settings.CHUNKED_ANALYSIS_ENABLED = True
+        test_settings.CHUNKED_ANALYSIS_MIN_CHARS = 1000
+        test_settings.CHUNK_SIZE_CHARS = 200
+        test_settings.CHUNK_MAX_COUNT = 4
+
+        test_file = tmp_path / "police.pdf"
+        test_file.write_bytes(b"dummy")
+        lines = [f"§ {i} Versicherungsbedingungen fuer das Fahrzeug." for i in range(200)]
+        ocr_result = OcrResult(full_text="\n".join(lines), page_count=20)
+        system_prompts: list[str] = []
+        prompts: list[str] = []
+
+        async def mock_call_llm(prompt, settings, **kwargs):
+            system_prompts.append(kwargs["system_prompt"])
+            prompts.append(prompt)
+            return json.dumps({
+                "document_type": "VERSICHERUNGSPOLICE", "confidence": 0.9,
+                "filing_scope": "Auto", "filing_scope_confidence": 0.8,
+            })
+
+        with patch(
+            "app.services.analysis_service.extract_text",
+            new_callable=AsyncMock,
+            return_value=ocr_result,
+        ), patch(
+            "app.services.analysis_service.call_llm",
+            side_effect=mock_call_llm,
+        ):
+            _, analysis = await analyze_document(
+                test_file, "pdf", test_settings,
+                filing_scopes=[{"name": "Auto", "keywords": ["kfz"]}],
+            )
+
+        assert len(system_prompts) == 4
+        assert '"Auto"' in system_prompts[0]
+        # Auch die Mitte des Dokuments wird (verdichtet) analysiert
+        assert any("§ 100 " in prompt for prompt in prompts)
+        assert analysis.filing_scope == "Auto"
+        assert analysis.filing_scope_confidence == 0.8
+
+    async def test_long_document_analyzed_in_bounded_parallel_chunks(
+        self, test_settings: Settings, tmp_path: Path
+    ):
+        """Lange Dokumente werden abschnittsweise mit begrenzter Parallelitaet analysiert."""
+        test_settings.CHUNKED_ANALYSIS_ENABLED = True
+        test_settings.CHUNKED_ANALYSIS_MIN_CHARS = 1000
+        test_settings.CHUNK_SIZE_CHARS = 500
+        test_settings.CHUNK_CONCURRENCY = 2
+
+        test_file = tmp_path / "vertrag.pdf"
+        test_file.write_bytes(b"dummy")
+        lines = [f"§ {i} Allgemeine Bestimmungen zum Mietverhaeltnis." for i in range(60)]
+        lines[45] = "Kaution: 3.000,00 EUR"
+        ocr_result = OcrResult(full_text="\n".join(lines), page_count=3)
+
+        in_flight = 0
+        max_in_flight = 0
+        prompts: list[str] = []
+
+        async def mock_call_llm(prompt, settings, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            prompts.append(prompt)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            data = {"document_type": "MIETVERTRAG", "confidence": 0.9}
+            if "Kaution" in prompt:
+                data["amount"] = 3000.0
+            return json.dumps(data)
+
+        with patch(
+            "app.services.analysis_service.extract_text",
+            new_callable=AsyncMock,
+            return_value=ocr_result,
+        ), patch(
+            "app.services.analysis_service.call_llm",
+            side_effect=mock_call_llm,
+        ):
+            before = structured_output_stats.to_dict()
+            _, analysis = await analyze_document(test_file, "pdf", test_settings)
+            after = structured_output_stats.to_dict()
+
+        assert len(prompts) > 2
+        assert max_in_flight <= 2
+        # Ein Dokument, alle Abschnitte auf Anhieb gueltig
+        assert after["analyses"] == before["analyses"] + 1
+        assert after["valid_first_try"] == before["valid_first_try"] + 1
+        assert analysis.document_type == "MIETVERTRAG"
+        assert analysis.amount == 3000.0
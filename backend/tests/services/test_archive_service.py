@@ -1,4 +1,6 @@
+import threading
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 from sqlalchemy import select
@@ -11,7 +13,7 @@ from app.models.document import Document, DocumentStatus, DocumentType, ReviewSt
 from app.models.review_question import ReviewQuestion
 from app.models.warranty_info import WarrantyInfo
 from app.services.analysis_service import AnalysisResult
-from app.services.archive_service import archive_document
+from app.services.archive_service import archive_document, check_duplicate
 from app.services.ocr_service import OcrResult, PageText
 
 
@@ -191,3 +193,54 @@ class TestArchiveDocument:
                 ocr_result=_make_ocr_result(), analysis_result=_make_analysis_result(),
                 settings=test_settings, session=db_session,
             )
+
+    async def test_precomputed_hash_skips_rehash(
+        self, test_settings: Settings, db_session: AsyncSession, sample_pdf: Path,
+    ):
+        with patch("app.services.archive_service.compute_file_hash") as mock_hash:
+            doc = await archive_document(
+                file_path=sample_pdf, original_filename="rechnung.pdf",
+                stored_filename="abc_rechnung.pdf", file_type="pdf",
+                file_size_bytes=sample_pdf.stat().st_size,
+                ocr_result=_make_ocr_result(), analysis_result=_make_analysis_result(),
+                settings=test_settings, session=db_session, file_hash="a" * 64,
+            )
+        mock_hash.assert_not_called()
+        assert doc.file_hash == "a" * 64
+
+    async def test_hash_computed_off_event_loop(
+        self, test_settings: Settings, db_session: AsyncSession, sample_pdf: Path,
+    ):
+        from app.core.file_utils import compute_file_hash
+
+        threads = []
+
+        def hash_in_thread(path: Path) -> str:
+            threads.append(threading.get_ident())
+            return compute_file_hash(path)
+
+        with patch("app.services.archive_service.compute_file_hash", hash_in_thread):
+            assert await check_duplicate(sample_pdf, db_session) is None
+            await archive_document(
+                file_path=sample_pdf, original_filename="rechnung.pdf",
+                stored_filename="abc_rechnung.pdf", file_type="pdf",
+                file_size_bytes=sample_pdf.stat().st_size,
+                ocr_result=_make_ocr_result(), analysis_result=_make_analysis_result(),
+                settings=test_settings, session=db_session,
+            )
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
+
+    async def test_verify_hash_detects_changed_file(
+        self, test_settings: Settings, db_session: AsyncSession, sample_pdf: Path,
+    ):
+        with pytest.raises(ValueError, match="Hash-Abweichung"):
+            await archive_document(
+                file_path=sample_pdf, original_filename="rechnung.pdf",
+                stored_filename="abc_rechnung.pdf", file_type="pdf",
+                file_size_bytes=sample_pdf.stat().st_size,
+                ocr_result=_make_ocr_result(), analysis_result=_make_analysis_result(),
+                settings=test_settings, session=db_session,
+                file_hash="a" * 64, verify_hash=True,
+            )
+        assert sample_pdf.exists()
@@ -0,0 +1,155 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+from app.config import Settings
+from app.services.analysis_service import AnalysisResult
+from app.services.batch_analysis_service import AnalysisBatcher, analyze_batch, batch_stats
+
+
+def _item(index: int, title: str) -> dict:
+    return {
+        "index": index,
+        "document_type": "QUITTUNG",
+        "confidence": 0.9,
+        "title": title,
+        "amount": 4.5,
+        "tags": ["einkauf"],
+        "tax_relevant": False,
+        "needs_review": False,
+    }
+
+
+class TestAnalyzeBatch:
+    async def test_results_routed_by_index(self, test_settings: Settings):
+        """Ergebnisse werden ueber den Index zugeordnet, nicht ueber die Reihenfolge."""
+        response = json.dumps({"results": [_item(2, "Bon B"), _item(1, "Bon A")]})
+        with patch(
+            "app.services.batch_analysis_service.call_llm",
+            new_callable=AsyncMock,
+            return_value=response,
+        ) as mock_llm:
+            results = await analyze_batch(["Bon A", "Bon B"], test_settings)
+
+        assert [r.title for r in results] == ["Bon A", "Bon B"]
+        prompt = mock_llm.call_args[0][0]
+        assert "=== Dokument 1 ===\nBon A" in prompt
+        assert "=== Dokument 2 ===\nBon B" in prompt
+        assert mock_llm.call_args.kwargs["template"] == "analyze_batch.txt"
+
+    async def test_missing_and_invalid_entries_stay_empty(self, test_settings: Settings):
+        bad = {**_item(2, "Bon B"), "document_type": "UNBEKANNT"}
+        response = json.dumps({"results": [bad, _item(7, "Fremd")]})
+        with patch(
+            "app.services.batch_analysis_service.call_llm",
+            new_callable=AsyncMock,
+            return_value=response,
+        ):
+            results = await analyze_batch(["A", "B", "C"], test_settings)
+
+        assert results == [None, None, None]
+
+
+class TestAnalysisBatcher:
+    async def test_concurrent_submits_share_one_request(self, test_settings: Settings):
+        """Gleichzeitig eintreffende Dokumente gehen in eine einzige LLM-Anfrage."""
+        test_settings.BATCH_SIZE = 3
+        test_settings.BATCH_WINDOW_SECONDS = 5.0
+        response = json.dumps({"results": [_item(i, f"Bon {i}") for i in (1, 2, 3)]})
+        batcher = AnalysisBatcher(test_settings)
+        batches_before = batch_stats.batches
+
+        with patch(
+            "app.services.batch_analysis_service.call_llm",
+            new_callable=AsyncMock,
+            return_value=response,
+        ) as mock_llm:
+            results = await asyncio.gather(*(batcher.submit(f"Text {i}") for i in (1, 2, 3)))
+
+        assert mock_llm.await_count == 1
+        assert [r.title for r in results] == ["Bon 1", "Bon 2", "Bon 3"]
+        assert batch_stats.batches == batches_before + 1
+
+    async def test_window_flushes_partial_batch(self, test_settings: Settings):
+        test_settings.BATCH_SIZE = 10
+        test_settings.BATCH_WINDOW_SECONDS = 0.05
+        response = json.dumps({"results": [_item(1, "Bon 1"), _item(2, "Bon 2")]})
+        batcher = AnalysisBatcher(test_settings)
+
+        with patch(
+            "app.services.batch_analysis_service.call_llm",
+            new_callable=AsyncMock,
+            return_value=response,
+        ):
+            results = await asyncio.wait_for(
+                asyncio.gather(batcher.submit("a"), batcher.submit("b")), timeout=2,
+            )
+
+        assert [r.title for r in results] == ["Bon 1", "Bon 2"]
+
+    async def test_failed_batch_falls_back_to_individual_calls(self, test_settings: Settings):
+        """Scheitert der Batch, wird jedes Dokument einzeln analysiert."""
+        test_settings.BATCH_SIZE = 2
+        single = AnalysisResult(document_type="QUITTUNG", confidence=0.8, title="Einzeln")
+        batcher = AnalysisBatcher(test_settings)
+        fallbacks_before = batch_stats.individual_fallbacks
+
+        with patch(
+            "app.services.batch_analysis_service.call_llm",
+            new_callable=AsyncMock,
+            return_value=None,
+        ), patch(
+            "app.services.batch_analysis_service._try_cascade_analysis",
+            new_callable=AsyncMock,
+            return_value=single,
+        ) as mock_single:
+            results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
+
+        assert mock_single.await_count == 2
+        assert all(r.title == "Einzeln" for r in results)
+        assert batch_stats.individual_fallbacks == fallbacks_before + 2
+
+    async def test_individual_fallbacks_run_concurrently(self, test_settings: Settings):
+        """Ein langsamer Einzelaufruf haelt die anderen Dokumente nicht auf."""
+        test_settings.BATCH_SIZE = 2
+        release = asyncio.Event()
+
+        async def single(text, *args, **kwargs):
+            if text == "lang":
+                await release.wait()
+            return AnalysisResult(document_type="QUITTUNG", confidence=0.8, title=text)
+
+        batcher = AnalysisBatcher(test_settings)
+        with patch(
+            "app.services.batch_analysis_service.call_llm",
+            new_callable=AsyncMock,
+            return_value=None,
+        ), patch(
+            "app.services.batch_analysis_service._try_cascade_analysis", side_effect=single,
+        ):
+            slow = asyncio.create_task(batcher.submit("lang"))
+            fast = await asyncio.wait_for(batcher.submit("kurz"), timeout=2)
+            assert fast.title == "kurz"
+            assert not slow.done()
+            release.set()
+            assert (await slow).title == "lang"
+
+    async def test_close_cancels_waiting_submits(self, test_settings: Settings):
+        """Nach close() haengen weder laufende noch wartende Dokumente."""
+        test_settings.BATCH_SIZE = 2
+        test_settings.BATCH_WINDOW_SECONDS = 60.0
+
+        async def hang(*args, **kwargs):
+            await asyncio.Event().wait()
+
+        batcher = AnalysisBatcher(test_settings)
+        with patch("app.services.batch_analysis_service.call_llm", side_effect=hang):
+            running = [asyncio.create_task(batcher.submit(t)) for t in ("a", "b")]
+            waiting = asyncio.create_task(batcher.submit("c"))
+            await asyncio.sleep(0.05)
+            batcher.close()
+            outcomes = await asyncio.wait_for(
+                asyncio.gather(*running, waiting, return_exceptions=True), timeout=2,
+            )
+
+        assert all(isinstance(o, asyncio.CancelledError) for o in outcomes)
@@ -0,0 +1,96 @@
+import hashlib
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import Settings
+from app.models.blob import Blob
+from app.services.analysis_service import AnalysisResult
+from app.services.archive_service import (
+    archive_document,
+    rebuild_archive_view,
+    update_document_view,
+)
+from app.services.blob_store_service import blob_path, store_blob
+
+
+def _blob_settings(test_settings: Settings) -> Settings:
+    return test_settings.model_copy(update={"BLOB_STORE_ENABLED": True})
+
+
+def _write(path: Path, content: bytes) -> str:
+    path.write_bytes(content)
+    return hashlib.sha256(content).hexdigest()
+
+
+class TestBlobStore:
+    async def test_store_is_sharded(
+        self, test_settings: Settings, db_session: AsyncSession, tmp_path: Path,
+    ):
+        file_hash = _write(tmp_path / "a.pdf", b"%PDF-1.4 a")
+
+        stored = await store_blob(tmp_path / "a.pdf", file_hash, test_settings, db_session)
+
+        assert stored == blob_path(test_settings, file_hash)
+        assert stored.parent.name == file_hash[2:4]
+        assert stored.parent.parent.name == file_hash[:2]
+        assert stored.read_bytes() == b"%PDF-1.4 a"
+        assert not (tmp_path / "a.pdf").exists()
+        assert (await db_session.get(Blob, file_hash)).size_bytes == 10
+
+
+class TestBlobArchive:
+    async def test_archive_links_view_to_blob(
+        self, test_settings: Settings, db_session: AsyncSession, tmp_path: Path,
+    ):
+        settings = _blob_settings(test_settings)
+        file_hash = _write(tmp_path / "scan.pdf", b"%PDF-1.4 rechnung")
+
+        doc = await archive_document(
+            file_path=tmp_path / "scan.pdf", original_filename="scan.pdf",
+            stored_filename="abc_scan.pdf", file_type="pdf", file_size_bytes=17,
+            ocr_result=None,
+            analysis_result=AnalysisResult(document_type="RECHNUNG", document_date="2024-03-15"),
+            settings=settings, session=db_session, file_hash=file_hash,
+        )
+
+        view = Path(settings.ARCHIVE_DIR) / "2024" / "03" / "RECHNUNG" / "abc_scan.pdf"
+        assert Path(doc.file_path) == blob_path(settings, file_hash)
+        assert view.read_bytes() == b"%PDF-1.4 rechnung"
+        assert view.samefile(doc.file_path)
+
+        # Datum geaendert: Link wandert mit, Blob bleibt
+        doc.document_date = date(2023, 1, 2)
+        new_view = await update_document_view(doc, settings, db_session, old_view_path=view)
+        assert not view.exists()
+        assert new_view == Path(settings.ARCHIVE_DIR) / "2023" / "01" / "RECHNUNG" / "abc_scan.pdf"
+        assert new_view.samefile(doc.file_path)
+
+    async def test_rebuild_view(
+        self, test_settings: Settings, db_session: AsyncSession, tmp_path: Path,
+    ):
+        settings = _blob_settings(test_settings)
+        file_hash = _write(tmp_path / "scan.pdf", b"%PDF-1.4 beleg")
+        doc = await archive_document(
+            file_path=tmp_path / "scan.pdf", original_filename="scan.pdf",
+            stored_filename="abc_scan.pdf", file_type="pdf", file_size_bytes=14,
+            ocr_result=None,
+            analysis_result=AnalysisResult(document_type="QUITTUNG", document_date="2024-05-01"),
+            settings=settings, session=db_session, file_hash=file_hash,
+        )
+        archive = Path(settings.ARCHIVE_DIR)
+        view = archive / "2024" / "05" / "QUITTUNG" / "abc_scan.pdf"
+        view.unlink()
+        stale = archive / "alt" / "abc_scan.pdf"
+        stale.parent.mkdir()
+        stale.hardlink_to(doc.file_path)
+        unrelated = archive / "alt" / "eigene_datei.pdf"
+        unrelated.write_bytes(b"%PDF-1.4 eigene")
+
+        stats = await rebuild_archive_view(db_session, settings)
+
+        assert stats == {"linked": 1, "removed": 1, "total": 1}
+        assert view.samefile(doc.file_path)
+        assert not stale.exists()
+        assert unrelated.exists()
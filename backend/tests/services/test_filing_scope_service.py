@@ -0,0 +1,66 @@
+import json
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.filing_scope import FilingScope
+from app.services.analysis_service import AnalysisResult
+from app.services.archive_service import _match_filing_scope
+from app.services.filing_scope_service import (
+    get_keyword_matcher,
+    invalidate_filing_scopes,
+    load_filing_scopes,
+)
+
+SCOPES = [
+    {"id": "1", "name": "Privat", "slug": "privat", "keywords": [], "is_default": True},
+    {
+        "id": "2", "name": "Praxis", "slug": "praxis", "is_default": False,
+        "keywords": ["KBV", "Kassenaerztliche", "Praxis", "Dr. Klotz", "Arztpraxis"],
+    },
+    {"id": "3", "name": "Haus", "slug": "haus", "keywords": ["Strom", "Stromzaehler", "Miete"], "is_default": False},
+]
+
+
+class TestKeywordMatcher:
+    def test_word_start_and_inflection(self):
+        matcher = get_keyword_matcher(SCOPES)
+        hits = matcher.count_hits("Rechnung der kassenaerztlichen Vereinigung, KBV-Nr. 123")
+        assert hits == {1: 2}
+
+    def test_no_match_inside_word(self):
+        matcher = get_keyword_matcher(SCOPES)
+        # "miete" steckt in "Vermieter", "strom" in "Gleichstrom" - kein Wortanfang
+        assert matcher.count_hits("Der Vermieter liefert Gleichstrom") == {}
+
+    def test_longest_keyword_and_distinct_counts(self):
+        matcher = get_keyword_matcher(SCOPES)
+        hits = matcher.count_hits("Stromzaehler Stand, Strom Abschlag, STROM, Miete")
+        assert hits == {2: 3}
+
+    def test_keyword_with_punctuation(self):
+        assert get_keyword_matcher(SCOPES).count_hits("Behandlung bei Dr. Klotz") == {1: 1}
+
+    def test_compiled_once(self):
+        assert get_keyword_matcher(SCOPES) is get_keyword_matcher([dict(s) for s in SCOPES])
+
+    def test_match_filing_scope_uses_keywords(self):
+        scope_id, slug, _ = _match_filing_scope(
+            AnalysisResult(), SCOPES, ocr_text="Abrechnung Arztpraxis Dr. Klotz",
+        )
+        assert (scope_id, slug) == ("2", "praxis")
+
+
+class TestLoadFilingScopes:
+    async def test_cached_until_invalidated(self, db_session: AsyncSession):
+        db_session.add(FilingScope(name="Privat", slug="privat", keywords=json.dumps(["a"]), is_default=True))
+        await db_session.commit()
+
+        first = await load_filing_scopes(db_session)
+        db_session.add(FilingScope(name="Firma", slug="firma", keywords="[]"))
+        await db_session.commit()
+        assert await load_filing_scopes(db_session) is first
+
+        invalidate_filing_scopes()
+        reloaded = await load_filing_scopes(db_session)
+        assert {s["slug"] for s in reloaded} == {"privat", "firma"}
+        assert next(s for s in reloaded if s["slug"] == "privat")["keywords"] == ["a"]
@@ -6,7 +6,15 @@ import httpx
 import pytest
 
 from app.config import Settings
-from app.services.llm_service import call_llm, check_ollama_available, load_prompt_template
+from app.services.llm_service import (
+    call_llm,
+    check_ollama_available,
+    get_prompt_template,
+    load_prompt_template,
+    model_residency_stats,
+    prompt_eval_stats,
+    warm_up_model,
+)
 
 
 class TestLoadPromptTemplate:
@@ -29,6 +37,7 @@ class TestLoadPromptTemplate:
             "extract_metadata.txt",
             "assess_tax_relevance.txt",
             "extract_warranty_info.txt",
+            "analyze_batch.txt",
         ]
         for name in templates:
             content = load_prompt_template(name)
@@ -36,6 +45,26 @@ class TestLoadPromptTemplate:
             assert "{ocr_text}" in content, f"Template {name} hat keinen {{ocr_text}} Platzhalter"
 
 
+class TestPromptTemplate:
+    def test_prefix_is_document_independent(self):
+        """System-Prefix ist fuer verschiedene Dokumente identisch."""
+        template = get_prompt_template("analyze_document.txt")
+        system_a, user_a = template.render("Dokument A", filing_scopes="Privat")
+        system_b, user_b = template.render("Dokument B mit mehr Text", filing_scopes="Privat")
+
+        assert system_a == system_b
+        assert "Privat" in system_a
+        assert "{filing_scopes}" not in system_a
+        assert "Dokument A" not in system_a
+        assert user_a.startswith("Dokument A")
+        assert user_b.startswith("Dokument B")
+
+    def test_template_compiled_once(self):
+        assert get_prompt_template("classify_document.txt") is get_prompt_template(
+            "classify_document.txt"
+        )
+
+
 def _make_response(status_code: int, json_data: dict | None = None) -> httpx.Response:
     """Erstellt eine httpx.Response mit gesetztem Request."""
     resp = httpx.Response(
@@ -151,6 +180,115 @@ class TestCallLlm:
             assert messages[0]["content"] == "System prompt"
 
 
+    async def test_schema_sent_as_format(self, test_settings: Settings, mock_ollama_response: dict):
+        """JSON-Schema wird als format an Ollama uebergeben."""
+        mock_response = _make_response(200, mock_ollama_response)
+        schema = {"type": "object", "properties": {"title": {"type": "string"}}}
+
+        with patch("app.services.llm_service.httpx.AsyncClient") as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client.post = AsyncMock(return_value=mock_response)
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=None)
+            mock_client_cls.return_value = mock_client
+
+            await call_llm("User prompt", test_settings, schema=schema)
+
+            payload = mock_client.post.call_args.kwargs["json"]
+            assert payload["format"] == schema
+
+
+    async def test_prompt_eval_recorded(self, test_settings: Settings, mock_ollama_response: dict):
+        """Von Ollama gemeldete Prompt-Eval-Werte werden aufgezeichnet."""
+        mock_response = _make_response(200, {
+            **mock_ollama_response,
+            "prompt_eval_count": 120,
+            "prompt_eval_duration": 250_000_000,
+        })
+        calls_before = prompt_eval_stats.calls
+        tokens_before = prompt_eval_stats.prompt_tokens
+
+        with patch("app.services.llm_service.httpx.AsyncClient") as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client.post = AsyncMock(return_value=mock_response)
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=None)
+            mock_client_cls.return_value = mock_client
+
+            await call_llm("User prompt", test_settings)
+
+        assert prompt_eval_stats.calls == calls_before + 1
+        assert prompt_eval_stats.prompt_tokens == tokens_before + 120
+
+    async def test_keep_alive_sent_and_cold_start_counted(
+        self, test_settings: Settings, mock_ollama_response: dict
+    ):
+        """keep_alive wird mitgesendet, lange Ladezeiten zaehlen als Kaltstart."""
+        test_settings.OLLAMA_KEEP_ALIVE = "1h"
+        mock_response = _make_response(200, {**mock_ollama_response, "load_duration": 4_000_000_000})
+        cold_before = model_residency_stats.cold_starts
+
+        with patch("app.services.llm_service.httpx.AsyncClient") as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client.post = AsyncMock(return_value=mock_response)
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=None)
+            mock_client_cls.return_value = mock_client
+
+            await call_llm("User prompt", test_settings)
+
+            payload = mock_client.post.call_args[1]["json"]
+            assert payload["keep_alive"] == "1h"
+
+        assert model_residency_stats.cold_starts == cold_before + 1
+        assert model_residency_stats.last_load_seconds == 4.0
+        assert model_residency_stats.first_call_seconds is not None
+
+
+class TestWarmUpModel:
+    async def test_loads_all_models(self, test_settings: Settings):
+        """Warm-up laedt Schnell- und Hauptmodell per leerem Generate-Aufruf."""
+        test_settings.OLLAMA_FAST_MODEL = "llama3.2:1b"
+        mock_response = httpx.Response(
+            status_code=200,
+            json={"done": True},
+            request=httpx.Request("POST", "http://localhost:11434/api/generate"),
+        )
+        warmups_before = model_residency_stats.warmups
+
+        with patch("app.services.llm_service.httpx.AsyncClient") as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client.post = AsyncMock(return_value=mock_response)
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=None)
+            mock_client_cls.return_value = mock_client
+
+            assert await warm_up_model(test_settings) is True
+
+            urls = [c[0][0] for c in mock_client.post.call_args_list]
+            models = [c[1]["json"]["model"] for c in mock_client.post.call_args_list]
+            assert all(url.endswith("/api/generate") for url in urls)
+            assert models == ["llama3.2:1b", test_settings.OLLAMA_MODEL]
+            assert "prompt" not in mock_client.post.call_args[1]["json"]
+
+        assert model_residency_stats.warmups == warmups_before + 1
+
+    async def test_unreachable_is_not_fatal(self, test_settings: Settings):
+        """Nicht erreichbares Ollama laesst den Warm-up still scheitern."""
+        failures_before = model_residency_stats.warmup_failures
+
+        with patch("app.services.llm_service.httpx.AsyncClient") as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client.post = AsyncMock(side_effect=httpx.ConnectError("Connection refused"))
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=None)
+            mock_client_cls.return_value = mock_client
+
+            assert await warm_up_model(test_settings) is False
+
+        assert model_residency_stats.warmup_failures == failures_before + 1
+
+
 class TestCheckOllamaAvailable:
     async def test_ollama_available(self, test_settings: Settings):
         """Prueft positive Ollama-Erreichbarkeit."""
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from sqlalchemy import select
+
+from app.config import Settings
+from app.models.llm_call import LlmCall
+from app.services.llm_service import call_llm
+from app.services.llm_telemetry_service import (
+    _pending,
+    current_job_id,
+    flush_llm_calls,
+    get_llm_telemetry,
+    prune_llm_calls,
+    record_llm_call,
+)
+
+
+def _ollama_data(eval_count: int = 50, load_ns: int = 0) -> dict:
+    return {
+        "prompt_eval_count": 200,
+        "eval_count": eval_count,
+        "load_duration": load_ns,
+        "prompt_eval_duration": 400_000_000,
+        "eval_duration": 1_000_000_000,
+        "total_duration": 1_400_000_000 + load_ns,
+    }
+
+
+class TestRecordAndFlush:
+    async def test_flush_persists_with_job_id(self, db_session):
+        """Vorgemerkte Aufrufe werden mit Job-ID aus dem Kontext gespeichert."""
+        _pending.clear()
+        token = current_job_id.set("job-1")
+        try:
+            record_llm_call(
+                _ollama_data(), model="llama3.2", template="analyze_document.txt",
+                host="http://a", latency_seconds=1.5,
+            )
+        finally:
+            current_job_id.reset(token)
+
+        assert await flush_llm_calls(db_session) == 1
+        assert await flush_llm_calls(db_session) == 0
+
+        call = (await db_session.execute(select(LlmCall))).scalar_one()
+        assert call.job_id == "job-1"
+        assert call.template == "analyze_document.txt"
+        assert call.eval_count == 50
+        assert call.prompt_eval_duration_ns == 400_000_000
+        assert call.latency_ms == 1500
+
+    async def test_call_llm_records_template(
+        self, test_settings: Settings, db_session, mock_ollama_response: dict
+    ):
+        """call_llm merkt jeden Aufruf mit Template und Modell vor."""
+        _pending.clear()
+        response = httpx.Response(
+            status_code=200,
+            json={**mock_ollama_response, **_ollama_data()},
+            request=httpx.Request("POST", "http://localhost:11434/api/chat"),
+        )
+        with patch("app.services.llm_service.httpx.AsyncClient") as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client.post = AsyncMock(return_value=response)
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=None)
+            mock_client_cls.return_value = mock_client
+
+            await call_llm("Prompt", test_settings, template="classify_document.txt")
+
+        await flush_llm_calls(db_session)
+        call = (await db_session.execute(select(LlmCall))).scalar_one()
+        assert call.template == "classify_document.txt"
+        assert call.model == test_settings.OLLAMA_MODEL
+        assert call.success is True
+
+
+class TestAggregate:
+    async def test_percentiles_and_rates(self, db_session):
+        """Aggregation liefert Perzentile, Tokenraten und Ladeanteil."""
+        _pending.clear()
+        for i in range(1, 21):
+            record_llm_call(
+                _ollama_data(load_ns=600_000_000 if i == 1 else 0),
+                model="llama3.2", template="analyze_document.txt",
+                host="http://a", latency_seconds=i / 10,
+            )
+        record_llm_call(
+            None, model="llama3.2", template="classify_document.txt",
+            host="http://a", latency_seconds=5.0, success=False,
+        )
+
+        stats = await get_llm_telemetry(db_session)
+
+        total = stats["total"]
+        assert total["calls"] == 21
+        assert total["failures"] == 1
+        assert total["p50_latency_ms"] == 1000
+        assert total["p95_latency_ms"] == 1900
+        assert total["eval_tokens_per_second"] == 50.0
+        assert total["prompt_tokens_per_second"] == 500.0
+        assert 0 < total["load_share"] < 0.05
+
+        templates = {g["template"]: g for g in stats["by_template"]}
+        assert templates["classify_document.txt"]["p50_latency_ms"] is None
+        assert templates["analyze_document.txt"]["calls"] == 20
+
+    async def test_filter_by_template(self, db_session):
+        _pending.clear()
+        record_llm_call(_ollama_data(), model="m", template="a", host=None, latency_seconds=1)
+        record_llm_call(_ollama_data(), model="m", template="b", host=None, latency_seconds=1)
+
+        stats = await get_llm_telemetry(db_session, template="b", hours=1)
+
+        assert stats["total"]["calls"] == 1
+
+    async def test_window_excludes_old_calls(self, db_session):
+        """Standardfenster: aeltere Aufrufe zaehlen weder mit noch in die Perzentile."""
+        _pending.clear()
+        db_session.add(LlmCall(
+            model="m", template="a", success=True, latency_ms=9000,
+            created_at=datetime.now(timezone.utc) - timedelta(hours=30),
+        ))
+        await db_session.commit()
+        record_llm_call(_ollama_data(), model="m", template="a", host=None, latency_seconds=1)
+
+        stats = await get_llm_telemetry(db_session)
+
+        assert stats["hours"] == 24
+        assert stats["total"]["calls"] == 1
+        assert stats["total"]["p95_latency_ms"] == 1000
+        assert (await get_llm_telemetry(db_session, hours=48))["total"]["calls"] == 2
+
+
+class TestPrune:
+    async def test_prune_deletes_calls_beyond_retention(self, db_session):
+        old = datetime.now(timezone.utc) - timedelta(days=40)
+        db_session.add_all([
+            LlmCall(model="m", success=True, latency_ms=1, created_at=old),
+            LlmCall(model="m", success=True, latency_ms=1),
+        ])
+        await db_session.commit()
+
+        assert await prune_llm_calls(db_session, 30) == 1
+        assert await prune_llm_calls(db_session, 0) == 0
+        remaining = (await db_session.execute(select(LlmCall))).scalars().all()
+        assert len(remaining) == 1
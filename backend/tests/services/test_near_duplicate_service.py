@@ -0,0 +1,116 @@
+import random
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import Settings
+from app.models.document import Document, DocumentType, ReviewStatus
+from app.models.review_question import ReviewQuestion
+from app.services.analysis_service import AnalysisResult
+from app.services.archive_service import archive_document
+from app.services.near_duplicate_service import (
+    compute_signature,
+    find_near_duplicates,
+    rebuild_fingerprints,
+    similarity,
+)
+from app.services.ocr_service import OcrResult, PageText
+
+INVOICE = (
+    "Stadtwerke Musterstadt GmbH Rechnung Nr. 2024-0815 vom 15.03.2024 "
+    "Kundennummer 4711 Abrechnungszeitraum 01.01.2023 bis 31.12.2023 "
+    "Stromverbrauch 2.345 kWh Arbeitspreis 0,32 EUR je kWh Grundpreis 12,50 EUR "
+    "Gesamtbetrag 812,40 EUR zahlbar bis 30.03.2024 per Lastschrift"
+)
+
+
+def _ocr_noise(text: str, rate: float, seed: int = 1) -> str:
+    """Simuliert OCR-Fehler: einzelne Woerter werden verfaelscht."""
+    rng = random.Random(seed)
+    words = text.split()
+    return " ".join(w[:-1] + "l" if rng.random() < rate and len(w) > 2 else w for w in words)
+
+
+def _ocr(text: str) -> OcrResult:
+    return OcrResult(
+        full_text=text, pages=[PageText(page_number=1, text=text, confidence=0.9)],
+        average_confidence=0.9, page_count=1,
+    )
+
+
+class TestSignature:
+    def test_short_text_has_no_signature(self):
+        assert compute_signature("Kurzer Text") is None
+        assert compute_signature(None) is None
+
+    def test_identical_and_case_insensitive(self):
+        a, _ = compute_signature(INVOICE)
+        b, _ = compute_signature(INVOICE.upper())
+        assert similarity(a, b) == 1.0
+
+    def test_ocr_noise_stays_similar(self):
+        a, _ = compute_signature(INVOICE * 3)
+        b, _ = compute_signature(_ocr_noise(INVOICE * 3, 0.02))
+        assert similarity(a, b) >= 0.7
+
+    def test_unrelated_text_differs(self):
+        a, _ = compute_signature(INVOICE)
+        b, _ = compute_signature(
+            "Mietvertrag zwischen Vermieter Hans Beispiel und Mieterin Erika Muster ueber "
+            "die Wohnung im zweiten Obergeschoss links, Kaltmiete 750 EUR monatlich"
+        )
+        assert similarity(a, b) < 0.2
+
+
+class TestNearDuplicateArchive:
+    async def _archive(self, tmp_path: Path, name: str, content: bytes, text: str,
+                       settings: Settings, session: AsyncSession) -> Document:
+        path = tmp_path / name
+        path.write_bytes(content)
+        return await archive_document(
+            file_path=path, original_filename=name, stored_filename=f"x_{name}",
+            file_type=path.suffix.lstrip("."), file_size_bytes=len(content),
+            ocr_result=_ocr(text), analysis_result=AnalysisResult(document_type="RECHNUNG"),
+            settings=settings, session=session,
+        )
+
+    async def test_second_scan_is_flagged(
+        self, test_settings: Settings, db_session: AsyncSession, tmp_path: Path,
+    ):
+        original = await self._archive(
+            tmp_path, "rechnung.pdf", b"%PDF-1.4 a", INVOICE, test_settings, db_session,
+        )
+        photo = await self._archive(
+            tmp_path, "foto.jpg", b"\xff\xd8\xff b", INVOICE + " Seite 1", test_settings, db_session,
+        )
+        other = await self._archive(
+            tmp_path, "anderes.pdf", b"%PDF-1.4 c",
+            "Versicherungsschein Hausrat Police 998877 Versicherungsnehmer Max Muster "
+            "Beitrag jaehrlich 120 EUR Beginn 01.01.2024", test_settings, db_session,
+        )
+
+        assert original.near_duplicate_of_id is None
+        assert photo.near_duplicate_of_id == original.id
+        assert photo.near_duplicate_score >= 0.8
+        assert photo.review_status == ReviewStatus.NEEDS_REVIEW
+        assert other.near_duplicate_of_id is None
+
+        questions = (await db_session.execute(select(ReviewQuestion))).scalars().all()
+        assert [(q.document_id, q.question_type) for q in questions] == [(photo.id, "duplicate")]
+        assert original.id in questions[0].explanation
+        assert f"{photo.near_duplicate_score:.0%}" in questions[0].explanation
+
+    async def test_rebuild_fingerprints(self, db_session: AsyncSession):
+        for i, text in enumerate([INVOICE, INVOICE + " Kopie", "zu kurz"]):
+            db_session.add(Document(
+                original_filename=f"{i}.pdf", stored_filename=f"{i}.pdf", file_path=f"/{i}.pdf",
+                file_type="pdf", file_size_bytes=1, file_hash=f"h{i}",
+                document_type=DocumentType.RECHNUNG, title=str(i), ocr_text=text,
+            ))
+        await db_session.commit()
+
+        assert await rebuild_fingerprints(db_session) == 2
+        signature, _ = compute_signature(INVOICE)
+        matches = await find_near_duplicates(signature, db_session, 0.8)
+        assert len(matches) == 2
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.config import Settings
+from app.services.llm_service import call_llm
+from app.services.ollama_router_service import OllamaRouter, get_router
+
+
+class _StandInServer:
+    """Minimaler lokaler Ollama-Ersatz: /api/chat und /api/tags."""
+
+    def __init__(self, name: str, delay: float = 0.0):
+        self.name = name
+        self.delay = delay
+        self.chat_requests = 0
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, body: dict):
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._send({"models": []})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(length)
+                outer.chat_requests += 1
+                time.sleep(outer.delay)
+                self._send({"message": {"role": "assistant", "content": json.dumps({"host": outer.name})}})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_ins():
+    servers = [_StandInServer("a", delay=0.05), _StandInServer("b", delay=0.05)]
+    yield servers
+    for server in servers:
+        try:
+            server.stop()
+        except Exception:
+            pass
+
+
+def _settings(test_settings: Settings, urls: list[str]) -> Settings:
+    test_settings.OLLAMA_BASE_URLS = ",".join(urls)
+    test_settings.OLLAMA_MAX_RETRIES = 0
+    return test_settings
+
+
+class TestOllamaRouter:
+    def test_pick_prefers_least_in_flight(self):
+        router = OllamaRouter(["http://a", "http://b"])
+        router.acquire(router.hosts[0])
+        assert router.pick().url == "http://b"
+
+    def test_pick_prefers_lower_latency(self):
+        router = OllamaRouter(["http://a", "http://b"])
+        router.hosts[0].latencies.append(2.0)
+        router.hosts[1].latencies.append(0.5)
+        assert router.pick().url == "http://b"
+
+    def test_down_host_excluded_until_all_down(self):
+        router = OllamaRouter(["http://a", "http://b"])
+        router.mark_down(router.hosts[0])
+        assert router.pick().url == "http://b"
+        router.mark_down(router.hosts[1])
+        # Alle ausgefallen: Host mit aeltestem Fehler
+        assert router.pick().url == "http://a"
+
+    def test_urls_from_settings(self, test_settings: Settings):
+        test_settings.OLLAMA_BASE_URLS = "http://x:11434/, http://y:11434"
+        router = get_router(test_settings)
+        assert [h.url for h in router.hosts] == ["http://x:11434", "http://y:11434"]
+
+
+class TestRoutingAgainstStandIns:
+    async def test_concurrent_calls_spread_over_hosts(self, test_settings, stand_ins):
+        settings = _settings(test_settings, [s.url for s in stand_ins])
+
+        results = await asyncio.gather(*(call_llm("Test", settings) for _ in range(6)))
+
+        assert all(results)
+        assert stand_ins[0].chat_requests > 0
+        assert stand_ins[1].chat_requests > 0
+
+    async def test_failover_and_health_probe(self, test_settings, stand_ins):
+        settings = _settings(test_settings, [s.url for s in stand_ins])
+        router = get_router(settings)
+        stand_ins[0].stop()
+
+        result = await call_llm("Test", settings)
+
+        assert json.loads(result)["host"] == "b"
+        assert router.hosts[0].healthy is False
+
+        # Ausgefallener Host bleibt draussen, solange die Probe scheitert
+        await router.probe_unhealthy(timeout=0.5)
+        assert router.hosts[0].healthy is False
+        assert json.loads(await call_llm("Test", settings))["host"] == "b"
+
+        # Host wieder da -> Probe nimmt ihn in die Rotation auf
+        revived = _StandInServer("a2")
+        router.hosts[0].url = revived.url
+        try:
+            await router.probe_unhealthy(timeout=0.5)
+            assert router.hosts[0].healthy is True
+        finally:
+            revived.stop()
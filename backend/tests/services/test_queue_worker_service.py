@@ -10,7 +10,7 @@ from app.config import Settings
 from app.models.processing_job import JobSource, JobStatus, ProcessingJob
 from app.services.analysis_service import AnalysisResult
 from app.services.ocr_service import OcrResult, PageText
-from app.services.queue_worker_service import run_queue_worker
+from app.services.queue_worker_service import run_model_keeper, run_queue_worker
 
 
 async def _get_job_fresh(
@@ -178,3 +178,181 @@ class TestQueueWorker:
         assert updated_job.retry_count == 3
         assert updated_job.status == JobStatus.FAILED
         assert updated_job.error_message is not None
+
+    async def test_batch_mode_processes_multiple_jobs(
+        self,
+        test_settings: Settings,
+        test_session_factory,
+        db_session: AsyncSession,
+        sample_pdf: Path,
+    ):
+        """Im Batch-Modus werden mehrere Jobs gemeinsam uebernommen und abgeschlossen."""
+        job_ids = []
+        for i in range(3):
+            path = sample_pdf.with_name(f"bon_{i}.pdf")
+            path.write_bytes(sample_pdf.read_bytes() + str(i).encode())
+            job = ProcessingJob(
+                original_filename=path.name,
+                stored_filename=path.name,
+                file_path=str(path),
+                file_type="pdf",
+                file_size_bytes=path.stat().st_size,
+                source=JobSource.UPLOAD,
+                status=JobStatus.PENDING,
+            )
+            db_session.add(job)
+            await db_session.commit()
+            job_ids.append(job.id)
+
+        test_settings.QUEUE_POLL_INTERVAL = 0
+        test_settings.BATCH_ANALYSIS_ENABLED = True
+        test_settings.BATCH_SIZE = 3
+
+        with patch(
+            "app.services.queue_worker_service.analyze_document",
+            new_callable=AsyncMock,
+            return_value=_mock_analyze_success(),
+        ) as mock_analyze:
+            task = asyncio.create_task(run_queue_worker(test_session_factory, test_settings))
+            await asyncio.sleep(1.0)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        batchers = {c.kwargs["batcher"] for c in mock_analyze.call_args_list}
+        assert len(batchers) == 1 and None not in batchers
+        for job_id in job_ids:
+            updated_job = await _get_job_fresh(test_session_factory, job_id)
+            assert updated_job.status == JobStatus.COMPLETED
+
+    async def test_batch_mode_claims_only_small_files(
+        self,
+        test_settings: Settings,
+        test_session_factory,
+        db_session: AsyncSession,
+        sample_pdf: Path,
+    ):
+        """Grosse Dateien werden nicht mit anderen Jobs zusammen uebernommen."""
+        sizes = {"gross.pdf": 5 * 1024 * 1024, "klein_1.pdf": 1000, "klein_2.pdf": 1000}
+        for name, size in sizes.items():
+            path = sample_pdf.with_name(name)
+            path.write_bytes(sample_pdf.read_bytes() + name.encode())
+            db_session.add(ProcessingJob(
+                original_filename=name,
+                stored_filename=name,
+                file_path=str(path),
+                file_type="pdf",
+                file_size_bytes=size,
+                source=JobSource.UPLOAD,
+                status=JobStatus.PENDING,
+            ))
+            await db_session.commit()
+
+        test_settings.QUEUE_POLL_INTERVAL = 0
+        test_settings.BATCH_ANALYSIS_ENABLED = True
+        test_settings.BATCH_SIZE = 3
+        test_settings.BATCH_MAX_FILE_MB = 2
+
+        with patch(
+            "app.services.queue_worker_service.analyze_document",
+            new_callable=AsyncMock,
+            return_value=_mock_analyze_success(),
+        ) as mock_analyze:
+            task = asyncio.create_task(run_queue_worker(test_session_factory, test_settings))
+            await asyncio.sleep(1.0)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        batchers = [c.kwargs["batcher"] for c in mock_analyze.call_args_list]
+        assert batchers[0] is None
+        assert batchers[1] is not None and batchers[1] is batchers[2]
+
+    async def test_batch_mode_archives_without_waiting_for_slow_job(
+        self,
+        test_settings: Settings,
+        test_session_factory,
+        db_session: AsyncSession,
+        sample_pdf: Path,
+    ):
+        """Ein haengendes Dokument haelt die Archivierung der anderen nicht auf."""
+        job_ids = []
+        for i in range(2):
+            path = sample_pdf.with_name(f"bon_{i}.pdf")
+            path.write_bytes(sample_pdf.read_bytes() + str(i).encode())
+            job = ProcessingJob(
+                original_filename=path.name,
+                stored_filename=path.name,
+                file_path=str(path),
+                file_type="pdf",
+                file_size_bytes=path.stat().st_size,
+                source=JobSource.UPLOAD,
+                status=JobStatus.PENDING,
+            )
+            db_session.add(job)
+            await db_session.commit()
+            job_ids.append(job.id)
+
+        async def analyze(file_path, *args, **kwargs):
+            if file_path.name.startswith("bon_0"):
+                await asyncio.Event().wait()
+            return _mock_analyze_success()
+
+        test_settings.QUEUE_POLL_INTERVAL = 0
+        test_settings.BATCH_ANALYSIS_ENABLED = True
+        test_settings.BATCH_SIZE = 2
+
+        with patch("app.services.queue_worker_service.analyze_document", side_effect=analyze):
+            task = asyncio.create_task(run_queue_worker(test_session_factory, test_settings))
+            await asyncio.sleep(1.0)
+            fast_job = await _get_job_fresh(test_session_factory, job_ids[1])
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        assert fast_job.status == JobStatus.COMPLETED
+
+
+class TestModelKeeper:
+    async def test_pings_only_while_jobs_pending(
+        self,
+        test_settings: Settings,
+        test_session_factory,
+        db_session: AsyncSession,
+    ):
+        """Keep-Alive-Pings nur, solange Jobs in der Queue warten."""
+        test_settings.OLLAMA_KEEPER_INTERVAL = 0.05
+
+        with patch(
+            "app.services.queue_worker_service.warm_up_model", new_callable=AsyncMock
+        ) as mock_warm:
+            task = asyncio.create_task(run_model_keeper(test_session_factory, test_settings))
+            await asyncio.sleep(0.2)
+            assert mock_warm.await_count == 0
+
+            db_session.add(ProcessingJob(
+                original_filename="a.pdf",
+                stored_filename="a.pdf",
+                file_path="/tmp/a.pdf",
+                file_type="pdf",
+                file_size_bytes=1,
+                source=JobSource.UPLOAD,
+                status=JobStatus.PENDING,
+            ))
+            await db_session.commit()
+            await asyncio.sleep(0.2)
+
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        assert mock_warm.await_count > 0
+        assert mock_warm.await_args.kwargs == {"keeper": True}
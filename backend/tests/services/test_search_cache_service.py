@@ -0,0 +1,89 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document, DocumentStatus, DocumentType, ReviewStatus
+from app.services.search_cache_service import (
+    SearchCache,
+    archive_generation,
+    get_search_cache,
+    get_search_cache_stats,
+)
+from app.services.search_service import ensure_fts_table, search_documents, suggest
+from app.services.suggestion_service import sync_suggestion_index
+
+
+async def _create_doc(db: AsyncSession, file_hash: str, title: str) -> Document:
+    doc = Document(
+        original_filename="test.pdf", stored_filename="abc_test.pdf", file_path="/archive/test.pdf",
+        file_type="pdf", file_size_bytes=1024, file_hash=file_hash,
+        document_type=DocumentType.RECHNUNG, title=title, issuer="Stadtwerke Nord",
+        ocr_text="Abrechnung", status=DocumentStatus.ACTIVE, review_status=ReviewStatus.OK,
+    )
+    db.add(doc)
+    await db.flush()
+    return doc
+
+
+class TestSearchCache:
+    def test_lru_eviction(self):
+        cache = SearchCache(max_entries=2)
+        cache.put(("a",), 1, "A")
+        cache.put(("b",), 1, "B")
+        assert cache.get(("a",), 1) == "A"
+        cache.put(("c",), 1, "C")
+
+        assert cache.get(("b",), 1) is None
+        assert cache.get(("a",), 1) == "A"
+        assert cache.stats.evictions == 1
+        assert cache.stats.to_dict()["hit_rate"] == 2 / 3
+
+    def test_new_generation_drops_entries(self):
+        cache = SearchCache(max_entries=2)
+        cache.put(("a",), 1, "A")
+
+        assert cache.get(("a",), 2) is None
+        assert len(cache) == 0
+        assert cache.stats.invalidations == 1
+
+
+class TestCachedSearch:
+    async def test_repeated_search_is_served_from_cache(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        await _create_doc(db_session, "h1", "Stromrechnung Januar")
+        await db_session.commit()
+
+        hits = get_search_cache().stats.hits
+        first = await search_documents(db_session, query="Stromrechnung")
+        again = await search_documents(db_session, query="  stromrechnung ")
+
+        assert again is first
+        assert get_search_cache().stats.hits == hits + 1
+
+    async def test_document_write_invalidates(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        doc = await _create_doc(db_session, "h1", "Stromrechnung Januar")
+        await db_session.commit()
+        await sync_suggestion_index(db_session)
+        generation = await archive_generation(db_session)
+        hits = get_search_cache_stats()["hits"]
+        assert (await search_documents(db_session, query="Strom"))["total"] == 1
+        assert await suggest(db_session, "Stadt") == ["Stadtwerke Nord"]
+
+        doc.issuer = "Stadtwerke Sued"
+        await _create_doc(db_session, "h2", "Stromrechnung Februar")
+        await db_session.commit()
+
+        assert await archive_generation(db_session) > generation
+        assert (await search_documents(db_session, query="Strom"))["total"] == 2
+        # Vorschlaege erst nach dem Sync, der auch den Cache verwirft
+        assert await suggest(db_session, "Stadt") == ["Stadtwerke Nord"]
+        await sync_suggestion_index(db_session)
+        assert await suggest(db_session, "Stadt") == ["Stadtwerke Nord", "Stadtwerke Sued"]
+        assert get_search_cache_stats()["hits"] == hits
+
+    async def test_without_generation_table_no_caching(self, db_session: AsyncSession):
+        await _create_doc(db_session, "h1", "Stromrechnung")
+        await db_session.commit()
+
+        assert await archive_generation(db_session) is None
+        first = await search_documents(db_session)
+        assert await search_documents(db_session) is not first
@@ -1,14 +1,18 @@
+import pytest
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.document import Document, DocumentStatus, DocumentType, ReviewStatus
+from app.models.document import Document, DocumentStatus, DocumentType, ReviewStatus, Tag
 from app.services.search_service import (
     _sanitize_fts_query,
+    _trigram_query,
+    check_fts_index,
     ensure_fts_table,
-    index_document,
+    rebuild_fts_index,
     search_documents,
     suggest,
 )
+from app.services.tag_service import attach_tags, resolve_tag_ids
 
 
 async def _create_doc(db: AsyncSession, **overrides) -> Document:
@@ -41,12 +45,22 @@ class TestSanitizeFtsQuery:
         assert _sanitize_fts_query("   ") == ""
 
     def test_single_word(self):
-        assert _sanitize_fts_query("Rechnung") == "Rechnung*"
+        assert _sanitize_fts_query("Rechnungen") == '("Rechnungen"* OR stems : ("rechnung"))'
 
     def test_multiple_words(self):
         result = _sanitize_fts_query("Telekom Rechnung")
-        assert "Telekom*" in result
-        assert "Rechnung*" in result
+        assert '"Telekom"' in result
+        assert '"Rechnung"' in result
+
+    def test_compound_requires_all_parts(self):
+        assert _sanitize_fts_query("Kfz-Versicherungsbeitrag") == (
+            '("Kfz-Versicherungsbeitrag"* OR stems : ("kfz" AND "versicher" AND "beitrag"))'
+        )
+
+    def test_numbers_keep_prefix(self):
+        assert _sanitize_fts_query("V-4711") == '"V-4711"*'
+        # Ohne Stamm fuer "2019" kein Stamm-Zweig nur mit "re"
+        assert _sanitize_fts_query("RE-2019") == '"RE-2019"*'
 
     def test_preserves_prefix(self):
         assert _sanitize_fts_query("tele*") == "tele*"
@@ -77,7 +91,7 @@ class TestSearchDocuments:
         """Volltextsuche mit FTS5-Index."""
         await ensure_fts_table(db_session)
 
-        doc = await _create_doc(
+        await _create_doc(
             db_session, file_hash="h1",
             title="Telekom Rechnung Maerz",
             ocr_text="Monatliche Rechnung fuer Festnetz und Internet",
@@ -85,17 +99,6 @@ class TestSearchDocuments:
         )
         await db_session.commit()
 
-        await index_document(
-            session=db_session,
-            doc_id=doc.id,
-            title=doc.title,
-            ocr_text=doc.ocr_text,
-            issuer=doc.issuer,
-            summary=None,
-            tags="telekommunikation",
-        )
-        await db_session.commit()
-
         result = await search_documents(
             session=db_session,
             query="Telekom",
@@ -103,6 +106,62 @@ class TestSearchDocuments:
         assert result["total"] == 1
         assert "Telekom" in result["results"][0]["title"]
 
+    async def test_search_matches_stems_and_compounds(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        plural = await _create_doc(db_session, file_hash="h1", title="Versicherungen 2024")
+        compound = await _create_doc(db_session, file_hash="h2", title="Kfz-Versicherungsbeitrag")
+        await _create_doc(db_session, file_hash="h3", title="Sicherungskasten", ocr_text="Elektro")
+        transliterated = await _create_doc(db_session, file_hash="h4", title="Beleg", issuer="Sanitaer Mueller")
+        await db_session.commit()
+
+        result = await search_documents(session=db_session, query="Versicherung")
+        assert {r["id"] for r in result["results"]} == {plural.id, compound.id}
+        result = await search_documents(session=db_session, query="Beitraege Versicherung")
+        assert [r["id"] for r in result["results"]] == [compound.id]
+        result = await search_documents(session=db_session, query="Müller")
+        assert [r["id"] for r in result["results"]] == [transliterated.id]
+
+    async def test_partial_words_match_as_prefix(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        doc = await _create_doc(
+            db_session, file_hash="h1", title="Kfz-Versicherung Fahrzeug", issuer="Deutsche Telekom AG",
+            ocr_text="Ihre Rechnung",
+        )
+        await db_session.commit()
+
+        for query in ("Telek", "Rechn", "Versich", "Fahrz"):
+            result = await search_documents(session=db_session, query=query)
+            assert [r["id"] for r in result["results"]] == [doc.id], query
+
+    async def test_number_word_does_not_match_by_letter_stem(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        invoice = await _create_doc(db_session, file_hash="h1", title="Rechnung RE-2019-0815")
+        await _create_doc(db_session, file_hash="h2", title="Re: Anfrage", ocr_text="Re: Ihre Anfrage")
+        await db_session.commit()
+
+        result = await search_documents(session=db_session, query="RE-2019")
+        assert [r["id"] for r in result["results"]] == [invoice.id]
+
+    async def test_highlight_from_ocr_text(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        await _create_doc(
+            db_session, file_hash="h1", title="Beleg", issuer="Stadtwerke",
+            ocr_text="Abschlag fuer den Zaehlerstand im Mai",
+        )
+        await db_session.commit()
+
+        result = await search_documents(session=db_session, query="Zaehlerstand")
+        assert "<mark>Zaehlerstand</mark>" in result["results"][0]["highlight"]
+
+    async def test_search_amt_ignores_insgesamt(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        await _create_doc(db_session, file_hash="h1", title="Rechnung", ocr_text="Summe insgesamt 120,00 EUR")
+        office = await _create_doc(db_session, file_hash="h2", title="Bescheid", issuer="Finanzamt Dresden")
+        await db_session.commit()
+
+        result = await search_documents(session=db_session, query="Amt")
+        assert [r["id"] for r in result["results"]] == [office.id]
+
     async def test_search_excludes_deleted(self, db_session: AsyncSession):
         await _create_doc(db_session, file_hash="h1", title="Aktiv")
         await _create_doc(
@@ -138,6 +197,41 @@ class TestSearchDocuments:
         assert facets["document_types"]["QUITTUNG"] == 1
         assert facets["top_issuers"]["Telekom"] == 2
 
+    async def test_search_facets_single_pass(self, db_session: AsyncSession):
+        from datetime import date
+
+        from app.models.filing_scope import FilingScope
+
+        scope = FilingScope(name="Privat", slug="privat")
+        db_session.add(scope)
+        await db_session.flush()
+        await ensure_fts_table(db_session)
+        await _create_doc(
+            db_session, file_hash="h1", title="Strom 2023", document_date=date(2023, 5, 1),
+            filing_scope_id=scope.id,
+        )
+        await _create_doc(db_session, file_hash="h2", title="Strom 2024", document_date=date(2024, 5, 1))
+        await _create_doc(db_session, file_hash="h3", title="Wasser 2024", document_date=date(2024, 6, 1))
+        await db_session.commit()
+
+        result = await search_documents(session=db_session, query="Strom")
+
+        assert result["total"] == 2
+        assert list(result["facets"]["years"]) == ["2024", "2023"]
+        assert result["facets"]["filing_scopes"] == {"Privat": 1}
+        assert result["facets"]["top_issuers"] == {"Test GmbH": 2}
+
+    async def test_search_without_facets(self, db_session: AsyncSession):
+        for i in range(3):
+            await _create_doc(db_session, file_hash=f"h{i}", title=f"Doc {i}")
+        await db_session.commit()
+
+        result = await search_documents(session=db_session, page_size=2, include_facets=False)
+
+        assert result["total"] == 3
+        assert len(result["results"]) == 2
+        assert result["facets"]["document_types"] == {}
+
     async def test_search_pagination(self, db_session: AsyncSession):
         for i in range(5):
             await _create_doc(
@@ -152,6 +246,357 @@ class TestSearchDocuments:
         assert len(result["results"]) == 2
 
 
+async def _fts_ids(db: AsyncSession, query: str) -> list[str]:
+    result = await search_documents(session=db, query=query)
+    return [item["id"] for item in result["results"]]
+
+
+class TestFtsTriggers:
+    async def test_updates_follow_document(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        doc = await _create_doc(db_session, file_hash="h1", title="Stromrechnung", ocr_text="Abschlag Januar")
+        await db_session.commit()
+        assert await _fts_ids(db_session, "Abschlag") == [doc.id]
+
+        doc.ocr_text = "Jahresabrechnung Verbrauch"
+        await db_session.commit()
+        assert await _fts_ids(db_session, "Abschlag") == []
+        assert await _fts_ids(db_session, "Jahresabrechnung") == [doc.id]
+
+        doc.status = DocumentStatus.DELETED
+        await db_session.commit()
+        assert await _fts_ids(db_session, "Jahresabrechnung") == []
+
+        doc.status = DocumentStatus.ACTIVE
+        await db_session.commit()
+        assert await _fts_ids(db_session, "Jahresabrechnung") == [doc.id]
+
+        await db_session.delete(doc)
+        await db_session.commit()
+        count = await db_session.execute(
+            text("SELECT COUNT(*) FROM documents_fts WHERE documents_fts MATCH 'Jahresabrechnung'")
+        )
+        assert count.scalar() == 0
+
+    async def test_tags_are_indexed(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        doc = await _create_doc(db_session, file_hash="h1", title="Beleg")
+        tag_ids = await resolve_tag_ids(["versicherung", "auto"], db_session)
+        await attach_tags(doc.id, list(tag_ids.values()), db_session)
+        await db_session.commit()
+
+        assert await _fts_ids(db_session, "versicherung") == [doc.id]
+        tags_text = await db_session.execute(text("SELECT tags_text FROM documents"))
+        assert tags_text.scalar() == "auto versicherung"
+
+        tag = await db_session.get(Tag, tag_ids["versicherung"])
+        tag.name = "kfz-versicherung"
+        await db_session.commit()
+        assert await _fts_ids(db_session, "kfz") == [doc.id]
+
+        await db_session.execute(text("DELETE FROM document_tags"))
+        await db_session.commit()
+        assert await _fts_ids(db_session, "kfz") == []
+
+    async def test_rebuild_and_integrity(self, db_session: AsyncSession):
+        await _create_doc(db_session, file_hash="h1", title="Alt angelegt")
+        await _create_doc(db_session, file_hash="h2", title="Geloescht", status=DocumentStatus.DELETED)
+        await db_session.commit()
+
+        # Index nachtraeglich angelegt: bestehende Dokumente werden aufgenommen
+        await ensure_fts_table(db_session)
+        assert len(await _fts_ids(db_session, "angelegt")) == 1
+        assert await rebuild_fts_index(db_session) == 1
+
+        await db_session.execute(text("INSERT INTO documents_fts(documents_fts, rank) VALUES ('integrity-check', 1)"))
+
+    async def test_replaces_legacy_table(self, db_session: AsyncSession):
+        await db_session.execute(text("""
+            CREATE VIRTUAL TABLE documents_fts USING fts5(doc_id UNINDEXED, title, ocr_text, issuer, summary, tags)
+        """))
+        doc = await _create_doc(db_session, file_hash="h1", title="Mietvertrag")
+        await db_session.commit()
+
+        await ensure_fts_table(db_session)
+
+        assert await _fts_ids(db_session, "Mietvertrag") == [doc.id]
+
+    async def test_replaces_index_without_stems(self, db_session: AsyncSession):
+        await db_session.execute(text("""
+            CREATE VIEW documents_fts_content AS
+            SELECT rowid AS doc_rowid, title, ocr_text, issuer, summary, tags_text AS tags
+            FROM documents WHERE status != 'DELETED'
+        """))
+        await db_session.execute(text("""
+            CREATE VIRTUAL TABLE documents_fts USING fts5(
+                title, ocr_text, issuer, summary, tags,
+                content='documents_fts_content', content_rowid='doc_rowid'
+            )
+        """))
+        doc = await _create_doc(db_session, file_hash="h1", title="Mietvertraege")
+        # Bestand aus der Zeit vor den Wortstaemmen
+        await db_session.execute(text("UPDATE documents SET search_stems = ''"))
+        await db_session.commit()
+
+        await ensure_fts_table(db_session)
+
+        assert await _fts_ids(db_session, "Vertrag") == [doc.id]
+        await db_session.execute(text("INSERT INTO documents_fts(documents_fts, rank) VALUES ('integrity-check', 1)"))
+
+
+async def _without_trigger(db: AsyncSession, trigger: str, statement: str) -> None:
+    """Schreibt an den Triggern vorbei (wie aeltere Versionen oder externe Werkzeuge)."""
+    await db.execute(text(f"DROP TRIGGER {trigger}"))
+    await db.execute(text(statement))
+    await db.commit()
+    await ensure_fts_table(db)
+
+
+async def _count_fts_writes(db: AsyncSession) -> None:
+    """Zaehlt jedes Indizieren einer Dokumentzeile (Einfuegen oder Aenderung indizierter Spalten)."""
+    await db.execute(text("CREATE TABLE fts_writes (n INTEGER)"))
+    await db.execute(text(
+        "CREATE TRIGGER count_fts_ai AFTER INSERT ON documents BEGIN INSERT INTO fts_writes VALUES (1); END"
+    ))
+    await db.execute(text(
+        "CREATE TRIGGER count_fts_au AFTER UPDATE OF title, ocr_text, issuer, summary, tags_text, "
+        "search_stems, status ON documents BEGIN INSERT INTO fts_writes VALUES (1); END"
+    ))
+    await db.commit()
+
+
+class TestTagIndexing:
+    async def test_tags_index_document_once(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        await _count_fts_writes(db_session)
+        doc = await _create_doc(db_session, file_hash="h1", title="Beleg")
+        tag_ids = await resolve_tag_ids(["kfz", "steuer", "versicherung", "auto"], db_session)
+        await attach_tags(doc.id, list(tag_ids.values()), db_session)
+        await db_session.commit()
+
+        writes = await db_session.execute(text("SELECT COUNT(*) FROM fts_writes"))
+        # Einfuegen plus eine Aktualisierung fuer alle vier Tags
+        assert writes.scalar() == 2
+        assert await _fts_ids(db_session, "steuer") == [doc.id]
+        assert (await check_fts_index(db_session))["tags_repaired"] == 0
+
+    async def test_archive_with_tags_indexes_once(
+        self, test_settings, db_session: AsyncSession, tmp_path,
+    ):
+        from app.services.analysis_service import AnalysisResult
+        from app.services.archive_service import archive_document
+
+        await ensure_fts_table(db_session)
+        await _count_fts_writes(db_session)
+        scan = tmp_path / "scan.pdf"
+        scan.write_bytes(b"%PDF-1.4 beleg")
+        doc = await archive_document(
+            file_path=scan, original_filename="scan.pdf", stored_filename="abc_scan.pdf",
+            file_type="pdf", file_size_bytes=14, ocr_result=None,
+            analysis_result=AnalysisResult(title="Beleg", tags=["Strom", "haushalt", "steuer"]),
+            settings=test_settings, session=db_session, file_hash="h-archive",
+        )
+
+        writes = await db_session.execute(text("SELECT COUNT(*) FROM fts_writes"))
+        assert writes.scalar() == 1
+        assert await _fts_ids(db_session, "haushalt") == [doc.id]
+        assert (await check_fts_index(db_session))["tags_repaired"] == 0
+
+
+class TestFtsConsistency:
+    async def test_clean_index(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        await _create_doc(db_session, file_hash="h1", title="Stromrechnung", summary='Abschlag "Januar"')
+        await _create_doc(db_session, file_hash="h2", title="Geloescht", status=DocumentStatus.DELETED)
+        await db_session.commit()
+
+        stats = await check_fts_index(db_session)
+
+        assert stats == {
+            "checked": 1, "tags_repaired": 0, "stems_repaired": 0,
+            "added": 0, "removed": 0, "mismatched": 0, "rebuilt": False,
+        }
+
+    async def test_repairs_single_rows(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        doc = await _create_doc(db_session, file_hash="h1", title="Versicherung")
+        old = await _create_doc(db_session, file_hash="h2", title="Altvertrag")
+        tag_ids = await resolve_tag_ids(["kfz"], db_session)
+        await db_session.commit()
+
+        # Verknuepfung ohne attach_tags: tags_text bleibt veraltet
+        await db_session.execute(
+            text(f"INSERT INTO document_tags(document_id, tag_id) VALUES ('{doc.id}', {tag_ids['kfz']})")
+        )
+        await db_session.commit()
+        await _without_trigger(
+            db_session, "documents_fts_au", f"UPDATE documents SET status = 'DELETED' WHERE id = '{old.id}'",
+        )
+        await _without_trigger(
+            db_session, "documents_fts_ai",
+            """INSERT INTO documents (id, original_filename, stored_filename, file_path, file_type,
+               file_size_bytes, file_hash, document_type, title, currency, ocr_text, ocr_confidence,
+               tax_relevant, status, review_status, ai_confidence)
+               VALUES ('neu', 'n.pdf', 'n.pdf', '/n.pdf', 'pdf', 1, 'h3', 'RECHNUNG', 'Nachzuegler',
+               'EUR', '', 0.9, 0, 'ACTIVE', 'OK', 0.9)""",
+        )
+
+        stats = await check_fts_index(db_session)
+
+        assert stats["tags_repaired"] == 1
+        assert stats["added"] == 1
+        assert stats["removed"] == 1
+        assert stats["mismatched"] == 0
+        assert stats["rebuilt"] is False
+        assert await _fts_ids(db_session, "kfz") == [doc.id]
+        assert await _fts_ids(db_session, "Nachzuegler") == ["neu"]
+        await db_session.execute(text("INSERT INTO documents_fts(documents_fts, rank) VALUES ('integrity-check', 1)"))
+
+    async def test_repairs_stale_stems(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        doc = await _create_doc(db_session, file_hash="h1", title="Beleg", ocr_text="Stromrechnung")
+        await db_session.commit()
+        # Per SQL geschrieben: Trigger indizieren den Text, die Staemme fehlen
+        await db_session.execute(
+            text("UPDATE documents SET ocr_text = 'Wasserrechnungen' WHERE id = :id"), {"id": doc.id}
+        )
+        await db_session.commit()
+
+        stats = await check_fts_index(db_session)
+
+        assert stats["stems_repaired"] == 1
+        assert stats["rebuilt"] is False
+        assert await _fts_ids(db_session, "Wasser") == [doc.id]
+        assert await _fts_ids(db_session, "Strom") == []
+        assert (await check_fts_index(db_session))["stems_repaired"] == 0
+
+    async def test_changed_content_triggers_rebuild(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        doc = await _create_doc(db_session, file_hash="h1", title="Telekom Rechnung")
+        await db_session.commit()
+        await _without_trigger(
+            db_session, "documents_fts_au", f"UPDATE documents SET title = 'Vodafone Rechnung' WHERE id = '{doc.id}'",
+        )
+
+        stats = await check_fts_index(db_session, repair=False)
+        assert stats["mismatched"] == 1
+        assert stats["rebuilt"] is False
+
+        stats = await check_fts_index(db_session)
+        assert stats["rebuilt"] is True
+        assert await _fts_ids(db_session, "Vodafone") == [doc.id]
+        assert await check_fts_index(db_session) == {
+            "checked": 1, "tags_repaired": 0, "stems_repaired": 0,
+            "added": 0, "removed": 0, "mismatched": 0, "rebuilt": False,
+        }
+
+
+class TestSearchCursor:
+    async def test_cursor_pages_by_relevance(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session)
+        for i in range(5):
+            await _create_doc(db_session, file_hash=f"h{i}", title="Strom " * (i + 1), ocr_text=f"Beleg {i}")
+        await db_session.commit()
+
+        first = await search_documents(session=db_session, query="Strom", page_size=2)
+        ids = [r["id"] for r in first["results"]]
+        cursor = first["next_cursor"]
+        while cursor:
+            page = await search_documents(
+                session=db_session, query="Strom", page_size=2, cursor=cursor,
+                include_facets=False, include_total=False,
+            )
+            assert page["total"] is None
+            ids += [r["id"] for r in page["results"]]
+            cursor = page["next_cursor"]
+
+        everything = await search_documents(session=db_session, query="Strom", page_size=10)
+        assert ids == [r["id"] for r in everything["results"]]
+        assert len(set(ids)) == 5
+
+    async def test_cursor_for_other_sort_is_rejected(self, db_session: AsyncSession):
+        for i in range(3):
+            await _create_doc(db_session, file_hash=f"h{i}", title=f"Doc {i}")
+        await db_session.commit()
+        first = await search_documents(session=db_session, sort_by="title", page_size=1)
+
+        with pytest.raises(ValueError):
+            await search_documents(session=db_session, sort_by="amount", cursor=first["next_cursor"])
+
+
+class TestTrigramQuery:
+    def test_words_stay_on_word_index(self):
+        assert _trigram_query("Stromrechnung Januar") is None
+        assert _trigram_query('"Deutsche Telekom"') is None
+
+    def test_fragments_and_short_terms(self):
+        assert _trigram_query("RE-2019") == '"RE-2019"'
+        assert _trigram_query("Rechnung 4711") == '"Rechnung" AND "4711"'
+        assert _trigram_query("amt") == '"amt"'
+
+    def test_too_short_for_trigrams(self):
+        assert _trigram_query("4 711") is None
+        assert _trigram_query("ab", fuzzy=True) is None
+
+    def test_fuzzy_allows_one_error(self):
+        query = _trigram_query("Stromrechnung", fuzzy=True)
+        assert query.startswith('("omrechnung" OR "Stromrechn" OR NEAR("Str" "mrechnung", 4)')
+        # Kurze Woerter bleiben exakt
+        assert _trigram_query("Strom", fuzzy=True) == '"Strom"'
+
+
+class TestTrigramSearch:
+    async def test_infix_and_number_fragments(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session, trigram=True)
+        doc = await _create_doc(
+            db_session, file_hash="h1", title="Rechnung RE-2019-34711",
+            ocr_text="Finanzamt Musterstadt Steuernummer 123/456/78901",
+        )
+        await _create_doc(db_session, file_hash="h2", title="Kontoauszug", ocr_text="Saldo 4.711,00 EUR")
+        await db_session.commit()
+
+        for query in ("4711", "2019-347", "amt", "456/789"):
+            result = await search_documents(session=db_session, query=query)
+            assert [r["id"] for r in result["results"]] == [doc.id], query
+        assert "<mark>" in result["results"][0]["highlight"]
+
+        # Ganze Woerter weiter ueber den Wortindex (Stamm und Kompositateile, kein Infix)
+        assert (await search_documents(session=db_session, query="Steuer"))["total"] == 1
+        assert (await search_documents(session=db_session, query="Nummern"))["total"] == 1
+        assert (await search_documents(session=db_session, query="usterstadt"))["total"] == 0
+
+    async def test_fuzzy_finds_ocr_errors(self, db_session: AsyncSession):
+        await ensure_fts_table(db_session, trigram=True)
+        for i, text_ in enumerate(["Ihre Stromrechnunq fuer Mai", "Ihre Strornrechnung", "Strom und Gas"]):
+            await _create_doc(db_session, file_hash=f"h{i}", title="Beleg", ocr_text=text_)
+        await db_session.commit()
+
+        assert (await search_documents(session=db_session, query="Stromrechnung"))["total"] == 0
+        result = await search_documents(session=db_session, query="Stromrechnung", fuzzy=True)
+        assert result["total"] == 2
+
+    async def test_index_follows_documents_and_can_be_removed(self, db_session: AsyncSession):
+        await _create_doc(db_session, file_hash="h1", title="Vertrag V-88123")
+        await db_session.commit()
+        await ensure_fts_table(db_session, trigram=True)
+        assert (await search_documents(session=db_session, query="812"))["total"] == 1
+
+        doc = await _create_doc(db_session, file_hash="h2", title="Vertrag V-88124")
+        await db_session.commit()
+        assert (await search_documents(session=db_session, query="812"))["total"] == 2
+        doc.status = DocumentStatus.DELETED
+        await db_session.commit()
+        assert (await search_documents(session=db_session, query="812"))["total"] == 1
+
+        await ensure_fts_table(db_session, trigram=False)
+        tables = await db_session.execute(
+            text("SELECT COUNT(*) FROM sqlite_master WHERE name LIKE 'documents_trigram%'")
+        )
+        assert tables.scalar() == 0
+        # Ohne Trigramm-Index sucht "812" wieder per Praefix im Wortindex (kein Infix)
+        assert (await search_documents(session=db_session, query="812"))["total"] == 0
+
+
 class TestSuggest:
     async def test_suggest_issuers(self, db_session: AsyncSession):
         await _create_doc(
@@ -0,0 +1,159 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document, DocumentStatus, DocumentType, ReviewStatus, Tag
+from app.services.suggestion_service import (
+    ensure_suggestion_index,
+    lookup_suggestions,
+    rebuild_suggestion_index,
+    sync_suggestion_index,
+    term_prefixes,
+)
+from app.services.tag_service import attach_tags, resolve_tag_ids
+
+
+async def _create_doc(db: AsyncSession, file_hash: str, title: str, issuer: str | None = None) -> Document:
+    doc = Document(
+        original_filename="test.pdf", stored_filename="abc_test.pdf", file_path="/archive/test.pdf",
+        file_type="pdf", file_size_bytes=1024, file_hash=file_hash,
+        document_type=DocumentType.RECHNUNG, title=title, issuer=issuer,
+        status=DocumentStatus.ACTIVE, review_status=ReviewStatus.OK,
+    )
+    db.add(doc)
+    await db.flush()
+    return doc
+
+
+async def _index_rows(db: AsyncSession) -> list:
+    result = await db.execute(text("""
+        SELECT p.prefix, p.frequency, t.kind, t.term FROM suggestion_prefixes p
+        JOIN suggestion_terms t ON t.id = p.term_id ORDER BY 1, 2, 3, 4
+    """))
+    return result.tuples().all()
+
+
+class TestTermPrefixes:
+    def test_prefixes_per_word_start(self):
+        prefixes = term_prefixes("Deutsche  Telekom")
+        assert {"d", "de", "deutsche", "t", "te", "telekom"} <= prefixes
+        # Nur ab Wortanfaengen, bis PREFIX_LENGTH Zeichen (Leerraum zusammengefasst)
+        assert "elekom" not in prefixes
+        assert "deutsche t" not in prefixes
+
+    def test_casefold(self):
+        assert "strasse" in term_prefixes("STRASSE")
+
+
+class TestLookupSuggestions:
+    async def test_without_index_returns_none(self, db_session: AsyncSession):
+        assert await lookup_suggestions(db_session, "Tele") is None
+
+    async def test_ranked_by_frequency(self, db_session: AsyncSession):
+        await ensure_suggestion_index(db_session)
+        await _create_doc(db_session, "h1", "Telefonrechnung Mai", issuer="Deutsche Telekom AG")
+        await _create_doc(db_session, "h2", "Telefonrechnung Juni", issuer="Deutsche Telekom AG")
+        await _create_doc(db_session, "h3", "Vertrag", issuer="Telefonica Germany")
+        await db_session.commit()
+        await sync_suggestion_index(db_session)
+
+        suggestions = await lookup_suggestions(db_session, "tele")
+
+        assert suggestions[0] == "Deutsche Telekom AG"
+        assert set(suggestions[1:]) == {"Telefonica Germany", "Telefonrechnung Mai", "Telefonrechnung Juni"}
+
+    async def test_word_start_and_multiword(self, db_session: AsyncSession):
+        await ensure_suggestion_index(db_session)
+        await _create_doc(db_session, "h1", "Kfz-Versicherung Beitragsrechnung 2024")
+        await _create_doc(db_session, "h2", "Hausratversicherung")
+        await db_session.commit()
+        await sync_suggestion_index(db_session)
+
+        assert await lookup_suggestions(db_session, "Versicherung") == ["Kfz-Versicherung Beitragsrechnung 2024"]
+        assert await lookup_suggestions(db_session, "versicherung beit") == ["Kfz-Versicherung Beitragsrechnung 2024"]
+        assert await lookup_suggestions(db_session, "kfz-versicherungsbeitrag") == []
+        assert await lookup_suggestions(db_session, "-kfz") == []
+
+    async def test_long_query_filters_bucket(self, db_session: AsyncSession):
+        await ensure_suggestion_index(db_session)
+        await _create_doc(db_session, "h1", "Stromabrechnung 2023")
+        await _create_doc(db_session, "h2", "Stromabschlag 2024")
+        await db_session.commit()
+        await sync_suggestion_index(db_session)
+
+        assert await lookup_suggestions(db_session, "stromabre") == ["Stromabrechnung 2023"]
+
+    async def test_limit(self, db_session: AsyncSession):
+        await ensure_suggestion_index(db_session)
+        for i in range(5):
+            await _create_doc(db_session, f"h{i}", f"Rechnung {i}")
+        await db_session.commit()
+        await sync_suggestion_index(db_session)
+
+        assert len(await lookup_suggestions(db_session, "rech", limit=3)) == 3
+
+
+    async def test_lookup_is_read_only(self, db_session: AsyncSession):
+        await ensure_suggestion_index(db_session)
+        await _create_doc(db_session, "h1", "Wasserrechnung")
+        await db_session.commit()
+
+        # Die Abfrage schreibt nicht, der Begriff wartet auf den Sync
+        assert await lookup_suggestions(db_session, "wasser") == []
+        assert await sync_suggestion_index(db_session) == 1
+        assert await lookup_suggestions(db_session, "wasser") == ["Wasserrechnung"]
+
+
+class TestIncrementalUpdates:
+    async def test_document_changes(self, db_session: AsyncSession):
+        await ensure_suggestion_index(db_session)
+        doc = await _create_doc(db_session, "h1", "Gasrechnung", issuer="Stadtwerke Nord")
+        await _create_doc(db_session, "h2", "Stromrechnung", issuer="Stadtwerke Nord")
+        await db_session.commit()
+        await sync_suggestion_index(db_session)
+        assert await lookup_suggestions(db_session, "stadt") == ["Stadtwerke Nord"]
+
+        doc.issuer = "Stadtwerke Sued"
+        await db_session.commit()
+        await sync_suggestion_index(db_session)
+        assert await lookup_suggestions(db_session, "stadt") == ["Stadtwerke Nord", "Stadtwerke Sued"]
+
+        doc.status = DocumentStatus.DELETED
+        await db_session.commit()
+        await sync_suggestion_index(db_session)
+        assert await lookup_suggestions(db_session, "stadt") == ["Stadtwerke Nord"]
+        assert await lookup_suggestions(db_session, "gas") == []
+
+        result = await db_session.execute(text("SELECT COUNT(*) FROM suggestion_terms WHERE term = 'Gasrechnung'"))
+        assert result.scalar() == 0
+
+    async def test_tags(self, db_session: AsyncSession):
+        await ensure_suggestion_index(db_session)
+        doc = await _create_doc(db_session, "h1", "Beleg")
+        tag_ids = await resolve_tag_ids(["steuer", "strom"], db_session)
+        await attach_tags(doc.id, list(tag_ids.values()), db_session)
+        other = await _create_doc(db_session, "h2", "Beleg 2")
+        await attach_tags(other.id, [tag_ids["strom"]], db_session)
+        await db_session.commit()
+        await sync_suggestion_index(db_session)
+
+        assert await lookup_suggestions(db_session, "st") == ["strom", "steuer"]
+
+        tag = await db_session.get(Tag, tag_ids["steuer"])
+        tag.name = "steuererklaerung"
+        await db_session.commit()
+        await sync_suggestion_index(db_session)
+        assert await lookup_suggestions(db_session, "steuer") == ["steuererklaerung"]
+
+    async def test_rebuild_matches_incremental(self, db_session: AsyncSession):
+        await ensure_suggestion_index(db_session)
+        doc = await _create_doc(db_session, "h1", "Mietvertrag", issuer="Hausverwaltung Meier")
+        await _create_doc(db_session, "h2", "Nebenkosten", issuer="Hausverwaltung Meier")
+        await db_session.commit()
+        await sync_suggestion_index(db_session)
+        doc.title = "Mietvertrag Wohnung"
+        await db_session.commit()
+        await sync_suggestion_index(db_session)
+        incremental = await _index_rows(db_session)
+
+        assert await rebuild_suggestion_index(db_session) == 3
+        assert await _index_rows(db_session) == incremental
@@ -0,0 +1,58 @@
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document, DocumentTag, DocumentType, Tag
+from app.services.tag_service import attach_tags, normalize_tag_names, resolve_tag_ids
+
+
+def test_normalize_tag_names():
+    assert normalize_tag_names([" Strom ", "strom", "", "  ", "Miete"]) == ["strom", "miete"]
+
+
+class TestResolveTagIds:
+    async def test_creates_missing_and_reuses_existing(self, db_session: AsyncSession):
+        db_session.add(Tag(name="strom", is_auto_generated=False))
+        await db_session.flush()
+
+        ids = await resolve_tag_ids(["Strom", "miete", "Miete"], db_session)
+
+        assert list(ids) == ["strom", "miete"]
+        result = await db_session.execute(select(Tag).order_by(Tag.name))
+        tags = {t.name: t for t in result.scalars()}
+        assert set(tags) == {"strom", "miete"}
+        assert tags["strom"].id == ids["strom"]
+        assert tags["strom"].is_auto_generated is False
+        assert tags["miete"].is_auto_generated is True
+
+    async def test_constant_round_trips(self, db_session: AsyncSession):
+        statements = []
+        engine = db_session.bind.sync_engine
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            await resolve_tag_ids([f"tag{i}" for i in range(25)], db_session)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        assert len(statements) == 2
+
+    async def test_empty(self, db_session: AsyncSession):
+        assert await resolve_tag_ids(["", " "], db_session) == {}
+
+
+async def test_attach_tags_skips_existing_links(db_session: AsyncSession):
+    doc = Document(
+        original_filename="a.pdf", stored_filename="x_a.pdf", file_path="/a.pdf",
+        file_type="pdf", file_size_bytes=1, file_hash="h1", document_type=DocumentType.RECHNUNG,
+        title="A",
+    )
+    db_session.add(doc)
+    await db_session.flush()
+    ids = await resolve_tag_ids(["a", "b"], db_session)
+
+    assert await attach_tags(doc.id, [ids["a"]], db_session) == 1
+    assert await attach_tags(doc.id, list(ids.values()), db_session) == 1
+
+    result = await db_session.execute(
+        select(DocumentTag.tag_id).where(DocumentTag.document_id == doc.id)
+    )
+    assert sorted(result.scalars()) == sorted(ids.values())
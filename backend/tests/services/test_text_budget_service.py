@@ -0,0 +1,107 @@
+from app.services.text_budget_service import (
+    estimate_tokens,
+    score_segment,
+    select_relevant_text,
+    split_into_chunks,
+)
+
+_BOILERPLATE = (
+    "Die nachfolgenden Bestimmungen gelten fuer alle Vertragsparteien gleichermassen "
+    "und sind Bestandteil dieser Vereinbarung."
+)
+
+
+def _long_document(fields: list[str], filler_lines: int = 120) -> str:
+    """Baut ein langes Dokument mit Kopf, viel Fliesstext und Feldern in der Mitte."""
+    head = ["Hausverwaltung Sonnenhof GmbH", "Mietvertrag fuer Wohnraum"]
+    filler = [f"§ {i} {_BOILERPLATE}" for i in range(filler_lines)]
+    middle = len(filler) // 2
+    return "\n".join(head + filler[:middle] + fields + filler[middle:])
+
+
+# Mini-Korpus: (Dokument, Felder die nach der Auswahl sichtbar sein muessen)
+_CORPUS = [
+    (
+        _long_document([
+            "Vertragsbeginn: 01.04.2024",
+            "Monatliche Miete gesamt: 1.250,00 EUR",
+            "IBAN: DE89 3704 0044 0532 0130 00",
+        ]),
+        ["01.04.2024", "1.250,00 EUR", "DE89 3704 0044 0532 0130 00"],
+    ),
+    (
+        _long_document([
+            "Versicherungsnummer: KV-99812",
+            "Jahresbeitrag gesamt: 487,20 EUR, faellig am 15.01.2025",
+        ]),
+        ["KV-99812", "487,20 EUR", "15.01.2025"],
+    ),
+    (
+        _long_document([
+            "Herstellergarantie: 36 Monate ab Kaufdatum 03.11.2023",
+            "Rechnungsbetrag brutto: 899,99 EUR",
+        ], filler_lines=300),
+        ["36 Monate", "03.11.2023", "899,99 EUR"],
+    ),
+]
+
+
+def _head_tail(text: str, max_chars: int) -> str:
+    """Frueheres Verfahren zum Vergleich: erste + letzte Haelfte des Budgets."""
+    half = max_chars // 2
+    return text[:half] + text[-half:]
+
+
+class TestSelectRelevantText:
+    def test_short_text_unchanged(self):
+        text = "Rechnung\nBetrag: 10,00 EUR"
+        assert select_relevant_text(text, token_budget=1000) == text
+
+    def test_respects_budget(self):
+        text, _ = _CORPUS[0]
+        result = select_relevant_text(text, token_budget=300)
+        assert estimate_tokens(result) <= 300 + 20  # Luecken-Marker
+        assert "[...]" in result
+
+    def test_keeps_header(self):
+        text, _ = _CORPUS[0]
+        result = select_relevant_text(text, token_budget=300)
+        assert result.startswith("Hausverwaltung Sonnenhof GmbH")
+
+    def test_keeps_original_order(self):
+        text, _ = _CORPUS[0]
+        result = select_relevant_text(text, token_budget=300)
+        assert result.index("01.04.2024") < result.index("1.250,00 EUR")
+
+    def test_splits_overlong_lines(self):
+        text = (_BOILERPLATE + " ") * 40 + "Gesamtbetrag: 55,00 EUR " + (_BOILERPLATE + " ") * 40
+        result = select_relevant_text(text, token_budget=200)
+        assert "55,00 EUR" in result
+
+    def test_corpus_fields_recovered_with_smaller_prompt(self):
+        """Alle Felder im Korpus bleiben erhalten, head/tail verliert sie."""
+        budget = 500
+        for text, expected in _CORPUS:
+            selected = select_relevant_text(text, token_budget=budget)
+            baseline = _head_tail(text, max_chars=4000)
+            assert len(selected) < len(baseline)
+            for value in expected:
+                assert value in selected
+                assert value not in baseline
+
+
+class TestScoreSegment:
+    def test_total_amount_scores_higher_than_boilerplate(self):
+        assert score_segment("Gesamtbetrag: 119,00 EUR", 50) > score_segment(_BOILERPLATE, 50)
+
+    def test_noise_penalized(self):
+        assert score_segment("------ ==== ------", 50) < 0
+
+
+class TestSplitIntoChunks:
+    def test_chunks_respect_size_and_keep_all_lines(self):
+        text = "\n".join(f"Zeile {i} mit etwas Inhalt" for i in range(100))
+        chunks = split_into_chunks(text, chunk_chars=300)
+        assert len(chunks) > 1
+        assert all(len(c) <= 300 for c in chunks)
+        assert "\n".join(chunks) == text
@@ -1,3 +1,4 @@
+import hashlib
 from pathlib import Path
 
 import pytest
@@ -92,3 +93,22 @@ class TestProcessUpload:
         assert not original_path.exists()
         # Neue Datei existiert im Upload-Dir
         assert Path(job.file_path).exists()
+
+    async def test_hash_computed_at_ingest(
+        self,
+        sample_pdf: Path,
+        sample_jpg: Path,
+        test_settings: Settings,
+        db_session: AsyncSession,
+    ):
+        for path, source in ((sample_pdf, JobSource.UPLOAD), (sample_jpg, JobSource.WATCH_FOLDER)):
+            expected = hashlib.sha256(path.read_bytes()).hexdigest()
+            job = await process_upload(
+                file_path=path,
+                original_name=path.name,
+                file_size=path.stat().st_size,
+                source=source,
+                settings=test_settings,
+                db=db_session,
+            )
+            assert job.file_hash == expected